@@ -0,0 +1,51 @@
+"""Add sync_fuzzy_pending for the fuzzy matching post-pass.
+
+Revision ID: a3f1c7d9e2b4
+Revises: c5a2e8f13b47
+Create Date: 2026-10-19 00:12:36.418205
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "a3f1c7d9e2b4"
+down_revision: Union[str, Sequence[str], None] = "c5a2e8f13b47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # Обычная таблица, не UNLOGGED: строки фиксируются вместе с checkpoint
+    # и должны пережить сбой сервера
+    op.create_table(
+        "sync_fuzzy_pending",
+        sa.Column("job_id", sa.BigInteger(), nullable=False),
+        sa.Column("key", sa.Text(), nullable=False),
+        sa.Column(
+            "payload",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["job_id"],
+            ["sync_job.id"],
+            name=op.f("fk_sync_fuzzy_pending_job_id_sync_job"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "job_id",
+            "key",
+            name=op.f("pk_sync_fuzzy_pending"),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_table("sync_fuzzy_pending")
@@ -0,0 +1,70 @@
+"""Add normalized trigram indexes for employee search.
+
+Revision ID: a4d7e3b92c51
+Revises: f3a8c61d7e25
+Create Date: 2026-10-18 21:10:37.905314
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "a4d7e3b92c51"
+down_revision: Union[str, Sequence[str], None] = "f3a8c61d7e25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Выражения должны дословно совпадать с employee_service._norm
+_NORM_INDEXES = {
+    "idx_employee_last_name_norm_trgm": "last_name",
+    "idx_employee_first_name_norm_trgm": "first_name",
+    "idx_employee_title_norm_trgm": "title",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # Индексы по lower(...) без unaccent поиском не используются
+    op.execute("DROP INDEX IF EXISTS public.idx_employee_last_name_trgm;")
+    op.execute("DROP INDEX IF EXISTS public.idx_employee_title_trgm;")
+
+    # unaccent только STABLE — индексируется IMMUTABLE-обёртка
+    # public.immutable_unaccent (создана в 13f3fe5f7e88)
+    for name, column in _NORM_INDEXES.items():
+        op.execute(
+            f"""
+            CREATE INDEX IF NOT EXISTS {name}
+            ON public.employee
+            USING gin (public.immutable_unaccent(lower({column})) gin_trgm_ops)
+            """
+        )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_employee_search_text_norm_trgm
+        ON public.employee
+        USING gin (search_text_norm gin_trgm_ops)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    for name in _NORM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS public.{name};")
+
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_employee_last_name_trgm
+        ON public.employee
+        USING gin (lower(last_name) gin_trgm_ops)
+        """
+    )
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_employee_title_trgm
+        ON public.employee
+        USING gin (lower(title) gin_trgm_ops)
+        """
+    )
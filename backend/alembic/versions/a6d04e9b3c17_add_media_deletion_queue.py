@@ -0,0 +1,65 @@
+"""Add media_deletion queue.
+
+Revision ID: a6d04e9b3c17
+Revises: f3a8c51d7e26
+Create Date: 2026-10-18 16:20:31.774019
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "a6d04e9b3c17"
+down_revision: Union[str, Sequence[str], None] = "f3a8c51d7e26"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "media_deletion",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("storage_key", sa.Text(), nullable=False),
+        sa.Column(
+            "attempts",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+        ),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column(
+            "not_before",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_media_deletion")),
+    )
+    op.create_index(
+        "uq_media_deletion_storage_key",
+        "media_deletion",
+        ["storage_key"],
+        unique=True,
+    )
+    op.create_index(
+        "idx_media_deletion_not_before",
+        "media_deletion",
+        ["not_before"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index("idx_media_deletion_not_before", table_name="media_deletion")
+    op.drop_index("uq_media_deletion_storage_key", table_name="media_deletion")
+    op.drop_table("media_deletion")
@@ -0,0 +1,73 @@
+"""Add employee_skill table mirrored from employee.skill_ratings.
+
+Revision ID: b2e6f9a1c384
+Revises: a4d7e3b92c51
+Create Date: 2026-10-18 22:04:51.318276
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "b2e6f9a1c384"
+down_revision: Union[str, Sequence[str], None] = "a4d7e3b92c51"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "employee_skill",
+        sa.Column("employee_id", sa.BigInteger(), nullable=False),
+        sa.Column("skill", sa.Text(), nullable=False),
+        sa.Column("level", sa.SmallInteger(), nullable=False),
+        sa.CheckConstraint(
+            "level BETWEEN 1 AND 5",
+            name="ck_employee_skill_level",
+        ),
+        sa.ForeignKeyConstraint(
+            ["employee_id"],
+            ["employee.id"],
+            name=op.f("fk_employee_skill_employee_id_employee"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "employee_id",
+            "skill",
+            name=op.f("pk_employee_skill"),
+        ),
+    )
+
+    # нечисловые и вне 1..5 значения в фильтрах и раньше не участвовали
+    op.execute(
+        """
+        INSERT INTO employee_skill (employee_id, skill, level)
+        SELECT e.id, s.key, (s.value #>> '{}')::numeric::smallint
+        FROM employee AS e
+        CROSS JOIN LATERAL jsonb_each(e.skill_ratings) AS s
+        WHERE jsonb_typeof(e.skill_ratings) = 'object'
+          AND jsonb_typeof(s.value) = 'number'
+          AND (s.value #>> '{}')::numeric IN (1, 2, 3, 4, 5)
+        """,
+    )
+
+    # индекс строится после заливки — один проход вместо вставок в дерево
+    op.create_index(
+        "idx_employee_skill_skill_level",
+        "employee_skill",
+        ["skill", "level"],
+        postgresql_include=["employee_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index(
+        "idx_employee_skill_skill_level",
+        table_name="employee_skill",
+    )
+    op.drop_table("employee_skill")
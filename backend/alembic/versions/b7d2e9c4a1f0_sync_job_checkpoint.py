@@ -0,0 +1,59 @@
+"""Add sync_job checkpoint and cancelled status.
+
+Revision ID: b7d2e9c4a1f0
+Revises: e4e1bebb27f7
+Create Date: 2026-10-18 10:12:41.530112
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "b7d2e9c4a1f0"
+down_revision: Union[str, Sequence[str], None] = "e4e1bebb27f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.add_column(
+        "sync_job",
+        sa.Column(
+            "checkpoint",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+        ),
+    )
+    op.drop_constraint(
+        "ck_sync_job_status",
+        "sync_job",
+        type_="check",
+    )
+    op.create_check_constraint(
+        "ck_sync_job_status",
+        "sync_job",
+        "status IN ('running','success','error','partial','cancelled')",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.execute(
+        "UPDATE sync_job SET status = 'error' WHERE status = 'cancelled'",
+    )
+    op.drop_constraint(
+        "ck_sync_job_status",
+        "sync_job",
+        type_="check",
+    )
+    op.create_check_constraint(
+        "ck_sync_job_status",
+        "sync_job",
+        "status IN ('running','success','error','partial')",
+    )
+    op.drop_column("sync_job", "checkpoint")
@@ -0,0 +1,65 @@
+"""Add media_variant for avatar thumbnails.
+
+Revision ID: b81f5c3a9d42
+Revises: a6d04e9b3c17
+Create Date: 2026-10-18 17:05:12.903318
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "b81f5c3a9d42"
+down_revision: Union[str, Sequence[str], None] = "a6d04e9b3c17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "media_variant",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("media_id", sa.BigInteger(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("format", sa.Text(), nullable=False),
+        sa.Column("storage_key", sa.Text(), nullable=False),
+        sa.Column("byte_size", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["media_id"],
+            ["media.id"],
+            name=op.f("fk_media_variant_media_id_media"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_media_variant")),
+    )
+    op.create_index(
+        "uq_media_variant_media_size_format",
+        "media_variant",
+        ["media_id", "size", "format"],
+        unique=True,
+    )
+    op.create_index(
+        "idx_media_variant_storage_key",
+        "media_variant",
+        ["storage_key"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index("idx_media_variant_storage_key", table_name="media_variant")
+    op.drop_index(
+        "uq_media_variant_media_size_format",
+        table_name="media_variant",
+    )
+    op.drop_table("media_variant")
@@ -0,0 +1,45 @@
+"""Add unlogged sync_seen_ref for reconciliation.
+
+Revision ID: c4f8a2d61e9b
+Revises: b7d2e9c4a1f0
+Create Date: 2026-10-18 12:40:07.291845
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "c4f8a2d61e9b"
+down_revision: Union[str, Sequence[str], None] = "b7d2e9c4a1f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # UNLOGGED: данные нужны только на время запуска и не пишутся в WAL
+    op.create_table(
+        "sync_seen_ref",
+        sa.Column("job_id", sa.BigInteger(), nullable=False),
+        sa.Column("ref", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["job_id"],
+            ["sync_job.id"],
+            name=op.f("fk_sync_seen_ref_job_id_sync_job"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "job_id",
+            "ref",
+            name=op.f("pk_sync_seen_ref"),
+        ),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_table("sync_seen_ref")
@@ -0,0 +1,72 @@
+"""Keep employee_skill in sync with employee.skill_ratings via trigger.
+
+Revision ID: c5a2e8f13b47
+Revises: d8c4f1a7e925
+Create Date: 2026-10-18 23:58:12.604517
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "c5a2e8f13b47"
+down_revision: Union[str, Sequence[str], None] = "d8c4f1a7e925"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Правила отбора — как при заливке employee_skill: нечисловые и вне 1..5
+# значения в фильтрах не участвуют
+CREATE_FUNCTION_SQL = """
+CREATE FUNCTION employee_skill_sync() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' THEN
+        DELETE FROM employee_skill WHERE employee_id = NEW.id;
+    END IF;
+    INSERT INTO employee_skill (employee_id, skill, level)
+    SELECT NEW.id, s.key, (s.value #>> '{}')::numeric::smallint
+    FROM jsonb_each(
+        CASE
+            WHEN jsonb_typeof(NEW.skill_ratings) = 'object'
+            THEN NEW.skill_ratings
+            ELSE '{}'::jsonb
+        END
+    ) AS s
+    WHERE jsonb_typeof(s.value) = 'number'
+      AND (s.value #>> '{}')::numeric IN (1, 2, 3, 4, 5);
+    RETURN NULL;
+END;
+$$
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.execute(CREATE_FUNCTION_SQL)
+    op.execute(
+        """
+        CREATE TRIGGER trg_employee_skill_sync_insert
+        AFTER INSERT ON employee
+        FOR EACH ROW
+        WHEN (NEW.skill_ratings IS NOT NULL)
+        EXECUTE FUNCTION employee_skill_sync()
+        """,
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_employee_skill_sync_update
+        AFTER UPDATE OF skill_ratings ON employee
+        FOR EACH ROW
+        WHEN (OLD.skill_ratings IS DISTINCT FROM NEW.skill_ratings)
+        EXECUTE FUNCTION employee_skill_sync()
+        """,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.execute("DROP TRIGGER trg_employee_skill_sync_update ON employee")
+    op.execute("DROP TRIGGER trg_employee_skill_sync_insert ON employee")
+    op.execute("DROP FUNCTION employee_skill_sync()")
@@ -0,0 +1,45 @@
+"""Add indexes for media garbage collection.
+
+Revision ID: c7e2a94f1b68
+Revises: b81f5c3a9d42
+Create Date: 2026-10-18 18:05:12.408316
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "c7e2a94f1b68"
+down_revision: Union[str, Sequence[str], None] = "b81f5c3a9d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_index(
+        "idx_employee_photo_id",
+        "employee",
+        ["photo_id"],
+        unique=False,
+        postgresql_where=sa.text("photo_id IS NOT NULL"),
+    )
+    op.create_index(
+        "idx_photo_moderation_media_id",
+        "photo_moderation",
+        ["media_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index("idx_photo_moderation_media_id", table_name="photo_moderation")
+    op.drop_index(
+        "idx_employee_photo_id",
+        table_name="employee",
+        postgresql_where=sa.text("photo_id IS NOT NULL"),
+    )
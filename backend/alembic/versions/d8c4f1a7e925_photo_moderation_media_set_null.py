@@ -0,0 +1,83 @@
+"""Keep photo moderation history when media is deleted.
+
+Revision ID: d8c4f1a7e925
+Revises: b2e6f9a1c384
+Create Date: 2026-10-18 23:41:07.519384
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "d8c4f1a7e925"
+down_revision: Union[str, Sequence[str], None] = "b2e6f9a1c384"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FK_NAME = "photo_moderation_media_id_fkey"
+
+# Имя внешнего ключа на media в существующих БД не фиксировано (таблица
+# создавалась вне миграций), поэтому ищем его по столбцу
+DROP_MEDIA_FK_SQL = """
+DO $$
+DECLARE
+    fk_name text;
+BEGIN
+    FOR fk_name IN
+        SELECT c.conname
+        FROM pg_constraint c
+        JOIN pg_attribute a
+          ON a.attrelid = c.conrelid AND a.attnum = ANY (c.conkey)
+        WHERE c.conrelid = 'photo_moderation'::regclass
+          AND c.contype = 'f'
+          AND a.attname = 'media_id'
+    LOOP
+        EXECUTE format(
+            'ALTER TABLE photo_moderation DROP CONSTRAINT %I', fk_name
+        );
+    END LOOP;
+END $$;
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.execute(DROP_MEDIA_FK_SQL)
+    op.alter_column(
+        "photo_moderation",
+        "media_id",
+        existing_type=sa.BigInteger(),
+        nullable=True,
+    )
+    op.create_foreign_key(
+        FK_NAME,
+        "photo_moderation",
+        "media",
+        ["media_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_constraint(FK_NAME, "photo_moderation", type_="foreignkey")
+    # Заявки, чьи media уже удалены, без media_id существовать не могут
+    op.execute("DELETE FROM photo_moderation WHERE media_id IS NULL")
+    op.alter_column(
+        "photo_moderation",
+        "media_id",
+        existing_type=sa.BigInteger(),
+        nullable=False,
+    )
+    op.create_foreign_key(
+        FK_NAME,
+        "photo_moderation",
+        "media",
+        ["media_id"],
+        ["id"],
+        ondelete="CASCADE",
+    )
@@ -0,0 +1,83 @@
+"""Add employee_identity registry and employee.external_ref index.
+
+Revision ID: d91b3e7f0a25
+Revises: c4f8a2d61e9b
+Create Date: 2026-10-18 13:55:19.604417
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "d91b3e7f0a25"
+down_revision: Union[str, Sequence[str], None] = "c4f8a2d61e9b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.create_table(
+        "employee_identity",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("source", sa.Text(), nullable=False),
+        sa.Column("external_ref", sa.Text(), nullable=False),
+        sa.Column("employee_id", sa.BigInteger(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["employee_id"],
+            ["employee.id"],
+            name=op.f("fk_employee_identity_employee_id_employee"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_employee_identity")),
+    )
+    op.create_index(
+        "uq_employee_identity_source_external_ref",
+        "employee_identity",
+        ["source", "external_ref"],
+        unique=True,
+    )
+    op.create_index(
+        "idx_employee_identity_employee_id",
+        "employee_identity",
+        ["employee_id"],
+    )
+    op.create_index(
+        "idx_employee_external_ref",
+        "employee",
+        ["external_ref"],
+    )
+
+    # существующие external_ref пришли из AD (или тестового файла в его формате)
+    op.execute(
+        """
+        INSERT INTO employee_identity (source, external_ref, employee_id)
+        SELECT DISTINCT ON (external_ref) 'ad', external_ref, id
+        FROM employee
+        WHERE external_ref IS NOT NULL AND external_ref <> ''
+        ORDER BY external_ref, id
+        """,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index("idx_employee_external_ref", table_name="employee")
+    op.drop_index(
+        "idx_employee_identity_employee_id",
+        table_name="employee_identity",
+    )
+    op.drop_index(
+        "uq_employee_identity_source_external_ref",
+        table_name="employee_identity",
+    )
+    op.drop_table("employee_identity")
@@ -0,0 +1,44 @@
+"""Add media content metadata and sha256 dedup index.
+
+Revision ID: e5b9d2c47a13
+Revises: c7e2a94f1b68
+Create Date: 2026-10-18 19:12:46.530972
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "e5b9d2c47a13"
+down_revision: Union[str, Sequence[str], None] = "c7e2a94f1b68"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.add_column("media", sa.Column("byte_size", sa.BigInteger(), nullable=True))
+    op.add_column("media", sa.Column("content_type", sa.Text(), nullable=True))
+    op.add_column("media", sa.Column("sha256", sa.Text(), nullable=True))
+    op.create_index(
+        "uq_media_sha256",
+        "media",
+        ["sha256"],
+        unique=True,
+        postgresql_where=sa.text("sha256 IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index(
+        "uq_media_sha256",
+        table_name="media",
+        postgresql_where=sa.text("sha256 IS NOT NULL"),
+    )
+    op.drop_column("media", "sha256")
+    op.drop_column("media", "content_type")
+    op.drop_column("media", "byte_size")
@@ -0,0 +1,67 @@
+"""Add unlogged sync_manager_link and sync_dn_ref.
+
+Revision ID: e7b3d5a9c1f4
+Revises: a3f1c7d9e2b4
+Create Date: 2026-10-19 00:24:51.073629
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "e7b3d5a9c1f4"
+down_revision: Union[str, Sequence[str], None] = "a3f1c7d9e2b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # UNLOGGED: данные нужны только на время запуска и не пишутся в WAL
+    op.create_table(
+        "sync_manager_link",
+        sa.Column("job_id", sa.BigInteger(), nullable=False),
+        sa.Column("key", sa.Text(), nullable=False),
+        sa.Column("employee_id", sa.BigInteger(), nullable=True),
+        sa.Column("sub_ref", sa.Text(), nullable=True),
+        sa.Column("manager_ref", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["job_id"],
+            ["sync_job.id"],
+            name=op.f("fk_sync_manager_link_job_id_sync_job"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "job_id",
+            "key",
+            name=op.f("pk_sync_manager_link"),
+        ),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_table(
+        "sync_dn_ref",
+        sa.Column("job_id", sa.BigInteger(), nullable=False),
+        sa.Column("dn", sa.Text(), nullable=False),
+        sa.Column("external_ref", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["job_id"],
+            ["sync_job.id"],
+            name=op.f("fk_sync_dn_ref_job_id_sync_job"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint(
+            "job_id",
+            "dn",
+            name=op.f("pk_sync_dn_ref"),
+        ),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_table("sync_dn_ref")
+    op.drop_table("sync_manager_link")
@@ -0,0 +1,159 @@
+"""Partition sync_record by job_id ranges.
+
+Revision ID: f3a8c51d7e26
+Revises: d91b3e7f0a25
+Create Date: 2026-10-18 15:12:44.180532
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "f3a8c51d7e26"
+down_revision: Union[str, Sequence[str], None] = "d91b3e7f0a25"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_COLUMNS = """
+    id BIGINT NOT NULL DEFAULT nextval('sync_record_id_seq'),
+    job_id BIGINT NOT NULL,
+    external_ref TEXT NOT NULL,
+    action TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error_code TEXT,
+    message TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+    CONSTRAINT ck_sync_record_action
+        CHECK (action IN ('create','update','archive')),
+    CONSTRAINT ck_sync_record_status
+        CHECK (status IN ('applied','error')),
+    CONSTRAINT fk_sync_record_job_id_sync_job FOREIGN KEY (job_id)
+        REFERENCES sync_job (id) ON DELETE CASCADE
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    # старая таблица становится первой партицией: job_id от 0 до
+    # последнего существующего запуска включительно, без копирования строк
+    bind = op.get_bind()
+    hi = bind.execute(
+        sa.text("SELECT COALESCE(MAX(id), 0) + 1 FROM sync_job"),
+    ).scalar()
+
+    op.execute("ALTER TABLE sync_record RENAME TO sync_record_legacy")
+    # ключ партиции должен совпасть с ключом секционированной таблицы:
+    # при ATTACH PARTITION PostgreSQL берёт готовый индекс (job_id, id),
+    # а со вторым первичным ключом присоединение не проходит. Имя старого
+    # ключа зависит от того, как создавалась БД (pk_sync_record или
+    # sync_record_pkey), поэтому оно берётся из каталога
+    op.execute(
+        """
+        DO $$
+        DECLARE pk_name text;
+        BEGIN
+            SELECT conname INTO pk_name
+            FROM pg_constraint
+            WHERE conrelid = 'sync_record_legacy'::regclass AND contype = 'p';
+            IF pk_name IS NOT NULL THEN
+                EXECUTE format(
+                    'ALTER TABLE sync_record_legacy DROP CONSTRAINT %I',
+                    pk_name
+                );
+            END IF;
+        END $$
+        """,
+    )
+    op.execute(
+        "ALTER TABLE sync_record_legacy "
+        "ADD CONSTRAINT pk_sync_record_legacy PRIMARY KEY (job_id, id)",
+    )
+    # FK и индекс по job_id наследуются от секционированной таблицы
+    op.execute(
+        "ALTER TABLE sync_record_legacy "
+        "DROP CONSTRAINT IF EXISTS fk_sync_record_job_id_sync_job",
+    )
+    op.execute("DROP INDEX IF EXISTS idx_sync_record_job_id")
+    op.execute(
+        "ALTER INDEX IF EXISTS idx_sync_record_job_external "
+        "RENAME TO sync_record_legacy_job_external_idx",
+    )
+    op.execute(
+        "ALTER INDEX IF EXISTS idx_sync_record_error_code "
+        "RENAME TO sync_record_legacy_error_code_idx",
+    )
+
+    op.execute(
+        f"""
+        CREATE TABLE sync_record (
+            {_COLUMNS},
+            CONSTRAINT pk_sync_record PRIMARY KEY (job_id, id)
+        ) PARTITION BY RANGE (job_id)
+        """,
+    )
+    op.execute("ALTER SEQUENCE sync_record_id_seq OWNED BY sync_record.id")
+    op.create_index(
+        "idx_sync_record_job_external",
+        "sync_record",
+        ["job_id", "external_ref"],
+    )
+    op.create_index(
+        "idx_sync_record_error_code",
+        "sync_record",
+        ["error_code"],
+    )
+
+    op.execute(
+        "ALTER TABLE sync_record ATTACH PARTITION sync_record_legacy "
+        f"FOR VALUES FROM (0) TO ({hi})",
+    )
+    op.execute(f"ALTER TABLE sync_record_legacy RENAME TO sync_record_j0_{hi}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.execute("ALTER TABLE sync_record RENAME TO sync_record_partitioned")
+    op.execute(
+        "ALTER TABLE sync_record_partitioned "
+        "RENAME CONSTRAINT pk_sync_record TO pk_sync_record_partitioned",
+    )
+    op.execute(
+        "ALTER INDEX idx_sync_record_job_external "
+        "RENAME TO sync_record_partitioned_job_external_idx",
+    )
+    op.execute(
+        "ALTER INDEX idx_sync_record_error_code "
+        "RENAME TO sync_record_partitioned_error_code_idx",
+    )
+
+    op.execute(
+        f"""
+        CREATE TABLE sync_record (
+            {_COLUMNS},
+            CONSTRAINT pk_sync_record PRIMARY KEY (id)
+        )
+        """,
+    )
+    op.execute(
+        "INSERT INTO sync_record "
+        "SELECT id, job_id, external_ref, action, status, error_code, "
+        "message, created_at FROM sync_record_partitioned",
+    )
+    op.execute("ALTER SEQUENCE sync_record_id_seq OWNED BY sync_record.id")
+    op.execute("DROP TABLE sync_record_partitioned")
+
+    op.create_index(
+        "idx_sync_record_job_external",
+        "sync_record",
+        ["job_id", "external_ref"],
+    )
+    op.create_index("idx_sync_record_job_id", "sync_record", ["job_id"])
+    op.create_index(
+        "idx_sync_record_error_code",
+        "sync_record",
+        ["error_code"],
+    )
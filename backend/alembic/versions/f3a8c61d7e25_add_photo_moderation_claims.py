@@ -0,0 +1,73 @@
+"""Add photo moderation claim lease columns.
+
+Revision ID: f3a8c61d7e25
+Revises: e5b9d2c47a13
+Create Date: 2026-10-18 20:03:18.214507
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "f3a8c61d7e25"
+down_revision: Union[str, Sequence[str], None] = "e5b9d2c47a13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+
+    op.add_column(
+        "photo_moderation",
+        sa.Column("claimed_by_employee_id", sa.BigInteger(), nullable=True),
+    )
+    op.add_column(
+        "photo_moderation",
+        sa.Column("claim_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_foreign_key(
+        "photo_moderation_claimed_by_employee_id_fkey",
+        "photo_moderation",
+        "employee",
+        ["claimed_by_employee_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
+    op.create_index(
+        "idx_photo_moderation_claimed_by",
+        "photo_moderation",
+        ["claimed_by_employee_id"],
+        unique=False,
+        postgresql_where=sa.text("claimed_by_employee_id IS NOT NULL"),
+    )
+    op.create_index(
+        "idx_photo_moderation_pending_queue",
+        "photo_moderation",
+        ["created_at", "id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+
+    op.drop_index(
+        "idx_photo_moderation_pending_queue",
+        table_name="photo_moderation",
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.drop_index(
+        "idx_photo_moderation_claimed_by",
+        table_name="photo_moderation",
+        postgresql_where=sa.text("claimed_by_employee_id IS NOT NULL"),
+    )
+    op.drop_constraint(
+        "photo_moderation_claimed_by_employee_id_fkey",
+        "photo_moderation",
+        type_="foreignkey",
+    )
+    op.drop_column("photo_moderation", "claim_expires_at")
+    op.drop_column("photo_moderation", "claimed_by_employee_id")
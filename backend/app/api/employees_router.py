@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-import asyncio
-
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.core.security import get_current_user
 from app.db.session import get_async_session
 from app.models.employee import Employee
@@ -14,21 +13,26 @@ from app.schemas.common import ErrorCode, ErrorResponse
 from app.schemas.employee import (
     EmployeeAdminUpdate,
     EmployeeDetail,
+    EmployeeFacets,
     EmployeeSelfUpdate,
+    FacetValue,
     ManagerInfo,
     OrgUnitInfo,
+    SkillFacetValue,
     SkillOption,
     TitleItem,
 )
 from app.schemas.media import MediaInfo
 from app.services.employee_service import (
+    FacetCount,
     apply_admin_update,
     apply_self_update,
+    count_employee_facets,
     search_employees,
     search_skill_names,
     search_titles,
 )
-from app.services.media_service import resolve_media_public_url
+from app.services.media_service import resolve_media_infos
 from app.utils.encoding import validate_utf8_or_raise
 
 router = APIRouter(
@@ -38,41 +42,19 @@ router = APIRouter(
 )
 
 
-async def _build_employee_detail_by_id(
-    employee_id: int,
-    session: AsyncSession,
+def _employee_to_detail(
+    db_emp: Employee,
+    photo: MediaInfo | None,
 ) -> EmployeeDetail:
-    """Формирует детализированную карточку сотрудника по идентификатору.
+    """Собирает карточку сотрудника из загруженной модели.
 
     Args:
-        employee_id: Идентификатор сотрудника.
-        session: Асинхронная сессия базы данных.
+        db_emp: Сотрудник с загруженными manager, department и direction.
+        photo: Информация о фото сотрудника.
 
     Returns:
         Детализированная информация о сотруднике.
     """
-    db_emp = (
-        await session.execute(
-            select(Employee)
-            .where(Employee.id == employee_id)
-            .options(
-                selectinload(Employee.manager),
-                selectinload(Employee.department),
-                selectinload(Employee.direction),
-            ),
-        )
-    ).scalar_one_or_none()
-
-    if db_emp is None:
-        raise HTTPException(
-            status_code=404,
-            detail=ErrorResponse.single(
-                code=ErrorCode.NOT_FOUND,
-                message="Сотрудник не найден",
-                status=404,
-            ).model_dump(),
-        )
-
     manager_obj: ManagerInfo | None = None
     if db_emp.manager:
         manager_obj = ManagerInfo(
@@ -91,13 +73,6 @@ async def _build_employee_detail_by_id(
             unit_type=lowest_unit.unit_type,
         )
 
-    photo_obj: MediaInfo | None = None
-    pid = getattr(db_emp, "photo_id", None)
-    if pid:
-        url = await resolve_media_public_url(session, pid)
-        if url:
-            photo_obj = MediaInfo(id=pid, public_url=url)
-
     return EmployeeDetail(
         id=db_emp.id,
         email=db_emp.email,
@@ -119,18 +94,126 @@ async def _build_employee_detail_by_id(
         is_admin=bool(db_emp.is_admin),
         is_blocked=bool(db_emp.is_blocked),
         last_login_at=db_emp.last_login_at,
-        photo=photo_obj,
+        photo=photo,
         manager=manager_obj,
         org_unit=org_unit_obj,
     )
 
 
-def _parse_skill_filters(raw_skills: list[str] | None) -> dict[str, int] | None:
-    """Парсит query-параметр навыков в словарь {name: level}.
+async def _build_employee_detail_by_id(
+    employee_id: int,
+    session: AsyncSession,
+) -> EmployeeDetail:
+    """Формирует детализированную карточку сотрудника по идентификатору.
+
+    Args:
+        employee_id: Идентификатор сотрудника.
+        session: Асинхронная сессия базы данных.
+
+    Returns:
+        Детализированная информация о сотруднике.
+    """
+    db_emp = (
+        await session.execute(
+            select(Employee)
+            .where(Employee.id == employee_id)
+            .options(
+                selectinload(Employee.manager),
+                selectinload(Employee.department),
+                selectinload(Employee.direction),
+            ),
+        )
+    ).scalar_one_or_none()
+
+    if db_emp is None:
+        raise HTTPException(
+            status_code=404,
+            detail=ErrorResponse.single(
+                code=ErrorCode.NOT_FOUND,
+                message="Сотрудник не найден",
+                status=404,
+            ).model_dump(),
+        )
+
+    photos = await resolve_media_infos(session, [db_emp.photo_id])
+    return _employee_to_detail(db_emp, photos.get(db_emp.photo_id))
+
+
+async def _build_employee_details(
+    employee_ids: list[int],
+    session: AsyncSession,
+) -> list[EmployeeDetail]:
+    """Формирует карточки для списка сотрудников, сохраняя порядок.
+
+    Сотрудники и их фото загружаются пачкой; фото отдаются превью
+    (MEDIA_LIST_VARIANT_SIZE).
+
+    Args:
+        employee_ids: Идентификаторы сотрудников в нужном порядке.
+        session: Асинхронная сессия базы данных.
+
+    Returns:
+        Список детализированных карточек сотрудников.
+    """
+    if not employee_ids:
+        return []
+
+    rows = await session.execute(
+        select(Employee)
+        .where(Employee.id.in_(employee_ids))
+        .options(
+            selectinload(Employee.manager),
+            selectinload(Employee.department),
+            selectinload(Employee.direction),
+        ),
+    )
+    by_id = {emp.id: emp for emp in rows.scalars().all()}
+    photos = await resolve_media_infos(
+        session,
+        [emp.photo_id for emp in by_id.values()],
+        prefer_size=settings.media_list_variant_size,
+    )
+
+    return [
+        _employee_to_detail(by_id[eid], photos.get(by_id[eid].photo_id))
+        for eid in employee_ids
+        if eid in by_id
+    ]
+
+
+def _parse_skill_level(raw: str) -> tuple[int, int] | None:
+    """Парсит уровень навыка в диапазон (min, max) или None.
+
+    Поддерживаются "4" (ровно 4), ">=4" (от 4), "<=2" (до 2) и "3-5".
+    """
+    raw = raw.strip()
+    try:
+        if raw.startswith(">="):
+            low, high = int(raw[2:]), 5
+        elif raw.startswith("<="):
+            low, high = 1, int(raw[2:])
+        elif "-" in raw:
+            low_part, high_part = raw.split("-", 1)
+            low, high = int(low_part), int(high_part)
+        else:
+            low = high = int(raw)
+    except ValueError:
+        return None
+
+    if not 1 <= low <= high <= 5:
+        return None
+    return low, high
+
+
+def _parse_skill_filters(
+    raw_skills: list[str] | None,
+) -> dict[str, tuple[int, int]] | None:
+    """Парсит query-параметр навыков в словарь {name: (min, max)}.
 
     Формат элемента списка: "<skill_name>:<level>", где:
     * skill_name — строка;
-    * level — int в диапазоне 1..5.
+    * level — уровень 1..5 ("4"), нижняя или верхняя граница (">=4",
+      "<=2") или диапазон ("3-5").
 
     Используются не более трёх навыков.
     Некорректный ввод игнорируется.
@@ -139,12 +222,13 @@ def _parse_skill_filters(raw_skills: list[str] | None) -> dict[str, int] | None:
         raw_skills: Список строковых представлений навыков и уровней.
 
     Returns:
-        Словарь вида {название_навыка: уровень} или None.
+        Словарь вида {название_навыка: (мин. уровень, макс. уровень)}
+        или None.
     """
     if not raw_skills:
         return None
 
-    result: dict[str, int] = {}
+    result: dict[str, tuple[int, int]] = {}
     for item in raw_skills:
         if not item:
             continue
@@ -152,20 +236,16 @@ def _parse_skill_filters(raw_skills: list[str] | None) -> dict[str, int] | None:
         if ":" not in item:
             continue
 
-        name_part, level_part = item.split(":", 1)
+        name_part, level_part = item.rsplit(":", 1)
         name = name_part.strip()
         if not name:
             continue
 
-        try:
-            level = int(level_part)
-        except ValueError:
-            continue
-
-        if level < 1 or level > 5:
+        levels = _parse_skill_level(level_part)
+        if levels is None:
             continue
 
-        result[name] = level
+        result[name] = levels
         if len(result) >= 3:
             break
 
@@ -201,8 +281,10 @@ async def list_employees(
     skills: list[str] | None = Query(
         default=None,
         description=(
-            "Фильтр по навыкам, формат элемента: 'skill_name:level'. "
-            "Можно передать до 3 значений. Совпадение по точному уровню."
+            "Фильтр по навыкам, формат элемента: 'skill_name:level', "
+            "где level — точный уровень ('4'), граница ('>=4', '<=2') "
+            "или диапазон ('3-5'). Можно передать до 3 значений, "
+            "сотрудник должен подходить под все."
         ),
     ),
     titles: list[str] | None = Query(
@@ -237,7 +319,8 @@ async def list_employees(
 
     Args:
         q: Поисковая строка для полнотекстового поиска.
-        skills: Фильтр по навыкам в формате 'skill_name:level'.
+        skills: Фильтр по навыкам в формате 'skill_name:level'
+            (уровень, граница или диапазон).
         titles: Фильтр по полным названиям должностей.
         legal_entity_ids: Список идентификаторов юрлиц для фильтрации.
         limit: Максимальное количество записей в ответе.
@@ -261,11 +344,76 @@ async def list_employees(
         limit=limit,
         offset=offset,
     )
-    ids = [e.id for e in rows]
-    items = await asyncio.gather(
-        *(_build_employee_detail_by_id(eid, session) for eid in ids),
+    return await _build_employee_details([e.id for e in rows], session)
+
+
+def _facet_values(items: list[FacetCount]) -> list[FacetValue]:
+    """Переводит счётчики фасета из сервиса в элементы ответа."""
+    return [
+        FacetValue(value=item.value, count=item.count, id=item.id)
+        for item in items
+    ]
+
+
+@router.get("/facets", response_model=EmployeeFacets)
+async def employee_facets(
+    q: str | None = Query(
+        None,
+        description="Поисковая строка (UTF-8 percent-encoded), как в списке.",
+    ),
+    skills: list[str] | None = Query(
+        default=None,
+        description="Фильтр по навыкам, как в списке: 'skill_name:level'.",
+    ),
+    titles: list[str] | None = Query(
+        default=None,
+        description="Фильтр по должностям: список полных названий должности.",
+    ),
+    legal_entity_ids: list[int] | None = Query(
+        default=None,
+        description="Фильтр по юр. лицам: список org_unit_id.",
+    ),
+    session: AsyncSession = Depends(get_async_session),
+) -> EmployeeFacets:
+    """Возвращает счётчики фасетов для панели фильтров.
+
+    Принимает те же фильтры, что и список сотрудников (без пагинации), и
+    считает по найденным сотрудникам должности, юрлица, департаменты,
+    города, форматы работы и уровни навыков.
+
+    Args:
+        q: Поисковая строка для полнотекстового поиска.
+        skills: Фильтр по навыкам в формате 'skill_name:level'.
+        titles: Фильтр по полным названиям должностей.
+        legal_entity_ids: Список идентификаторов юрлиц для фильтрации.
+        session: Асинхронная сессия базы данных.
+
+    Returns:
+        Счётчики по каждому фасету.
+    """
+    validate_utf8_or_raise(q)
+
+    facets = await count_employee_facets(
+        session,
+        q,
+        skill_filters=_parse_skill_filters(skills),
+        titles=titles or None,
+        legal_entity_ids=legal_entity_ids or None,
+    )
+
+    return EmployeeFacets(
+        total=facets.total,
+        truncated=facets.truncated,
+        titles=_facet_values(facets.titles),
+        legal_entities=_facet_values(facets.legal_entities),
+        departments=_facet_values(facets.departments),
+        work_cities=_facet_values(facets.work_cities),
+        work_formats=_facet_values(facets.work_formats),
+        skills=[
+            SkillFacetValue(skill=item.skill, level=item.level, count=item.count)
+            for item in facets.skills
+        ],
     )
-    return list(items)
 
 
 @router.get("/skills/search", response_model=list[SkillOption])
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import mimetypes
+import os
+
+import anyio
+from fastapi import APIRouter, Query, Request, Response, status
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core.errors import http_error
+from app.schemas.common import ErrorCode
+from app.services.storage import (
+    LocalStorageBackend,
+    UploadRejected,
+    get_storage_backend,
+)
+from app.services.storage_service import IMMUTABLE_CACHE_CONTROL, MEDIA_VARIANT_PREFIX
+
+# Роутер подключается только при STORAGE_BACKEND=local. Авторизации по
+# токену нет: чтение публично (как публичный бакет), запись — по
+# подписанному URL из /media/uploads/init.
+router = APIRouter(
+    prefix="/media/files",
+    tags=["Media"],
+)
+
+
+def _backend() -> LocalStorageBackend:
+    backend = get_storage_backend()
+    if not isinstance(backend, LocalStorageBackend):
+        raise http_error(status.HTTP_404_NOT_FOUND, ErrorCode.NOT_FOUND, "Not found")
+    return backend
+
+
+def _etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+@router.api_route("/{storage_key:path}", methods=["GET", "HEAD"])
+async def get_file(storage_key: str, request: Request) -> Response:
+    """Отдаёт файл локального хранилища.
+
+    Файл отправляется FileResponse (sendfile, если сервер поддерживает
+    расширение pathsend), с ETag и поддержкой Range. Превью, ключ
+    которых выведен из содержимого, кешируются навсегда; остальные
+    объекты клиент перепроверяет по ETag (If-None-Match → 304).
+
+    Args:
+        storage_key: Ключ хранения объекта.
+        request: Входящий запрос (заголовки If-None-Match и Range).
+
+    Returns:
+        Содержимое файла или 304 Not Modified.
+
+    Raises:
+        HTTPException: Файл не найден.
+    """
+    backend = _backend()
+    try:
+        path = backend.path_for(storage_key)
+        stat = await anyio.to_thread.run_sync(path.stat)
+    except (ValueError, FileNotFoundError, NotADirectoryError):
+        raise http_error(
+            status.HTTP_404_NOT_FOUND,
+            ErrorCode.NOT_FOUND,
+            "File not found",
+        )
+
+    etag = _etag(stat)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            IMMUTABLE_CACHE_CONTROL
+            if storage_key.startswith(MEDIA_VARIANT_PREFIX)
+            else "no-cache"
+        ),
+    }
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return FileResponse(
+        path,
+        media_type=mimetypes.guess_type(storage_key)[0] or "application/octet-stream",
+        headers=headers,
+        stat_result=stat,
+    )
+
+
+@router.put("/{storage_key:path}")
+async def put_file(
+    storage_key: str,
+    request: Request,
+    expires: int = Query(...),
+    signature: str = Query(...),
+    sha256: str | None = Query(None),
+) -> Response:
+    """Принимает файл по подписанному URL (аналог presigned PUT в S3).
+
+    Тело читается потоком и пишется на диск кусками, целиком в памяти
+    файл не держится. Content-Type и SHA-256 (если был указан при init)
+    должны совпасть с подписанными.
+
+    Args:
+        storage_key: Ключ хранения объекта.
+        request: Входящий запрос с телом файла.
+        expires: Срок действия ссылки (unix time).
+        signature: HMAC-подпись ссылки.
+        sha256: Ожидаемый SHA-256 файла.
+
+    Returns:
+        Пустой ответ 200 с ETag сохранённого файла.
+
+    Raises:
+        HTTPException: Подпись неверна или истекла, файл слишком большой
+            или не совпала контрольная сумма.
+    """
+    backend = _backend()
+    try:
+        valid = backend.verify_upload(
+            storage_key,
+            expires=expires,
+            content_type=request.headers.get("content-type"),
+            sha256=sha256,
+            signature=signature,
+        )
+    except ValueError:
+        valid = False
+    if not valid:
+        raise http_error(
+            status.HTTP_403_FORBIDDEN,
+            ErrorCode.AUTH_FORBIDDEN,
+            "Invalid or expired upload signature",
+        )
+
+    max_bytes = settings.storage_local_max_upload_bytes
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise http_error(
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            ErrorCode.BAD_REQUEST,
+            f"Upload exceeds {max_bytes} bytes",
+        )
+
+    try:
+        await backend.write_stream(
+            storage_key,
+            request.stream(),
+            max_bytes=max_bytes,
+            sha256=sha256,
+        )
+    except UploadRejected as exc:
+        raise http_error(status.HTTP_400_BAD_REQUEST, ErrorCode.BAD_REQUEST, str(exc))
+
+    stat = await anyio.to_thread.run_sync(backend.path_for(storage_key).stat)
+    return Response(status_code=status.HTTP_200_OK, headers={"ETag": _etag(stat)})
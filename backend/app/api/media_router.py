@@ -1,22 +1,31 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import insert, select
+import tempfile
+import zipfile
+
+import anyio
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.errors import http_error
 from app.core.security import get_current_user
 from app.db.session import get_async_session
 from app.models.employee import Employee
-from app.models.media import Media
-from app.schemas.common import ErrorCode, ErrorResponse
+from app.schemas.common import ErrorCode
 from app.schemas.media import (
+    AvatarImportResponse,
     FinalizeUploadRequest,
     InitUploadRequest,
     InitUploadResponse,
     MediaItem,
 )
+from app.services.avatar_import import ZipAvatarSource, import_avatars
+from app.services.media_service import finalize_media_upload
+from app.services.media_variants import try_generate_media_variants
 from app.services.storage_service import (
     guess_ext_from_mime,
+    is_upload_key,
     make_storage_key,
     object_public_url,
     presign_put_url,
@@ -46,17 +55,21 @@ async def init_upload(
     Returns:
         InitUploadResponse: Данные для загрузки файла и публичный URL.
     """
+    sha256 = payload.sha256.lower() if payload.sha256 else None
     ext = guess_ext_from_mime(payload.content_type)
-    key = make_storage_key(ext)
+    key = make_storage_key(ext, sha256=sha256)
     info = presign_put_url(
         key,
         content_type=payload.content_type,
+        sha256=sha256,
         expires_seconds=900,
     )
+
     return InitUploadResponse(
         storage_key=info.storage_key,
         upload_url=info.presigned_url,
         public_url=info.public_url,
+        upload_headers=info.upload_headers,
     )
 
 
@@ -72,6 +85,9 @@ async def finalize_upload(
 ) -> MediaItem:
     """Завершает загрузку файла и создает запись в таблице медиа.
 
+    Объект проверяется в хранилище; если такой файл уже загружен,
+    возвращается существующая запись, а дубликат удаляется.
+
     Args:
         payload: Данные о загруженном объекте хранилища.
         session: Асинхронная сессия базы данных.
@@ -81,44 +97,139 @@ async def finalize_upload(
         MediaItem: Информация о медиа-объекте.
 
     Raises:
-        HTTPException: Ошибка создания записи о медиа-объекте.
+        HTTPException: Некорректный ключ, объекта нет в хранилище или
+            не удалось создать запись о медиа-объекте.
     """
-    # Уникальность storage_key обеспечивается ограничением uq_media_storage_key
-    stmt = (
-        insert(Media)
-        .values(storage_key=payload.storage_key)
-        .returning(Media.id, Media.storage_key)
-    )
+    if not is_upload_key(payload.storage_key):
+        raise http_error(
+            status.HTTP_400_BAD_REQUEST,
+            ErrorCode.BAD_REQUEST,
+            "Некорректный ключ хранения",
+        )
+
     try:
-        row = (await session.execute(stmt)).one()
-        await session.commit()
-    except Exception as e:
+        media = await finalize_media_upload(session, payload.storage_key)
+        if media is not None:
+            await session.commit()
+    except Exception:
         await session.rollback()
-        existing = (
-            await session.execute(
-                select(Media).where(Media.storage_key == payload.storage_key),
-            )
-        ).one_or_none()
-        if existing:
-            media_id = existing[0].id if hasattr(existing[0], "id") else existing[0]
-            return MediaItem(
-                id=media_id,
-                storage_key=payload.storage_key,
-                public_url=object_public_url(payload.storage_key),
-            )
+        raise http_error(
+            status.HTTP_400_BAD_REQUEST,
+            ErrorCode.BAD_REQUEST,
+            "Не удалось завершить загрузку файла",
+        )
 
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=ErrorResponse.single(
-                code=ErrorCode.BAD_REQUEST,
-                message="Не удалось завершить загрузку файла",
-                status=400,
-            ).model_dump(),
+    if media is None:
+        raise http_error(
+            status.HTTP_400_BAD_REQUEST,
+            ErrorCode.BAD_REQUEST,
+            "Файл не найден в хранилище: загрузка не завершена",
         )
 
-    media_id = row.id if hasattr(row, "id") else row[0]
+    # превью строятся сразу; при сбое клиенты получают оригинал
+    # (для дубликата уже готовые размеры не пересоздаются)
+    await try_generate_media_variants(session, media)
+    await session.commit()
+
     return MediaItem(
-        id=media_id,
-        storage_key=payload.storage_key,
-        public_url=object_public_url(payload.storage_key),
+        id=media.id,
+        storage_key=media.storage_key,
+        public_url=object_public_url(media.storage_key),
+        byte_size=media.byte_size,
+        content_type=media.content_type,
+        sha256=media.sha256,
+    )
+
+
+@router.post(
+    "/imports/avatars",
+    response_model=AvatarImportResponse,
+)
+async def import_avatars_archive(
+    request: Request,
+    bypass_moderation: bool = Query(
+        False,
+        description="Сразу ставить фото аватаром, без заявок на модерацию",
+    ),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Employee = Depends(get_current_user),
+) -> AvatarImportResponse:
+    """Массово импортирует аватары из ZIP-архива (только администратор).
+
+    Тело запроса — сам архив (Content-Type: application/zip). Имя файла
+    в архиве — email или внешний идентификатор сотрудника. Архив
+    пишется во временный файл потоком, записи из него не распаковываются:
+    каждое фото читается, обрабатывается и загружается в хранилище
+    отдельно, с ограниченным параллелизмом.
+
+    Args:
+        request: Входящий запрос с архивом в теле.
+        bypass_moderation: Ставить фото без модерации.
+        session: Асинхронная сессия базы данных.
+        current_user: Текущий пользователь.
+
+    Returns:
+        AvatarImportResponse: Итог импорта по файлам.
+
+    Raises:
+        HTTPException: Нет прав, архив слишком большой или повреждён.
+    """
+    if not current_user.is_admin:
+        raise http_error(
+            status.HTTP_403_FORBIDDEN,
+            ErrorCode.AUTH_FORBIDDEN,
+            "Требуются права администратора",
+        )
+
+    max_bytes = settings.media_import_max_archive_bytes
+    too_large = http_error(
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        ErrorCode.BAD_REQUEST,
+        f"Архив больше {max_bytes} байт",
+    )
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise too_large
+
+    async with anyio.wrap_file(tempfile.TemporaryFile()) as archive:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > max_bytes:
+                raise too_large
+            await archive.write(chunk)
+        await archive.seek(0)
+
+        try:
+            source = await anyio.to_thread.run_sync(
+                ZipAvatarSource,
+                archive.wrapped,
+            )
+        except zipfile.BadZipFile:
+            raise http_error(
+                status.HTTP_400_BAD_REQUEST,
+                ErrorCode.BAD_REQUEST,
+                "Тело запроса не является ZIP-архивом",
+            )
+
+        try:
+            result = await import_avatars(
+                session,
+                source,
+                bypass_moderation=bypass_moderation,
+                reviewer_id=current_user.id,
+            )
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            source.close()
+
+    return AvatarImportResponse(
+        imported=result.imported,
+        pending_moderation=result.pending_moderation,
+        unchanged=result.unchanged,
+        unmatched=result.unmatched,
+        failed=result.failed,
     )
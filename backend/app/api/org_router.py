@@ -5,6 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.core.config import settings
 from app.core.security import get_current_user
 from app.db.session import get_async_session
 from app.models.employee import Employee
@@ -19,7 +20,7 @@ from app.schemas.org_structure import (
     OrgUnitSearchItem,
 )
 from app.services.employee_service import search_employees
-from app.services.media_service import resolve_media_public_url
+from app.services.media_service import resolve_media_infos
 from app.services.org_unit_service import (
     build_org_tree,
     list_domains,
@@ -342,11 +343,15 @@ async def list_unit_employees(
         HTTPException: При внутренней ошибке сервера.
     """
 
-    async def _to_detail(e: Employee) -> EmployeeDetail:
+    def _to_detail(
+        e: Employee,
+        photos: dict[int, MediaInfo],
+    ) -> EmployeeDetail:
         """Преобразует ORM-модель сотрудника в детальную схему.
 
         Args:
             e: ORM-модель сотрудника.
+            photos: Фото сотрудников по media_id (превью для списка).
 
         Returns:
             Детализированная схема сотрудника.
@@ -369,14 +374,7 @@ async def list_unit_employees(
                 unit_type=lowest_unit.unit_type,
             )
 
-        photo_obj: MediaInfo | None = None
-        if e.photo_id:
-            url = await resolve_media_public_url(session, e.photo_id)
-            if url:
-                photo_obj = MediaInfo(
-                    id=e.photo_id,
-                    public_url=url,
-                )
+        photo_obj: MediaInfo | None = photos.get(e.photo_id)
 
         return EmployeeDetail(
             id=e.id,
@@ -425,12 +423,17 @@ async def list_unit_employees(
             ),
         )
         by_id = {e.id: e for e in full_rows.scalars().all()}
+        photos = await resolve_media_infos(
+            session,
+            [e.photo_id for e in by_id.values()],
+            prefer_size=settings.media_list_variant_size,
+        )
 
         items: list[EmployeeDetail] = []
         for eid in ids:
             employee = by_id.get(eid)
             if employee is not None:
-                items.append(await _to_detail(employee))
+                items.append(_to_detail(employee, photos))
 
         return items
     except Exception as exc:
@@ -1,33 +1,47 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Path
+from datetime import datetime
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import get_current_user
 from app.db.session import get_async_session
 from app.models.employee import Employee
+from app.models.media import Media
 from app.models.photo_moderation import PhotoModeration
 from app.schemas.common import ErrorCode, ErrorResponse
 from app.schemas.media import MediaInfo
 from app.schemas.photo_moderation import (
+    BatchDecisionOutcome,
+    BatchDecisionPayload,
+    BatchDecisionResult,
     CreateModerationRequestMe,
     DecisionPayload,
+    ModerationClaimList,
     ModerationList,
     MyModerationStatus,
     PhotoModerationItem,
 )
-from app.services.media_service import resolve_media_public_url
 from app.services.photo_moderation_service import (
     BadRequest,
     Conflict,
+    ModerationError,
+    ModerationPage,
     NotFound,
     approve,
+    claim_pending,
     create_or_replace_request_for_employee,
+    decide_batch,
     get_latest_for_employee,
-    list_pending,
+    list_history_page,
+    list_pending_page,
     reject,
+    release_claims,
 )
+from app.services.storage_service import object_public_url, object_public_urls
 
 router = APIRouter(
     prefix="/photo-moderation",
@@ -56,70 +70,37 @@ def _ensure_admin(user: Employee) -> None:
         )
 
 
-async def _fetch_employee_names(
-    session: AsyncSession,
-    employee_ids: list[int],
-) -> dict[int, tuple[str, str | None, str]]:
-    """Загружает ФИО сотрудников одной пачкой.
-
-    Args:
-        session: Асинхронная сессия базы данных.
-        employee_ids: Список идентификаторов сотрудников.
+def _error_code(exc: ModerationError) -> ErrorCode:
+    """Код ошибки API для доменного исключения модерации."""
+    if isinstance(exc, NotFound):
+        return ErrorCode.NOT_FOUND
+    if isinstance(exc, Conflict):
+        return ErrorCode.CONFLICT
+    return ErrorCode.BAD_REQUEST
 
-    Returns:
-        dict[int, tuple[str, str | None, str]]: Словарь вида
-            {employee_id: (first_name, middle_name, last_name)}.
-    """
-    if not employee_ids:
-        return {}
 
-    rows = await session.execute(
-        select(
-            Employee.id,
-            Employee.first_name,
-            Employee.middle_name,
-            Employee.last_name,
-        ).where(
-            Employee.id.in_(set(employee_ids)),
-        ),
-    )
-    return {eid: (fn, mn, ln) for eid, fn, mn, ln in rows.all()}
-
-
-async def _to_item(
+def _build_item(
     pm: PhotoModeration,
-    session: AsyncSession,
-    *,
-    name_cache: dict[int, tuple[str, str | None, str]] | None = None,
+    first: str,
+    middle: str | None,
+    last: str,
+    photo_url: str | None,
 ) -> PhotoModerationItem:
-    """Преобразует запись модерации фото в схему ответа.
+    """Собирает схему ответа из заявки и уже загруженных данных.
 
     Args:
         pm: Запись модерации фото.
-        session: Асинхронная сессия базы данных.
-        name_cache: Опциональный кеш ФИО сотрудников.
+        first: Имя сотрудника.
+        middle: Отчество сотрудника.
+        last: Фамилия сотрудника.
+        photo_url: URL фото или None.
 
     Returns:
         PhotoModerationItem: Схема с данными по модерации фото.
     """
-    # Фото
-    url = await resolve_media_public_url(session, pm.media_id)
-    photo = MediaInfo(id=pm.media_id, public_url=url) if pm.media_id else None
-
-    # ФИО
-    if name_cache and pm.employee_id in name_cache:
-        first, middle, last = name_cache[pm.employee_id]
-    else:
-        row = await session.execute(
-            select(
-                Employee.first_name,
-                Employee.middle_name,
-                Employee.last_name,
-            ).where(
-                Employee.id == pm.employee_id,
-            ),
-        )
-        first, middle, last = row.one()
+    photo = None
+    if pm.media_id:
+        photo = MediaInfo(id=pm.media_id, public_url=photo_url)
 
     return PhotoModerationItem(
         id=pm.id,
@@ -132,10 +113,61 @@ async def _to_item(
         reviewed_at=pm.reviewed_at,
         reject_reason=pm.reject_reason,
         created_at=pm.created_at,
+        claimed_by_employee_id=pm.claimed_by_employee_id,
+        claim_expires_at=pm.claim_expires_at,
         photo=photo,
     )
 
 
+def _page_to_list(page: ModerationPage) -> ModerationList:
+    """Собирает ответ со страницей заявок; URL фото — одной пачкой.
+
+    Args:
+        page: Страница заявок из сервиса.
+
+    Returns:
+        ModerationList: Заявки, курсор следующей страницы и общее число.
+    """
+    # presigned GET для приватного бакета подписываются пачкой
+    urls = object_public_urls([row[-1] for row in page.rows if row[-1]])
+    return ModerationList(
+        items=[
+            _build_item(*row[:-1], urls.get(row[-1]) if row[-1] else None)
+            for row in page.rows
+        ],
+        next_cursor=page.next_cursor,
+        total=page.total,
+    )
+
+
+async def _to_item(
+    pm: PhotoModeration,
+    session: AsyncSession,
+) -> PhotoModerationItem:
+    """Преобразует одну запись модерации фото в схему ответа.
+
+    Args:
+        pm: Запись модерации фото.
+        session: Асинхронная сессия базы данных.
+
+    Returns:
+        PhotoModerationItem: Схема с данными по модерации фото.
+    """
+    row = await session.execute(
+        select(
+            Employee.first_name,
+            Employee.middle_name,
+            Employee.last_name,
+            Media.storage_key,
+        )
+        .outerjoin(Media, Media.id == pm.media_id)
+        .where(Employee.id == pm.employee_id),
+    )
+    first, middle, last, storage_key = row.one()
+    url = object_public_url(storage_key) if storage_key else None
+    return _build_item(pm, first, middle, last, url)
+
+
 @router.post(
     "/requests/me",
     response_model=PhotoModerationItem,
@@ -194,26 +226,206 @@ async def create_my_request(
     response_model=ModerationList,
 )
 async def get_pending(
+    limit: int = Query(
+        50,
+        ge=1,
+        le=200,
+        description="Размер страницы.",
+    ),
+    cursor: str | None = Query(
+        default=None,
+        description="Курсор следующей страницы (next_cursor из ответа).",
+    ),
     session: AsyncSession = Depends(get_async_session),
     current_user: Employee = Depends(get_current_user),
 ) -> ModerationList:
-    """Возвращает список заявок на модерацию в статусе pending.
+    """Возвращает страницу заявок на модерацию в статусе pending.
+
+    Заявки отсортированы от старых к новым; страница и общее число
+    заявок читаются одним запросом.
 
     Args:
+        limit: Размер страницы.
+        cursor: Курсор следующей страницы.
         session: Асинхронная сессия базы данных.
         current_user: Текущий пользователь.
 
     Returns:
-        ModerationList: Список заявок на модерацию.
+        ModerationList: Страница заявок, курсор следующей и общее число.
+
+    Raises:
+        HTTPException: Если курсор некорректен.
     """
     _ensure_admin(current_user)
 
-    pms = await list_pending(session)
-    emp_ids = [pm.employee_id for pm in pms]
-    names = await _fetch_employee_names(session, emp_ids)
+    try:
+        page = await list_pending_page(session, limit=limit, cursor=cursor)
+    except BadRequest as e:
+        raise HTTPException(
+            status_code=400,
+            detail=ErrorResponse.single(
+                code=ErrorCode.BAD_REQUEST,
+                message=str(e),
+                status=400,
+            ).model_dump(),
+        )
+
+    return _page_to_list(page)
+
+
+@router.get(
+    "/history",
+    response_model=ModerationList,
+)
+async def get_history(
+    status: list[Literal["pending", "approved", "rejected"]] | None = Query(
+        default=None,
+        description="Статусы заявок (можно несколько).",
+    ),
+    reviewer_id: int | None = Query(
+        default=None,
+        gt=0,
+        description="Кто принял решение.",
+    ),
+    employee_id: int | None = Query(
+        default=None,
+        gt=0,
+        description="Чья заявка.",
+    ),
+    created_from: datetime | None = Query(
+        default=None,
+        description="Заявки, созданные не раньше этого момента.",
+    ),
+    created_to: datetime | None = Query(
+        default=None,
+        description="Заявки, созданные раньше этого момента.",
+    ),
+    limit: int = Query(
+        50,
+        ge=1,
+        le=200,
+        description="Размер страницы.",
+    ),
+    cursor: str | None = Query(
+        default=None,
+        description="Курсор следующей страницы (next_cursor из ответа).",
+    ),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Employee = Depends(get_current_user),
+) -> ModerationList:
+    """Возвращает историю заявок на модерацию с фильтрами.
 
-    items = [await _to_item(pm, session, name_cache=names) for pm in pms]
-    return ModerationList(items=items)
+    Заявки отсортированы от новых к старым; пагинация — по курсору.
+    Курсор действителен только с теми же фильтрами.
+
+    Args:
+        status: Статусы заявок.
+        reviewer_id: Идентификатор проверяющего.
+        employee_id: Идентификатор сотрудника.
+        created_from: Начало периода (включительно).
+        created_to: Конец периода (не включительно).
+        limit: Размер страницы.
+        cursor: Курсор следующей страницы.
+        session: Асинхронная сессия базы данных.
+        current_user: Текущий пользователь.
+
+    Returns:
+        ModerationList: Страница заявок, курсор следующей и общее число.
+
+    Raises:
+        HTTPException: Если курсор или период некорректны.
+    """
+    _ensure_admin(current_user)
+
+    try:
+        page = await list_history_page(
+            session,
+            limit=limit,
+            cursor=cursor,
+            statuses=status,
+            reviewer_id=reviewer_id,
+            employee_id=employee_id,
+            created_from=created_from,
+            created_to=created_to,
+        )
+    except BadRequest as e:
+        raise HTTPException(
+            status_code=400,
+            detail=ErrorResponse.single(
+                code=ErrorCode.BAD_REQUEST,
+                message=str(e),
+                status=400,
+            ).model_dump(),
+        )
+
+    return _page_to_list(page)
+
+
+@router.post(
+    "/claims",
+    response_model=ModerationClaimList,
+)
+async def claim_requests(
+    limit: int = Query(
+        20,
+        ge=1,
+        le=100,
+        description="Сколько заявок взять в работу.",
+    ),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Employee = Depends(get_current_user),
+) -> ModerationClaimList:
+    """Выдаёт модератору следующие pending-заявки в аренду.
+
+    Параллельно работающие модераторы получают непересекающиеся наборы
+    заявок; свои ещё не истёкшие заявки возвращаются снова с продлённым
+    сроком. По истечении аренды заявки возвращаются в общую очередь.
+
+    Args:
+        limit: Сколько заявок взять в работу.
+        session: Асинхронная сессия базы данных.
+        current_user: Текущий пользователь.
+
+    Returns:
+        ModerationClaimList: Выданные заявки и срок аренды.
+    """
+    _ensure_admin(current_user)
+
+    claim = await claim_pending(session, reviewer_id=current_user.id, limit=limit)
+    await session.commit()
+
+    urls = object_public_urls([row[-1] for row in claim.rows if row[-1]])
+    return ModerationClaimList(
+        items=[
+            _build_item(*row[:-1], urls.get(row[-1]) if row[-1] else None)
+            for row in claim.rows
+        ],
+        claim_expires_at=claim.expires_at,
+    )
+
+
+@router.delete(
+    "/claims",
+    status_code=204,
+)
+async def release_my_claims(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Employee = Depends(get_current_user),
+) -> Response:
+    """Возвращает в очередь все заявки, арендованные текущим модератором.
+
+    Args:
+        session: Асинхронная сессия базы данных.
+        current_user: Текущий пользователь.
+
+    Returns:
+        Response: Пустой ответ 204.
+    """
+    _ensure_admin(current_user)
+
+    await release_claims(session, reviewer_id=current_user.id)
+    await session.commit()
+    return Response(status_code=204)
 
 
 @router.post(
@@ -291,6 +503,62 @@ async def decide_request(
         )
 
 
+@router.post(
+    "/decisions",
+    response_model=BatchDecisionResult,
+)
+async def decide_requests(
+    payload: BatchDecisionPayload,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Employee = Depends(get_current_user),
+) -> BatchDecisionResult:
+    """Принимает пакет решений по заявкам на модерацию фото.
+
+    Все решения применяются в одной транзакции; ошибка по одной заявке
+    (не найдена, уже обработана, арендована другим модератором) не
+    отменяет остальные и возвращается в итоге этой заявки.
+
+    Args:
+        payload: Решения по заявкам.
+        session: Асинхронная сессия базы данных.
+        current_user: Текущий пользователь.
+
+    Returns:
+        BatchDecisionResult: Итоги по каждой заявке в порядке запроса.
+    """
+    _ensure_admin(current_user)
+
+    try:
+        outcomes = await decide_batch(
+            session,
+            decisions=[
+                (item.moderation_id, item.decision, item.reason)
+                for item in payload.items
+            ],
+            reviewer_id=current_user.id,
+        )
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+
+    items = [
+        BatchDecisionOutcome(
+            moderation_id=outcome.moderation_id,
+            status=outcome.status,
+            error_code=_error_code(outcome.error) if outcome.error else None,
+            message=str(outcome.error) if outcome.error else None,
+        )
+        for outcome in outcomes
+    ]
+    return BatchDecisionResult(
+        items=items,
+        approved=sum(item.status == "approved" for item in items),
+        rejected=sum(item.status == "rejected" for item in items),
+        failed=sum(item.status is None for item in items),
+    )
+
+
 @router.get(
     "/me/status",
     response_model=MyModerationStatus,
@@ -10,7 +10,6 @@ from fastapi import (
 )
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app.core.security import get_current_user
 from app.db.session import get_async_session
@@ -18,13 +17,18 @@ from app.models.employee import Employee
 from app.models.sync import SyncJob, SyncRecord
 from app.schemas.common import ErrorCode, ErrorResponse
 from app.schemas.sync import (
+    SyncJobCheckpoint,
     SyncJobDetail,
     SyncJobListItem,
     SyncJobRunResponse,
     SyncJobSummary,
     SyncRecordItem,
 )
-from app.services.sync.runner import run_employee_sync
+from app.services.sync.runner import (
+    SyncJobBusyError,
+    SyncResumeError,
+    run_employee_sync,
+)
 
 router = APIRouter(
     prefix="/sync",
@@ -99,6 +103,77 @@ async def run_sync_job(
     )
 
 
+@router.post(
+    "/jobs/{job_id}/resume",
+    response_model=SyncJobRunResponse,
+)
+async def resume_sync_job(
+    job_id: int = PathParam(..., gt=0),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Employee = Depends(get_current_user),
+) -> SyncJobRunResponse:
+    """Продолжает прерванный запуск синхронизации с его checkpoint."""
+    _ensure_admin(current_user)
+
+    if await session.get(SyncJob, job_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ErrorResponse.single(
+                code=ErrorCode.NOT_FOUND,
+                message="Запуск синхронизации не найден",
+                status=404,
+            ).model_dump(),
+        )
+
+    try:
+        summary_dict = await run_employee_sync(
+            session,
+            resume_job_id=job_id,
+        )
+    except SyncJobBusyError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=ErrorResponse.single(
+                code=ErrorCode.SYNC_ALREADY_RUNNING,
+                message=f"Запуск ещё выполняется: {exc}",
+                status=409,
+            ).model_dump(),
+        ) from exc
+    except SyncResumeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=ErrorResponse.single(
+                code=ErrorCode.CONFLICT,
+                message=f"Запуск нельзя продолжить: {exc}",
+                status=409,
+            ).model_dump(),
+        ) from exc
+    except Exception as exc:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=ErrorResponse.single(
+                code=ErrorCode.INTERNAL_ERROR,
+                message=f"Не удалось продолжить синхронизацию: {exc}",
+                status=500,
+            ).model_dump(),
+        ) from exc
+
+    job = await session.get(SyncJob, job_id)
+
+    return SyncJobRunResponse(
+        job_id=job_id,
+        status=job.status if job is not None else "error",
+        summary=SyncJobSummary(**(summary_dict or {})),
+    )
+
+
+def _to_checkpoint(job: SyncJob) -> SyncJobCheckpoint | None:
+    """Преобразует checkpoint запуска в схему ответа."""
+    if not job.checkpoint:
+        return None
+    return SyncJobCheckpoint(**job.checkpoint)
+
+
 @router.get("/jobs", response_model=list[SyncJobListItem])
 async def list_sync_jobs(
     limit: int = Query(
@@ -134,6 +209,7 @@ async def list_sync_jobs(
                 started_date=started_date,
                 finished_date=finished_date,
                 summary=summary,
+                checkpoint=_to_checkpoint(job),
             ),
         )
 
@@ -158,13 +234,7 @@ async def get_sync_job_detail(
     """Возвращает детали запуска синхронизации и журнал записей."""
     _ensure_admin(current_user)
 
-    job = (
-        await session.execute(
-            select(SyncJob)
-            .where(SyncJob.id == job_id)
-            .options(selectinload(SyncJob.records)),
-        )
-    ).scalar_one_or_none()
+    job = await session.get(SyncJob, job_id)
 
     if job is None:
         raise HTTPException(
@@ -176,13 +246,18 @@ async def get_sync_job_detail(
             ).model_dump(),
         )
 
-    records: list[SyncRecord] = list(job.records)
-
+    # журнал читается только из партиции запуска, фильтры — в SQL
+    stmt = (
+        select(SyncRecord)
+        .where(SyncRecord.job_id == job_id)
+        .order_by(SyncRecord.id.asc())
+    )
     if action:
-        records = [r for r in records if r.action == action]
-
+        stmt = stmt.where(SyncRecord.action == action)
     if status_filter:
-        records = [r for r in records if r.status == status_filter]
+        stmt = stmt.where(SyncRecord.status == status_filter)
+
+    records = (await session.execute(stmt)).scalars().all()
 
     started_date = job.started_at.date()
     finished_date = job.finished_at.date() if job.finished_at else None
@@ -207,5 +282,6 @@ async def get_sync_job_detail(
         started_date=started_date,
         finished_date=finished_date,
         summary=summary,
+        checkpoint=_to_checkpoint(job),
         records=record_items,
     )
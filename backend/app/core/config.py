@@ -21,30 +21,170 @@ class Settings(BaseSettings):
     )
     jwt_algorithm: str = Field("HS256", env="JWT_ALGORITHM")
 
-    s3_endpoint_url: str = Field(..., env="S3_ENDPOINT_URL")
+    # Хранилище фото: s3 или local (каталог на диске, файлы отдаёт API)
+    storage_backend: str = Field("s3", env="STORAGE_BACKEND")
+    storage_local_root: str = Field("storage", env="STORAGE_LOCAL_ROOT")
+    # Адрес эндпоинта файлов локального хранилища для клиентов
+    storage_local_public_base: str = Field(
+        "/api/media/files",
+        env="STORAGE_LOCAL_PUBLIC_BASE",
+    )
+    storage_local_max_upload_bytes: int = Field(
+        20 * 1024 * 1024,
+        env="STORAGE_LOCAL_MAX_UPLOAD_BYTES",
+    )
+
+    # Обязательны только для STORAGE_BACKEND=s3
+    s3_endpoint_url: str | None = Field(default=None, env="S3_ENDPOINT_URL")
     s3_region: str = Field("ru-central1", env="S3_REGION")
-    s3_bucket: str = Field(..., env="S3_BUCKET")
-    s3_access_key_id: str = Field(..., env="S3_ACCESS_KEY_ID")
-    s3_secret_access_key: str = Field(..., env="S3_SECRET_ACCESS_KEY")
+    s3_bucket: str | None = Field(default=None, env="S3_BUCKET")
+    s3_access_key_id: str | None = Field(default=None, env="S3_ACCESS_KEY_ID")
+    s3_secret_access_key: str | None = Field(
+        default=None,
+        env="S3_SECRET_ACCESS_KEY",
+    )
     s3_public_base: str | None = Field(
         default=None,
         env="S3_PUBLIC_BASE",
     )
+    # virtual — бакет в домене (облако), path — в пути (MinIO и др. локально)
+    s3_addressing_style: str = Field("virtual", env="S3_ADDRESSING_STYLE")
+    # Повторы запросов к S3 на уровне клиента (режим standard)
+    s3_max_attempts: int = Field(5, env="S3_MAX_ATTEMPTS")
+    # Пул HTTP-соединений клиента (параллельные загрузки импорта аватаров)
+    s3_max_pool_connections: int = Field(32, env="S3_MAX_POOL_CONNECTIONS")
+    # Приватный бакет (без S3_PUBLIC_BASE): фото отдаются presigned GET URL.
+    # URL кешируются в процессе и переподписываются за REFRESH секунд до
+    # истечения; TTL=0 — не подписывать (фото без URL)
+    s3_presigned_get_ttl_seconds: int = Field(
+        3600,
+        env="S3_PRESIGNED_GET_TTL_SECONDS",
+    )
+    s3_presigned_get_refresh_seconds: int = Field(
+        600,
+        env="S3_PRESIGNED_GET_REFRESH_SECONDS",
+    )
+    s3_presigned_get_cache_size: int = Field(
+        50_000,
+        env="S3_PRESIGNED_GET_CACHE_SIZE",
+    )
+
+    # Фоновое удаление объектов из очереди media_deletion
+    media_deletion_worker_enabled: bool = Field(
+        True,
+        env="MEDIA_DELETION_WORKER_ENABLED",
+    )
+    media_deletion_interval_seconds: float = Field(
+        30.0,
+        env="MEDIA_DELETION_INTERVAL_SECONDS",
+    )
+    media_deletion_batch_size: int = Field(1000, env="MEDIA_DELETION_BATCH_SIZE")
+
+    # Сборка мусора медиа: не трогать записи и объекты моложе grace-периода
+    # (загрузка могла ещё не дойти до finalize или модерации)
+    media_gc_grace_hours: float = Field(24.0, env="MEDIA_GC_GRACE_HOURS")
+    media_gc_batch_size: int = Field(1000, env="MEDIA_GC_BATCH_SIZE")
+
+    # Превью аватаров: размеры (px), формат (webp / jpeg), процессы пула
+    media_variant_sizes: list[int] = Field(
+        [64, 128, 512],
+        env="MEDIA_VARIANT_SIZES",
+    )
+    media_variant_format: str = Field("webp", env="MEDIA_VARIANT_FORMAT")
+    media_variant_workers: int = Field(2, env="MEDIA_VARIANT_WORKERS")
+    # Превью, которое отдают списки сотрудников
+    media_list_variant_size: int = Field(128, env="MEDIA_LIST_VARIANT_SIZE")
+    # Оригиналы больше этого размера не обрабатываются
+    media_variant_max_source_bytes: int = Field(
+        20 * 1024 * 1024,
+        env="MEDIA_VARIANT_MAX_SOURCE_BYTES",
+    )
 
+    # Массовый импорт аватаров: одновременно обрабатываемых файлов и
+    # длинная сторона сохраняемого оригинала (px)
+    media_import_concurrency: int = Field(16, env="MEDIA_IMPORT_CONCURRENCY")
+    media_import_max_side: int = Field(1024, env="MEDIA_IMPORT_MAX_SIDE")
+    # Максимальный размер ZIP-архива, принимаемого API
+    media_import_max_archive_bytes: int = Field(
+        1024 * 1024 * 1024,
+        env="MEDIA_IMPORT_MAX_ARCHIVE_BYTES",
+    )
+
+    # Модерация фото: срок аренды выданных модератору заявок (сек); за это
+    # время заявки не выдаются другим модераторам
+    photo_moderation_claim_ttl_seconds: int = Field(
+        300,
+        env="PHOTO_MODERATION_CLAIM_TTL_SECONDS",
+    )
+
+    # Источник синхронизации: file / csv / ldap. Пусто — по SYNC_USE_TEST_FILE.
+    SYNC_SOURCE: str = Field("", env="SYNC_SOURCE")
     SYNC_USE_TEST_FILE: bool = Field(
         True,
         env="SYNC_USE_TEST_FILE",
     )
+    # Путь к файлу для источников file и csv
     SYNC_INGEST_FILE_PATH: str = Field(
         "data_source/employees_for_sync.json",
         env="SYNC_INGEST_FILE_PATH",
     )
+    SYNC_CSV_DELIMITER: str = Field(";", env="SYNC_CSV_DELIMITER")
+    SYNC_CSV_ENCODING: str = Field("utf-8-sig", env="SYNC_CSV_ENCODING")
+    # Конвейер синхронизации: размер пачки (и страницы LDAP), ёмкость
+    # очередей между стадиями и число процессов для нормализации
+    # (0 — нормализация в основном процессе).
+    SYNC_BATCH_SIZE: int = Field(500, env="SYNC_BATCH_SIZE")
+    SYNC_QUEUE_SIZE: int = Field(2, env="SYNC_QUEUE_SIZE")
+    SYNC_NORMALIZE_WORKERS: int = Field(0, env="SYNC_NORMALIZE_WORKERS")
+    # Число параллельных сессий для применения изменений (1 — одна сессия).
+    # Каждая партиция берёт отдельное подключение из пула engine.
+    SYNC_APPLY_PARTITIONS: int = Field(1, env="SYNC_APPLY_PARTITIONS")
+    # Сколько записей применять между коммитами (и сохранением checkpoint).
+    SYNC_CHUNK_SIZE: int = Field(2000, env="SYNC_CHUNK_SIZE")
+    # Запуск в статусе running можно продолжить, только если его checkpoint
+    # не обновлялся столько минут (процесс, скорее всего, упал)
+    SYNC_RESUME_STALE_MINUTES: int = Field(15, env="SYNC_RESUME_STALE_MINUTES")
+    # Сверка: увольнять активных сотрудников, которых нет в источнике.
+    # Если таких больше SYNC_MAX_ARCHIVE_PERCENT от активных, сверка
+    # пропускается (защита от обрезанного ответа AD).
+    SYNC_RECONCILE_MISSING: bool = Field(False, env="SYNC_RECONCILE_MISSING")
+    SYNC_MAX_ARCHIVE_PERCENT: float = Field(5.0, env="SYNC_MAX_ARCHIVE_PERCENT")
+    # Создавать департаменты из company/department AD под существующими юрлицами
+    SYNC_CREATE_ORG_UNITS: bool = Field(False, env="SYNC_CREATE_ORG_UNITS")
+    # Нечёткое сопоставление записей, не найденных по external_ref и e-mail:
+    # off — выключено, propose — только журнал, apply — обновлять найденного
+    SYNC_FUZZY_MATCH_MODE: str = Field("off", env="SYNC_FUZZY_MATCH_MODE")
+    SYNC_FUZZY_MATCH_THRESHOLD: float = Field(0.8, env="SYNC_FUZZY_MATCH_THRESHOLD")
+    SYNC_FUZZY_MATCH_MARGIN: float = Field(0.1, env="SYNC_FUZZY_MATCH_MARGIN")
+    # Журнал синхронизации: full — все изменения, compact — только ошибки и
+    # увольнения (остальное — счётчиками в summary)
+    SYNC_JOURNAL_MODE: str = Field("full", env="SYNC_JOURNAL_MODE")
+    # sync_record разбит на партиции по диапазонам job_id такой ширины;
+    # партиции запусков старше SYNC_RECORD_RETENTION_DAYS удаляются целиком
+    # (0 — хранить всегда)
+    SYNC_RECORD_PARTITION_JOBS: int = Field(50, env="SYNC_RECORD_PARTITION_JOBS")
+    SYNC_RECORD_RETENTION_DAYS: int = Field(0, env="SYNC_RECORD_RETENTION_DAYS")
 
     AD_LDAP_HOST: str = Field(..., env="AD_LDAP_HOST")
     AD_LDAP_PORT: int = Field(389, env="AD_LDAP_PORT")
     AD_USE_SSL: bool = Field(False, env="AD_USE_SSL")
+    AD_CONNECT_TIMEOUT: int = Field(10, env="AD_CONNECT_TIMEOUT")
+    # Схема и DSE-info нужны только для отладки: атрибуты синхронизации
+    # форматируются явно (см. app.services.ldap_pool).
+    AD_LDAP_LOAD_SCHEMA: bool = Field(False, env="AD_LDAP_LOAD_SCHEMA")
+    AD_POOL_SIZE: int = Field(4, env="AD_POOL_SIZE")
+    AD_POOL_HEALTH_CHECK_SECONDS: float = Field(
+        60.0,
+        env="AD_POOL_HEALTH_CHECK_SECONDS",
+    )
 
     AD_BASE_DN: str = Field(..., env="AD_BASE_DN")
+    # JSON-список баз поиска (OU юрлиц). Пустой список — ищем только в AD_BASE_DN.
+    AD_SEARCH_BASES: list[str] = Field(
+        default_factory=list,
+        env="AD_SEARCH_BASES",
+    )
+    AD_SEARCH_CONCURRENCY: int = Field(4, env="AD_SEARCH_CONCURRENCY")
     AD_BIND_USER: str = Field(..., env="AD_BIND_USER")
     AD_BIND_PASSWORD: str = Field(..., env="AD_BIND_PASSWORD")
 
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.responses import JSONResponse
 
-from app.schemas.common import ErrorDetail, ErrorResponse
+from app.schemas.common import ErrorCode, ErrorDetail, ErrorResponse
 
 
 class AppError(Exception):
@@ -25,6 +25,27 @@ class AppError(Exception):
         super().__init__(self.message)
 
 
+def http_error(status_code: int, code: ErrorCode, message: str) -> HTTPException:
+    """Собирает HTTPException с телом ErrorResponse.single.
+
+    Args:
+        status_code: HTTP-статус ответа.
+        code: Машинный код ошибки.
+        message: Человекочитаемое сообщение.
+
+    Returns:
+        HTTPException: Исключение, которое остаётся только пробросить.
+    """
+    return HTTPException(
+        status_code=status_code,
+        detail=ErrorResponse.single(
+            code=code,
+            message=message,
+            status=status_code,
+        ).model_dump(),
+    )
+
+
 # --- Конкретные ошибки авторизации/доступа ---
 
 
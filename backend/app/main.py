@@ -1,15 +1,37 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import auth as auth_api
 from app.api.employees_router import router as employees_router
+from app.api.local_storage_router import router as local_storage_router
 from app.api.media_router import router as media_router
 from app.api.org_router import router as org_router
 from app.api.photo_moderation_router import router as photo_moderation_router
 from app.api.sync_router import router as sync_router
+from app.core.config import settings
 from app.core.errors import register_exception_handlers
+from app.services.media_cleanup import run_media_deletion_worker
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Запускает фоновые задачи на время жизни приложения."""
+    tasks: list[asyncio.Task[None]] = []
+    if settings.media_deletion_worker_enabled:
+        tasks.append(asyncio.create_task(run_media_deletion_worker()))
+
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 def create_app() -> FastAPI:
@@ -20,6 +42,7 @@ def create_app() -> FastAPI:
         docs_url="/docs",
         redoc_url="/redoc",
         debug=True,
+        lifespan=lifespan,
     )
 
     app.add_middleware(
@@ -41,6 +64,8 @@ def create_app() -> FastAPI:
     app.include_router(employees_router, prefix="/api")
     app.include_router(photo_moderation_router, prefix="/api")
     app.include_router(media_router, prefix="/api")
+    if settings.storage_backend == "local":
+        app.include_router(local_storage_router, prefix="/api")
     app.include_router(org_router, prefix="/api")
     app.include_router(sync_router, prefix="/api")
 
@@ -2,6 +2,17 @@ from app.models.base import Base  # noqa: F401
 
 from app.models.org_unit import OrgUnit  # noqa: F401
 from app.models.media import Media  # noqa: F401
+from app.models.media_deletion import MediaDeletion  # noqa: F401
+from app.models.media_variant import MediaVariant  # noqa: F401
 from app.models.employee import Employee  # noqa: F401
+from app.models.employee_identity import EmployeeIdentity  # noqa: F401
+from app.models.employee_skill import EmployeeSkill  # noqa: F401
 from app.models.photo_moderation import PhotoModeration  # noqa: F401
-from app.models.sync import SyncJob, SyncRecord  # noqa: F401
+from app.models.sync import (  # noqa: F401
+    SyncDnRef,
+    SyncFuzzyPending,
+    SyncJob,
+    SyncManagerLink,
+    SyncRecord,
+    SyncSeenRef,
+)
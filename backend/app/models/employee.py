@@ -64,6 +64,8 @@ class Employee(Base):
 
     bio: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    # Навык → уровень 1..5; копию для фильтров в employee_skill ведёт
+    # триггер employee_skill_sync
     skill_ratings: Mapped[dict[str, int] | None] = mapped_column(
         JSONB,
         nullable=True,
@@ -181,22 +183,47 @@ class Employee(Base):
             "hire_date <= CURRENT_DATE",
             name="ck_employee_hire_date_not_future",
         ),
+        # Триграммный поиск: выражения совпадают с employee_service._norm
         Index(
-            "idx_employee_last_name_trgm",
-            func.lower(last_name),
+            "idx_employee_last_name_norm_trgm",
+            func.immutable_unaccent(func.lower(last_name)),
             postgresql_using="gin",
-            postgresql_ops={func.lower(last_name).key: "gin_trgm_ops"},
+            postgresql_ops={
+                func.immutable_unaccent(func.lower(last_name)).key: "gin_trgm_ops",
+            },
         ),
         Index(
-            "idx_employee_title_trgm",
-            func.lower(title),
+            "idx_employee_first_name_norm_trgm",
+            func.immutable_unaccent(func.lower(first_name)),
             postgresql_using="gin",
-            postgresql_ops={func.lower(title).key: "gin_trgm_ops"},
+            postgresql_ops={
+                func.immutable_unaccent(func.lower(first_name)).key: "gin_trgm_ops",
+            },
         ),
+        Index(
+            "idx_employee_title_norm_trgm",
+            func.immutable_unaccent(func.lower(title)),
+            postgresql_using="gin",
+            postgresql_ops={
+                func.immutable_unaccent(func.lower(title)).key: "gin_trgm_ops",
+            },
+        ),
+        Index(
+            "idx_employee_search_text_norm_trgm",
+            "search_text_norm",
+            postgresql_using="gin",
+            postgresql_ops={"search_text_norm": "gin_trgm_ops"},
+        ),
+        Index("idx_employee_external_ref", "external_ref"),
         Index("idx_employee_manager_id", "manager_id"),
         Index("idx_employee_department_id", "department_id"),
         Index("idx_employee_direction_id", "direction_id"),
         Index("idx_employee_status", "status"),
+        Index(
+            "idx_employee_photo_id",
+            "photo_id",
+            postgresql_where=text("photo_id IS NOT NULL"),
+        ),
         Index(
             "idx_employee_search_tsv",
             "search_tsv",
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class EmployeeIdentity(Base):
+    """Идентификатор сотрудника во внешней системе (AD, HR и т.п.).
+
+    Синхронизация сопоставляет записи источника с сотрудниками через этот
+    реестр: у одного сотрудника может быть по идентификатору в каждой
+    системе, а после миграции учётки — несколько идентификаторов в одной.
+    """
+
+    __tablename__ = "employee_identity"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    # Внешняя система: ad / hr
+    source: Mapped[str] = mapped_column(Text, nullable=False)
+    external_ref: Mapped[str] = mapped_column(Text, nullable=False)
+
+    employee_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("employee.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        Index(
+            "uq_employee_identity_source_external_ref",
+            "source",
+            "external_ref",
+            unique=True,
+        ),
+        Index("idx_employee_identity_employee_id", "employee_id"),
+    )
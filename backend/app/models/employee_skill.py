@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from sqlalchemy import (
+    BigInteger,
+    CheckConstraint,
+    ForeignKey,
+    Index,
+    SmallInteger,
+    Text,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class EmployeeSkill(Base):
+    """Оценка навыка сотрудника — строка из Employee.skill_ratings.
+
+    Карточка по-прежнему читает JSONB, а фильтры по навыкам идут по этой
+    таблице: индекс (skill, level) отдаёт сотрудников с уровнем в
+    диапазоне без разбора JSON каждой строки. Таблицу поддерживает
+    триггер на employee (employee_skill_sync): строки пересобираются при
+    любой записи skill_ratings — из ORM, массовым UPDATE или SQL, —
+    поэтому напрямую в неё не пишут.
+    """
+
+    __tablename__ = "employee_skill"
+
+    employee_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("employee.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    skill: Mapped[str] = mapped_column(Text, primary_key=True)
+    level: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("level BETWEEN 1 AND 5", name="ck_employee_skill_level"),
+        # employee_id в INCLUDE — фильтр обходится index-only scan
+        Index(
+            "idx_employee_skill_skill_level",
+            "skill",
+            "level",
+            postgresql_include=["employee_id"],
+        ),
+    )
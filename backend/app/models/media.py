@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import BigInteger, DateTime, Index, Text, func
+from sqlalchemy import BigInteger, DateTime, Index, Text, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -20,6 +20,25 @@ class Media(Base):
         nullable=False,
     )
 
+    # Метаданные объекта из HEAD при finalize; у старых записей — NULL
+    byte_size: Mapped[int | None] = mapped_column(
+        BigInteger,
+        nullable=True,
+    )
+
+    content_type: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+
+    # SHA-256 содержимого (hex): одинаковые файлы — одна запись media
+    sha256: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+
+    # Время создания или последней выдачи записи повторной загрузке того же
+    # файла; от него сборщик мусора отсчитывает grace-период
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -32,4 +51,10 @@ class Media(Base):
             "storage_key",
             unique=True,
         ),
+        Index(
+            "uq_media_sha256",
+            "sha256",
+            unique=True,
+            postgresql_where=text("sha256 IS NOT NULL"),
+        ),
     )
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Index, Integer, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MediaDeletion(Base):
+    """Объект хранилища, ожидающий удаления.
+
+    Запись media удаляется сразу, а объект в бакете — фоновым воркером
+    пачками (см. app.services.media_cleanup). Строка живёт, пока объект
+    не удалён; при ошибке попытка откладывается.
+    """
+
+    __tablename__ = "media_deletion"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    storage_key: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # Число неудачных попыток и последняя ошибка
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        server_default="0",
+    )
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Не раньше этого момента (отложенный повтор)
+    not_before: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        Index("uq_media_deletion_storage_key", "storage_key", unique=True),
+        Index("idx_media_deletion_not_before", "not_before"),
+    )
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MediaVariant(Base):
+    """Уменьшенная копия медиа-объекта (превью аватара).
+
+    Ключ хранения выводится из содержимого превью, поэтому объект
+    неизменяем и отдаётся с долгим Cache-Control.
+    """
+
+    __tablename__ = "media_variant"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    # Исходный медиа-объект
+    media_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("media.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    # Размер стороны квадратного превью в пикселях (64 / 128 / 512)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Формат: webp / jpeg
+    format: Mapped[str] = mapped_column(Text, nullable=False)
+
+    storage_key: Mapped[str] = mapped_column(Text, nullable=False)
+    byte_size: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        Index(
+            "uq_media_variant_media_size_format",
+            "media_id",
+            "size",
+            "format",
+            unique=True,
+        ),
+        Index("idx_media_variant_storage_key", "storage_key"),
+    )
@@ -31,11 +31,12 @@ class PhotoModeration(Base):
         nullable=False,
     )
 
-    # Проверяемый медиа-объект
-    media_id: Mapped[int] = mapped_column(
+    # Проверяемый медиа-объект. После удаления media (замена аватара,
+    # сборка мусора) решённая заявка остаётся в истории без media_id
+    media_id: Mapped[int | None] = mapped_column(
         BigInteger,
-        ForeignKey("media.id", ondelete="CASCADE"),
-        nullable=False,
+        ForeignKey("media.id", ondelete="SET NULL"),
+        nullable=True,
     )
 
     # Статус: pending / approved / rejected
@@ -62,6 +63,19 @@ class PhotoModeration(Base):
         nullable=True,
     )
 
+    # Аренда заявки модератором: до claim_expires_at заявка не выдаётся
+    # другим модераторам, после — возвращается в очередь
+    claimed_by_employee_id: Mapped[int | None] = mapped_column(
+        BigInteger,
+        ForeignKey("employee.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
+    claim_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -89,8 +103,23 @@ class PhotoModeration(Base):
             unique=True,
             postgresql_where=text("status = 'pending'"),
         ),
+        # Очередь pending-заявок в порядке (created_at, id): выдача
+        # модераторам и постраничный список
+        Index(
+            "idx_photo_moderation_pending_queue",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'pending'"),
+        ),
         # Аналитика/история модераций
         Index("idx_photo_moderation_employee", "employee_id"),
         Index("idx_photo_moderation_reviewer", "reviewer_employee_id"),
+        Index(
+            "idx_photo_moderation_claimed_by",
+            "claimed_by_employee_id",
+            postgresql_where=text("claimed_by_employee_id IS NOT NULL"),
+        ),
         Index("idx_photo_moderation_created_at", "created_at"),
+        # Заявки по media (сборка мусора, обнуление ссылок при удалении media)
+        Index("idx_photo_moderation_media_id", "media_id"),
     )
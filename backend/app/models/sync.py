@@ -9,6 +9,7 @@ from sqlalchemy import (
     DateTime,
     ForeignKey,
     Index,
+    PrimaryKeyConstraint,
     Text,
     func,
 )
@@ -41,6 +42,11 @@ class SyncJob(Base):
         JSONB,
         nullable=True,
     )
+    # Последняя зафиксированная позиция: {"processed": N, "last_key": "..."}
+    checkpoint: Mapped[dict[str, Any] | None] = mapped_column(
+        JSONB,
+        nullable=True,
+    )
 
     records: Mapped[list["SyncRecord"]] = relationship(
         back_populates="job",
@@ -54,7 +60,7 @@ class SyncJob(Base):
             name="ck_sync_job_trigger",
         ),
         CheckConstraint(
-            "status IN ('running','success','error','partial')",
+            "status IN ('running','success','error','partial','cancelled')",
             name="ck_sync_job_status",
         ),
         Index("idx_sync_job_started_at", "started_at"),
@@ -64,11 +70,16 @@ class SyncJob(Base):
 
 
 class SyncRecord(Base):
-    """Запись журнала синхронизации одного сотрудника."""
+    """Запись журнала синхронизации одного сотрудника.
+
+    Таблица секционирована по диапазонам job_id (см.
+    app.services.sync.journal): журнал старых запусков удаляется
+    партициями целиком.
+    """
 
     __tablename__ = "sync_record"
 
-    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    id: Mapped[int] = mapped_column(BigInteger, autoincrement=True)
 
     job_id: Mapped[int] = mapped_column(
         BigInteger,
@@ -95,6 +106,8 @@ class SyncRecord(Base):
     )
 
     __table_args__ = (
+        # ключ секционирования обязан входить в первичный ключ
+        PrimaryKeyConstraint("job_id", "id"),
         CheckConstraint(
             "action IN ('create','update','archive')",
             name="ck_sync_record_action",
@@ -104,6 +117,92 @@ class SyncRecord(Base):
             name="ck_sync_record_status",
         ),
         Index("idx_sync_record_job_external", "job_id", "external_ref"),
-        Index("idx_sync_record_job_id", "job_id"),
         Index("idx_sync_record_error_code", "error_code"),
+        {"postgresql_partition_by": "RANGE (job_id)"},
+    )
+
+
+class SyncSeenRef(Base):
+    """Ключ записи, которую источник отдал в запуске синхронизации.
+
+    Служебная таблица для сверки (в БД — UNLOGGED): по ней находятся
+    активные сотрудники, пропавшие из источника. Хранятся и external_ref,
+    и e-mail записи; строки запуска удаляются после его завершения.
+    """
+
+    __tablename__ = "sync_seen_ref"
+
+    job_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("sync_job.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    ref: Mapped[str] = mapped_column(Text, primary_key=True)
+
+
+class SyncFuzzyPending(Base):
+    """Запись источника, отложенная до нечёткого сопоставления.
+
+    Записи, не найденные по ключам, применяются после прохода по всему
+    источнику (см. app.services.sync.runner): к этому моменту известны все
+    сотрудники, сопоставленные в запуске точно. Таблица обычная, не
+    UNLOGGED: строки фиксируются вместе с checkpoint, и продолжение
+    запуска после сбоя их не теряет.
+    """
+
+    __tablename__ = "sync_fuzzy_pending"
+
+    job_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("sync_job.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # ключ записи (external_ref или e-mail в нижнем регистре)
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+
+
+class SyncManagerLink(Base):
+    """Ссылка записи на руководителя, накопленная за запуск синхронизации.
+
+    Служебная таблица (в БД — UNLOGGED): руководители проставляются одним
+    UPDATE ... FROM после всех пачек, когда известны все сотрудники.
+    Продолжение запуска после сбоя заново пишет ссылки пропущенных
+    записей; строки запуска удаляются после его завершения.
+    """
+
+    __tablename__ = "sync_manager_link"
+
+    job_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("sync_job.id", ondelete="CASCADE"),
+        primary_key=True,
     )
+    # ключ записи (external_ref или e-mail в нижнем регистре)
+    key: Mapped[str] = mapped_column(Text, primary_key=True)
+    # подчинённый: id, если запись применилась, иначе ищется по sub_ref
+    employee_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    sub_ref: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # external_ref или DN руководителя
+    manager_ref: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class SyncDnRef(Base):
+    """DN записи источника и её external_ref в запуске синхронизации.
+
+    Служебная таблица (в БД — UNLOGGED): по ней ссылки manager_dn
+    разрешаются в external_ref, а первичный ключ отсекает повторы одного
+    DN (пересекающиеся базы поиска AD). Строки запуска удаляются после
+    его завершения.
+    """
+
+    __tablename__ = "sync_dn_ref"
+
+    job_id: Mapped[int] = mapped_column(
+        BigInteger,
+        ForeignKey("sync_job.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # DN в нижнем регистре
+    dn: Mapped[str] = mapped_column(Text, primary_key=True)
+    external_ref: Mapped[str] = mapped_column(Text, nullable=False)
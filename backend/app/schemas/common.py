@@ -18,6 +18,7 @@ class ErrorCode(StrEnum):
 
     # Общее
     NOT_FOUND = "NOT_FOUND"
+    BAD_REQUEST = "BAD_REQUEST"
     VALIDATION_ERROR = "VALIDATION_ERROR"
     CONFLICT = "CONFLICT"
     RATE_LIMITED = "RATE_LIMITED"
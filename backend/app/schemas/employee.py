@@ -169,3 +169,45 @@ class TitleItem(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
     title: str = Field(description="Название должности")
+
+
+class FacetValue(BaseModel):
+    """Значение фасета с числом сотрудников."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    value: str = Field(description="Значение (для орг-юнитов — название)")
+    count: int
+    id: int | None = Field(
+        default=None,
+        description="Идентификатор орг-юнита (для юрлиц и департаментов)",
+    )
+
+
+class SkillFacetValue(BaseModel):
+    """Число сотрудников с навыком на данном уровне."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    skill: str
+    level: int
+    count: int
+
+
+class EmployeeFacets(BaseModel):
+    """Счётчики для панели фильтров поиска сотрудников."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    total: int = Field(description="Сколько сотрудников попало в подсчёт")
+    truncated: bool = Field(
+        description=(
+            "Выборка слишком широкая: счётчики посчитаны только по её части"
+        ),
+    )
+    titles: list[FacetValue]
+    legal_entities: list[FacetValue]
+    departments: list[FacetValue]
+    work_cities: list[FacetValue]
+    work_formats: list[FacetValue]
+    skills: list[SkillFacetValue]
@@ -4,10 +4,15 @@ from pydantic import BaseModel, Field
 
 
 class MediaInfo(BaseModel):
-    """Краткая информация о медиа-объекте (например, фото)."""
+    """Краткая информация о медиа-объекте (например, фото).
+
+    В списках public_url указывает на превью (MEDIA_LIST_VARIANT_SIZE),
+    в карточке — на оригинал; variants — URL превью по размеру стороны.
+    """
 
     id: int = Field(serialization_alias="media_id")
     public_url: str | None = None
+    variants: dict[int, str] = Field(default_factory=dict)
 
 
 class InitUploadRequest(BaseModel):
@@ -17,6 +22,14 @@ class InitUploadRequest(BaseModel):
         ...,
         description="MIME-тип будущего объекта, например image/jpeg",
     )
+    sha256: str | None = Field(
+        default=None,
+        pattern=r"^[0-9a-fA-F]{64}$",
+        description=(
+            "SHA-256 файла (hex). С ним ключ выводится из содержимого, "
+            "а S3 проверяет сумму при загрузке"
+        ),
+    )
 
 
 class InitUploadResponse(BaseModel):
@@ -25,6 +38,8 @@ class InitUploadResponse(BaseModel):
     storage_key: str
     upload_url: str
     public_url: str | None = None  # Если настроен S3_PUBLIC_BASE
+    # Заголовки, которые клиент обязан передать в PUT (входят в подпись)
+    upload_headers: dict[str, str] = Field(default_factory=dict)
 
 
 class FinalizeUploadRequest(BaseModel):
@@ -39,3 +54,18 @@ class MediaItem(BaseModel):
     id: int = Field(serialization_alias="media_id")
     storage_key: str
     public_url: str | None = None
+    byte_size: int | None = None
+    content_type: str | None = None
+    sha256: str | None = None
+
+
+class AvatarImportResponse(BaseModel):
+    """Итог массового импорта аватаров."""
+
+    imported: int
+    pending_moderation: int
+    unchanged: int
+    # Файлы, для которых не найден сотрудник (по email / external_ref)
+    unmatched: list[str] = Field(default_factory=list)
+    # Файлы, которые не удалось обработать: имя → причина
+    failed: dict[str, str] = Field(default_factory=dict)
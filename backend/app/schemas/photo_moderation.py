@@ -24,6 +24,9 @@ class PhotoModerationItem(BaseModel):
     reviewed_at: datetime | None = None
     reject_reason: str | None = None
     created_at: datetime
+    # Модератор, за которым закреплена pending-заявка, и срок аренды
+    claimed_by_employee_id: int | None = None
+    claim_expires_at: datetime | None = None
 
     photo: MediaInfo | None = None
 
@@ -47,10 +50,53 @@ class DecisionPayload(BaseModel):
         return self
 
 
+class BatchDecisionItem(DecisionPayload):
+    """Решение по одной заявке в пакете."""
+
+    moderation_id: int = Field(..., gt=0)
+
+
+class BatchDecisionPayload(BaseModel):
+    """Пакет решений модератора."""
+
+    items: list[BatchDecisionItem] = Field(..., min_length=1, max_length=500)
+
+
+class BatchDecisionOutcome(BaseModel):
+    """Итог решения по одной заявке пакета."""
+
+    moderation_id: int
+    # новый статус заявки; None — решение не применено (см. error_code)
+    status: str | None = None
+    error_code: str | None = None
+    message: str | None = None
+
+
+class BatchDecisionResult(BaseModel):
+    """Итоги пакета решений в порядке запроса."""
+
+    items: list[BatchDecisionOutcome]
+    approved: int = 0
+    rejected: int = 0
+    failed: int = 0
+
+
 class ModerationList(BaseModel):
-    """Список заявок на модерацию."""
+    """Страница списка заявок на модерацию."""
+
+    items: list[PhotoModerationItem]
+    # курсор следующей страницы; None — страниц больше нет
+    next_cursor: str | None = None
+    # общее число заявок, подходящих под фильтр
+    total: int = 0
+
+
+class ModerationClaimList(BaseModel):
+    """Заявки, выданные модератору в аренду."""
 
     items: list[PhotoModerationItem]
+    # до этого момента заявки не выдаются другим модераторам
+    claim_expires_at: datetime
 
 
 class MyModerationStatus(BaseModel):
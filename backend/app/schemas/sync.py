@@ -19,6 +19,11 @@ class SyncEmployeePayload(BaseModel):
     company: str | None = None
     department: str | None = None
     manager_external_ref: str | None = None
+    # DN руководителя в AD, если ссылку не удалось разрешить при загрузке
+    # (постраничная выгрузка: руководитель может прийти в следующей пачке).
+    manager_dn: str | None = None
+    # DN самой записи в AD: по нему разрешаются manager_dn подчинённых
+    dn: str | None = None
 
     is_blocked_from_ad: bool | None = None
     is_in_blocked_ou: bool | None = None
@@ -40,6 +45,8 @@ class SyncEmployeePayload(BaseModel):
         "department",
         "external_ref",
         "manager_external_ref",
+        "manager_dn",
+        "dn",
         "password_hash",
     )
     @classmethod
@@ -51,6 +58,14 @@ class SyncEmployeePayload(BaseModel):
         return s or None
 
 
+class SyncSourceTiming(BaseModel):
+    """Статистика выгрузки одной базы поиска источника (OU в AD)."""
+
+    search_base: str
+    entries: int = 0
+    seconds: float = 0.0
+
+
 class SyncJobSummary(BaseModel):
     """Агрегированная сводка по запуску синхронизации."""
 
@@ -59,6 +74,29 @@ class SyncJobSummary(BaseModel):
     archived: int = 0
     errors: int = 0
 
+    # сверка с источником: сколько активных сотрудников не пришло и
+    # почему увольнение не выполнено (сработал лимит)
+    missing: int = 0
+    reconcile_error: str | None = None
+
+    org_units_created: int = 0
+
+    # нечёткое сопоставление: обновлено найденных / предложено в журнале
+    fuzzy_matched: int = 0
+    fuzzy_proposed: int = 0
+
+    # full / compact: в compact журнал содержит только ошибки и увольнения
+    journal_mode: str = "full"
+
+    source_timings: list[SyncSourceTiming] = Field(default_factory=list)
+
+
+class SyncJobCheckpoint(BaseModel):
+    """Позиция, до которой запуск успел зафиксировать изменения."""
+
+    processed: int = 0
+    last_key: str | None = None
+
 
 class SyncJobListItem(BaseModel):
     """Элемент списка запусков синхронизации."""
@@ -71,6 +109,7 @@ class SyncJobListItem(BaseModel):
     finished_date: date | None = None
 
     summary: SyncJobSummary
+    checkpoint: SyncJobCheckpoint | None = None
 
 
 class SyncRecordItem(BaseModel):
@@ -93,6 +132,7 @@ class SyncJobDetail(BaseModel):
     started_date: date
     finished_date: date | None = None
     summary: SyncJobSummary
+    checkpoint: SyncJobCheckpoint | None = None
     records: list[SyncRecordItem]
 
 
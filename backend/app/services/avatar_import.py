@@ -0,0 +1,588 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import os
+import zipfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO
+
+import anyio
+from PIL import Image, ImageOps
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.employee import Employee
+from app.models.employee_identity import EmployeeIdentity
+from app.models.media import Media
+from app.models.media_deletion import MediaDeletion
+from app.models.media_variant import MediaVariant
+from app.models.photo_moderation import PhotoModeration
+from app.services.media_service import schedule_media_deletion
+from app.services.media_variants import (
+    VARIANT_FORMATS,
+    render_variants,
+    run_in_image_pool,
+    variant_storage_key,
+)
+from app.services.storage_service import (
+    IMMUTABLE_CACHE_CONTROL,
+    make_storage_key,
+    put_object_bytes,
+)
+from app.utils.logger import logger
+
+# Файлы архива, которые считаются фотографиями
+IMAGE_SUFFIXES = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+
+# Оригинал после нормализации хранится в JPEG
+_ORIGINAL_CONTENT_TYPE = "image/jpeg"
+_ORIGINAL_EXT = "jpg"
+
+# Строк в одном INSERT ... VALUES (лимит параметров asyncpg — 32767)
+_INSERT_CHUNK = 1000
+
+
+# --- источники файлов ---
+
+
+class AvatarSource(ABC):
+    """Набор фотографий для импорта: имя файла → содержимое."""
+
+    @abstractmethod
+    def names(self) -> list[str]:
+        """Имена файлов-фотографий (в порядке обхода)."""
+
+    @abstractmethod
+    def read(self, name: str, max_bytes: int) -> bytes:
+        """Читает файл целиком; ValueError, если он больше max_bytes."""
+
+
+class ZipAvatarSource(AvatarSource):
+    """Фотографии из ZIP-архива.
+
+    Записи читаются по одной прямо из архива, на диск не распаковываются.
+    ZipFile разделяет файл архива между потоками под блокировкой, поэтому
+    читать разные записи можно параллельно.
+    """
+
+    def __init__(self, fp: BinaryIO | str | Path) -> None:
+        self._zip = zipfile.ZipFile(fp)
+
+    def names(self) -> list[str]:
+        return [
+            info.filename
+            for info in self._zip.infolist()
+            if not info.is_dir() and _is_image_name(info.filename)
+        ]
+
+    def read(self, name: str, max_bytes: int) -> bytes:
+        # размер из заголовка записи не доверяем: читаем не больше лимита
+        with self._zip.open(name) as fh:
+            data = fh.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            raise ValueError(f"File exceeds {max_bytes} bytes")
+        return data
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+class DirectoryAvatarSource(AvatarSource):
+    """Фотографии из каталога (с подкаталогами)."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def names(self) -> list[str]:
+        names: list[str] = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+            for filename in sorted(filenames):
+                name = Path(dirpath, filename).relative_to(self.root).as_posix()
+                if _is_image_name(name):
+                    names.append(name)
+        return names
+
+    def read(self, name: str, max_bytes: int) -> bytes:
+        with self.root.joinpath(name).open("rb") as fh:
+            data = fh.read(max_bytes + 1)
+        if len(data) > max_bytes:
+            raise ValueError(f"File exceeds {max_bytes} bytes")
+        return data
+
+
+def _is_image_name(name: str) -> bool:
+    path = PurePosixPath(name)
+    if any(part.startswith(".") or part == "__MACOSX" for part in path.parts):
+        return False
+    return path.suffix.lower() in IMAGE_SUFFIXES
+
+
+def employee_key_from_name(name: str) -> str:
+    """Email или внешний идентификатор сотрудника из имени файла.
+
+    "photos/Ivan.Petrov@udv.ru.jpg" → "ivan.petrov@udv.ru",
+    "hr/000123.png" → "000123".
+    """
+    stem = PurePosixPath(name).stem.strip()
+    return stem.lower() if "@" in stem else stem
+
+
+# --- обработка изображений (в пуле процессов) ---
+
+
+def prepare_avatar(
+    data: bytes,
+    max_side: int,
+    sizes: list[int],
+    fmt: str,
+) -> tuple[bytes, list[tuple[int, bytes]]]:
+    """Нормализует фото и строит превью (выполняется в пуле процессов).
+
+    Изображение поворачивается по EXIF, прозрачность заливается белым,
+    длинная сторона уменьшается до max_side; оригинал сохраняется в JPEG.
+    Превью строятся из нормализованного оригинала, как при обычной
+    загрузке. Возвращает (оригинал, [(размер, байты превью)]).
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        # JPEG декодируется сразу в уменьшенном масштабе (DCT-scaling):
+        # для фото с камеры это в разы быстрее полного декодирования
+        source.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(source)
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+        out = io.BytesIO()
+        image.save(out, format="JPEG", quality=88, optimize=True)
+    original = out.getvalue()
+    return original, render_variants(original, sizes, fmt)
+
+
+# --- импорт ---
+
+
+@dataclass
+class AvatarImportResult:
+    """Итог импорта аватаров."""
+
+    # фото установлено сотруднику (без модерации)
+    imported: int = 0
+    # создана pending-заявка на модерацию
+    pending_moderation: int = 0
+    # у сотрудника уже стоит это фото
+    unchanged: int = 0
+    # файлы, для которых не найден сотрудник
+    unmatched: list[str] = field(default_factory=list)
+    # файлы, которые не удалось обработать: имя → причина
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class _PreparedAvatar:
+    """Загруженное в хранилище фото, ещё не записанное в БД."""
+
+    name: str
+    employee_id: int
+    storage_key: str
+    sha256: str
+    byte_size: int
+    # (размер, ключ, байт) превью
+    variants: list[tuple[int, str, int]]
+
+
+async def match_employees(
+    session: AsyncSession,
+    keys: set[str],
+) -> dict[str, int | None]:
+    """Сопоставляет ключи из имён файлов с сотрудниками.
+
+    Ключ с «@» ищется по email, остальные — по external_ref сотрудника
+    и по реестру employee_identity. Каждый вид ключей — один запрос.
+    Возвращает ключ → id сотрудника; None, если ключ неоднозначен
+    (разные сотрудники в разных системах).
+    """
+    emails = [key for key in keys if "@" in key]
+    refs = [key for key in keys if "@" not in key]
+    found: dict[str, set[int]] = {}
+
+    if emails:
+        rows = await session.execute(
+            select(Employee.email, Employee.id).where(Employee.email.in_(emails)),
+        )
+        for email, employee_id in rows.all():
+            found.setdefault(email.lower(), set()).add(employee_id)
+
+    if refs:
+        for ref_column, id_column in (
+            (Employee.external_ref, Employee.id),
+            (EmployeeIdentity.external_ref, EmployeeIdentity.employee_id),
+        ):
+            rows = await session.execute(
+                select(ref_column, id_column).where(ref_column.in_(refs)),
+            )
+            for ref, employee_id in rows.all():
+                found.setdefault(ref, set()).add(employee_id)
+
+    return {
+        key: next(iter(ids)) if len(ids) == 1 else None
+        for key, ids in found.items()
+    }
+
+
+async def _upload_avatar(
+    source: AvatarSource,
+    name: str,
+    employee_id: int,
+) -> _PreparedAvatar:
+    """Читает, обрабатывает и загружает в хранилище одно фото."""
+    fmt = settings.media_variant_format
+    _, variant_content_type, variant_ext = VARIANT_FORMATS[fmt]
+
+    data = await anyio.to_thread.run_sync(
+        source.read,
+        name,
+        settings.media_variant_max_source_bytes,
+    )
+    original, rendered = await run_in_image_pool(
+        prepare_avatar,
+        data,
+        settings.media_import_max_side,
+        settings.media_variant_sizes,
+        fmt,
+    )
+    sha256 = hashlib.sha256(original).hexdigest()
+    storage_key = make_storage_key(_ORIGINAL_EXT, sha256=sha256)
+    variants = [
+        (size, variant_storage_key(payload, variant_ext), payload)
+        for size, payload in rendered
+    ]
+
+    # оригинал и превью — параллельно; ключи выведены из содержимого,
+    # поэтому повтор импорта перезаписывает те же объекты
+    await asyncio.gather(
+        put_object_bytes(
+            storage_key,
+            original,
+            content_type=_ORIGINAL_CONTENT_TYPE,
+        ),
+        *(
+            put_object_bytes(
+                key,
+                payload,
+                content_type=variant_content_type,
+                cache_control=IMMUTABLE_CACHE_CONTROL,
+            )
+            for _, key, payload in variants
+        ),
+    )
+    return _PreparedAvatar(
+        name=name,
+        employee_id=employee_id,
+        storage_key=storage_key,
+        sha256=sha256,
+        byte_size=len(original),
+        variants=[(size, key, len(payload)) for size, key, payload in variants],
+    )
+
+
+async def _save_media(
+    session: AsyncSession,
+    prepared: list[_PreparedAvatar],
+) -> dict[str, int]:
+    """Пачкой записывает media и media_variant; возвращает sha256 → media.id.
+
+    Файл, который уже есть в media (в том числе под другим ключом от
+    прежней загрузки), новой записи не получает; лишний объект ставится
+    в очередь на удаление. Найденные записи блокируются и получают
+    свежий created_at, как в finalize_media_upload: сборщик мусора не
+    удалит их до того, как на них сошлются аватары или заявки.
+    """
+    by_sha = {item.sha256: item for item in prepared}
+    media: dict[str, tuple[int, str]] = {}
+    shas = list(by_sha)
+    while shas:
+        media_rows = [
+            {
+                "storage_key": by_sha[sha256].storage_key,
+                "byte_size": by_sha[sha256].byte_size,
+                "content_type": _ORIGINAL_CONTENT_TYPE,
+                "sha256": sha256,
+            }
+            for sha256 in shas
+        ]
+        for start in range(0, len(media_rows), _INSERT_CHUNK):
+            await session.execute(
+                pg_insert(Media)
+                .values(media_rows[start : start + _INSERT_CHUNK])
+                .on_conflict_do_nothing(),
+            )
+
+        for start in range(0, len(shas), _INSERT_CHUNK):
+            rows = await session.execute(
+                update(Media)
+                .where(Media.sha256.in_(shas[start : start + _INSERT_CHUNK]))
+                .values(created_at=func.now())
+                .returning(Media.sha256, Media.id, Media.storage_key),
+            )
+            media.update(
+                (sha256, (media_id, key)) for sha256, media_id, key in rows.all()
+            )
+        # запись, с которой конфликтовала вставка, мог успеть удалить
+        # сборщик мусора — такие файлы вставляем заново
+        shas = [sha256 for sha256 in shas if sha256 not in media]
+
+    # загруженные ключи могли стоять в очереди от удалённых записей
+    uploaded = list(
+        dict.fromkeys(
+            key
+            for item in by_sha.values()
+            for key in (item.storage_key, *(k for _, k, _ in item.variants))
+        ),
+    )
+    for start in range(0, len(uploaded), _INSERT_CHUNK):
+        await session.execute(
+            delete(MediaDeletion).where(
+                MediaDeletion.storage_key.in_(uploaded[start : start + _INSERT_CHUNK]),
+            ),
+        )
+
+    duplicates = [
+        {"storage_key": item.storage_key}
+        for sha256, item in by_sha.items()
+        if media[sha256][1] != item.storage_key
+    ]
+    if duplicates:
+        await session.execute(
+            pg_insert(MediaDeletion).values(duplicates).on_conflict_do_nothing(),
+        )
+
+    # у уже существующих media превью этих размеров обычно есть; чужие
+    # ключи проигравших вставок подберёт сборщик мусора
+    variant_rows = [
+        {
+            "media_id": media[sha256][0],
+            "size": size,
+            "format": settings.media_variant_format,
+            "storage_key": key,
+            "byte_size": byte_size,
+        }
+        for sha256, item in by_sha.items()
+        for size, key, byte_size in item.variants
+    ]
+    for start in range(0, len(variant_rows), _INSERT_CHUNK):
+        await session.execute(
+            pg_insert(MediaVariant)
+            .values(variant_rows[start : start + _INSERT_CHUNK])
+            .on_conflict_do_nothing(),
+        )
+
+    return {sha256: media_id for sha256, (media_id, _) in media.items()}
+
+
+async def _assign_avatars(
+    session: AsyncSession,
+    prepared: list[_PreparedAvatar],
+    media_ids: dict[str, int],
+    *,
+    bypass_moderation: bool,
+    reviewer_id: int | None,
+    result: AvatarImportResult,
+) -> None:
+    """Ставит фото сотрудникам или отправляет их на модерацию пачкой.
+
+    Правила те же, что у create_or_replace_request_for_employee и approve:
+    текущий аватар повторно не ставится, отклонённое ранее фото на
+    модерацию не отправляется, фото заменённых заявок и аватаров
+    удаляются через очередь media_deletion.
+    """
+    assign = {item.employee_id: media_ids[item.sha256] for item in prepared}
+    names = {item.employee_id: item.name for item in prepared}
+
+    current = dict(
+        (
+            await session.execute(
+                select(Employee.id, Employee.photo_id).where(
+                    Employee.id.in_(list(assign)),
+                ),
+            )
+        ).all(),
+    )
+    for employee_id, media_id in list(assign.items()):
+        if current.get(employee_id) == media_id:
+            del assign[employee_id]
+            result.unchanged += 1
+
+    if not bypass_moderation and assign:
+        rejected = await session.execute(
+            select(PhotoModeration.employee_id).where(
+                PhotoModeration.status == "rejected",
+                tuple_(PhotoModeration.employee_id, PhotoModeration.media_id).in_(
+                    list(assign.items()),
+                ),
+            ),
+        )
+        for employee_id in set(rejected.scalars()):
+            del assign[employee_id]
+            result.failed[names[employee_id]] = "This photo has already been rejected"
+
+    if not assign:
+        return
+
+    # история модерации сохраняется, снимаются только pending-заявки; как и
+    # при обычной отправке, фото отклонённых заявок больше не нужны
+    res = await session.execute(
+        delete(PhotoModeration)
+        .where(
+            PhotoModeration.employee_id.in_(list(assign)),
+            PhotoModeration.status == "pending",
+        )
+        .returning(PhotoModeration.media_id),
+    )
+    stale = set(res.scalars())
+    if not bypass_moderation:
+        res = await session.execute(
+            select(PhotoModeration.media_id).where(
+                PhotoModeration.employee_id.in_(list(assign)),
+                PhotoModeration.status == "rejected",
+            ),
+        )
+        stale.update(res.scalars())
+
+    now = datetime.now(timezone.utc)
+    moderation_rows = [
+        {
+            "employee_id": employee_id,
+            "media_id": media_id,
+            "status": "approved" if bypass_moderation else "pending",
+            "reviewer_employee_id": reviewer_id if bypass_moderation else None,
+            "reviewed_at": now if bypass_moderation else None,
+        }
+        for employee_id, media_id in assign.items()
+    ]
+    for start in range(0, len(moderation_rows), _INSERT_CHUNK):
+        await session.execute(
+            pg_insert(PhotoModeration).values(
+                moderation_rows[start : start + _INSERT_CHUNK],
+            ),
+        )
+
+    if bypass_moderation:
+        # bulk UPDATE по первичному ключу (executemany)
+        await session.execute(
+            update(Employee),
+            [
+                {"id": employee_id, "photo_id": media_id}
+                for employee_id, media_id in assign.items()
+            ],
+        )
+        stale.update(current[employee_id] for employee_id in assign)
+        result.imported += len(assign)
+    else:
+        result.pending_moderation += len(assign)
+
+    # media, которые остаются аватаром или pending-заявкой другого
+    # сотрудника, schedule_media_deletion пропустит сам
+    await schedule_media_deletion(session, stale)
+
+
+async def import_avatars(
+    session: AsyncSession,
+    source: AvatarSource,
+    *,
+    bypass_moderation: bool = False,
+    reviewer_id: int | None = None,
+    concurrency: int | None = None,
+) -> AvatarImportResult:
+    """Импортирует пачку фотографий сотрудников.
+
+    Имя файла (без расширения) — email или внешний идентификатор
+    сотрудника. Файлы читаются из источника по одному, ресайз и превью
+    строятся в пуле процессов, загрузка в хранилище идёт параллельно, но
+    не больше concurrency файлов сразу (MEDIA_IMPORT_CONCURRENCY) — так
+    ограничена и память. Записи media, media_variant, заявки модерации и
+    photo_id сотрудников пишутся пачками в конце, в транзакции
+    вызывающего кода.
+
+    С bypass_moderation фото сразу ставится аватаром, а в историю
+    модерации пишется одобренная заявка от reviewer_id; иначе
+    создаются pending-заявки.
+    """
+    if settings.media_variant_format not in VARIANT_FORMATS:
+        raise ValueError(
+            f"Unsupported media variant format: {settings.media_variant_format}",
+        )
+    if concurrency is None:
+        concurrency = settings.media_import_concurrency
+    result = AvatarImportResult()
+
+    names = await anyio.to_thread.run_sync(source.names)
+    matched = await match_employees(
+        session,
+        {employee_key_from_name(name) for name in names},
+    )
+
+    targets: list[tuple[str, int]] = []
+    seen: dict[int, str] = {}
+    for name in names:
+        key = employee_key_from_name(name)
+        if key not in matched:
+            result.unmatched.append(name)
+            continue
+        employee_id = matched[key]
+        if employee_id is None:
+            result.failed[name] = "Ambiguous employee identifier"
+        elif employee_id in seen:
+            result.failed[name] = f"Duplicate photo for employee ({seen[employee_id]})"
+        else:
+            seen[employee_id] = name
+            targets.append((name, employee_id))
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def process(name: str, employee_id: int) -> _PreparedAvatar | None:
+        async with semaphore:
+            try:
+                return await _upload_avatar(source, name, employee_id)
+            except Exception as exc:  # noqa: BLE001
+                result.failed[name] = f"{type(exc).__name__}: {exc}"
+                return None
+
+    uploaded = await asyncio.gather(*(process(*target) for target in targets))
+    prepared = [item for item in uploaded if item is not None]
+
+    if prepared:
+        media_ids = await _save_media(session, prepared)
+        await _assign_avatars(
+            session,
+            prepared,
+            media_ids,
+            bypass_moderation=bypass_moderation,
+            reviewer_id=reviewer_id,
+            result=result,
+        )
+        await session.flush()
+
+    logger.info(
+        "[MEDIA] avatar import: %d files, imported %d, pending %d, unchanged %d, "
+        "unmatched %d, failed %d",
+        len(names),
+        result.imported,
+        result.pending_moderation,
+        result.unchanged,
+        len(result.unmatched),
+        len(result.failed),
+    )
+    return result
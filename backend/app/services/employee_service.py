@@ -1,27 +1,46 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from typing import Any
 
 from sqlalchemy import (
-    Integer,
+    CTE,
+    ColumnElement,
+    CompoundSelect,
+    Select,
+    Subquery,
     and_,
-    case,
-    cast,
+    desc,
+    distinct,
     func,
+    intersect,
     literal,
     or_,
     select,
+    tuple_,
+    union,
 )
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased, selectinload
 
 from app.models.employee import Employee
+from app.models.employee_skill import EmployeeSkill
 from app.models.org_unit import OrgUnit
 
 SEARCH_DEFAULT_LIMIT: int = 10
+# Порог similarity для ФИО и должности (оператор %)
 TRGM_SIM_THRESHOLD: float = 0.25
+# Порог word_similarity для полного текста с био (оператор <%)
+TRGM_WORD_SIM_THRESHOLD: float = 0.5
+
+# Сколько сотрудников максимум просматривает подсчёт фасетов
+FACET_SCAN_LIMIT: int = 10_000
+# Сколько значений каждого фасета отдаётся (самые частые)
+FACET_VALUES_LIMIT: int = 50
 
 SKILL_SEARCH_LIMIT: int = 20
+# Уровень навыка «от и до» включительно
+SkillLevelRange = tuple[int, int]
 TITLE_SEARCH_LIMIT: int = 30
 
 
@@ -199,35 +218,120 @@ async def _resolve_units_for_legal_entities(
     return department_ids, direction_ids
 
 
-async def search_employees(
+def _norm(column: ColumnElement) -> ColumnElement:
+    """immutable_unaccent(lower(x)) — то же выражение, что в GIN-индексах.
+
+    Индекс по выражению применим, только если запрос повторяет его
+    дословно, поэтому нормализация собрана в одном месте.
+    """
+    return func.immutable_unaccent(func.lower(column))
+
+
+def _search_terms(q: str) -> tuple[ColumnElement, ColumnElement, ColumnElement]:
+    """Условия поиска по строке q.
+
+    Возвращает (match, ts_match, similarity): match состоит только из
+    индексируемых операторов — @@ по search_tsv и триграммных % / <% по
+    нормализованным ФИО, должности и search_text_norm; similarity —
+    лучшая триграммная близость для ранжирования.
+    """
+    tsq = func.websearch_to_tsquery("russian", q)
+    ts_match = Employee.search_tsv.op("@@")(tsq)
+
+    normalized_q = _norm(literal(q))
+    names = (
+        _norm(Employee.last_name),
+        _norm(Employee.first_name),
+        _norm(Employee.title),
+    )
+    blob = Employee.search_text_norm
+
+    match = or_(
+        ts_match,
+        *(column.op("%")(normalized_q) for column in names),
+        normalized_q.op("<%")(blob),
+    )
+    similarity = func.greatest(
+        *(func.similarity(column, normalized_q) for column in names),
+        func.word_similarity(normalized_q, blob),
+    )
+    return match, ts_match, similarity
+
+
+def search_candidates_query(q: str, base: Select | None = None) -> Select:
+    """SELECT id сотрудников, подходящих под строку поиска.
+
+    Первая фаза поиска: условия только из индексируемых операторов,
+    поэтому Postgres собирает кандидатов через BitmapOr по GIN-индексам.
+    Пороги операторов задаёт set_trgm_thresholds.
+
+    Параметры:
+        q: поисковая строка (без пробелов по краям).
+        base: запрос сотрудников с фильтрами; по умолчанию — активные.
+    """
+    if base is None:
+        base = select(Employee).where(Employee.status == "active")
+    match, _, _ = _search_terms(q)
+    return base.with_only_columns(Employee.id).where(match)
+
+
+async def set_trgm_thresholds(session: AsyncSession) -> None:
+    """Задаёт пороги триграммных операторов до конца транзакции."""
+    await session.execute(
+        select(
+            func.set_config(
+                "pg_trgm.similarity_threshold",
+                str(TRGM_SIM_THRESHOLD),
+                True,
+            ),
+            func.set_config(
+                "pg_trgm.word_similarity_threshold",
+                str(TRGM_WORD_SIM_THRESHOLD),
+                True,
+            ),
+        ),
+    )
+
+
+def _skill_filter_query(
+    skill_filters: dict[str, SkillLevelRange],
+) -> Select | CompoundSelect:
+    """SELECT employee_id сотрудников, подходящих под все фильтры навыков.
+
+    Каждый фильтр — диапазонное чтение индекса (skill, level); при
+    нескольких навыках множества пересекаются через INTERSECT.
+    """
+    parts = []
+    for skill_name, (min_level, max_level) in skill_filters.items():
+        level_cond = (
+            EmployeeSkill.level == min_level
+            if min_level == max_level
+            else EmployeeSkill.level.between(min_level, max_level)
+        )
+        parts.append(
+            select(EmployeeSkill.employee_id).where(
+                EmployeeSkill.skill == skill_name,
+                level_cond,
+            ),
+        )
+
+    if len(parts) == 1:
+        return parts[0]
+    return intersect(*parts)
+
+
+async def _filtered_employees_query(
     session: AsyncSession,
-    q: str | None = None,
-    org_unit_id: int | None = None,
     *,
-    skill_filters: dict[str, int] | None = None,
+    org_unit_id: int | None = None,
+    skill_filters: dict[str, SkillLevelRange] | None = None,
     titles: list[str] | None = None,
     legal_entity_ids: list[int] | None = None,
-    limit: int | None = None,
-    offset: int = 0,
-) -> list[Employee]:
-    """Ищет сотрудников по ФИО, должности, био и фильтрам.
+) -> Select | None:
+    """SELECT активных сотрудников с фильтрами поиска (без строки q).
 
-    Параметры:
-        q: поисковая строка (FTS + триграммы).
-        org_unit_id: фильтр по «нижнему» орг-юниту (department/direction).
-        skill_filters: словарь {skill_name: level}, level 1–5,
-            совпадение по точному значению для каждого указанного навыка.
-        titles: список должностей; выбираются сотрудники с title в этом списке.
-        legal_entity_ids: список id org_unit с unit_type='legal_entity';
-            выбираются сотрудники, чьи department/direction лежат под одним
-            из этих юр. лиц.
-        limit: максимальное количество сотрудников в ответе.
-            - Если q не задано и limit=None — отдаём всех (старое поведение).
-            - Если q задано и limit=None — используем SEARCH_DEFAULT_LIMIT.
-        offset: смещение от начала выборки (для пагинации).
-
-    Возвращает:
-        Список ORM-объектов Employee.
+    Параметры — как у search_employees. Возвращает None, если под
+    фильтры заведомо никто не подходит.
     """
     base = select(Employee).where(Employee.status == "active")
 
@@ -246,17 +350,7 @@ async def search_employees(
         base = base.where(Employee.title.in_(titles))
 
     if skill_filters:
-        for skill_name, level in skill_filters.items():
-            json_field = Employee.skill_ratings[skill_name]
-            numeric_expr = case(
-                (
-                    func.jsonb_typeof(json_field) == "number",
-                    cast(json_field.astext, Integer),
-                ),
-                else_=None,
-            )
-
-        base = base.where(numeric_expr == int(level))
+        base = base.where(Employee.id.in_(_skill_filter_query(skill_filters)))
 
     if legal_entity_ids:
         dept_ids, dir_ids = await _resolve_units_for_legal_entities(
@@ -264,7 +358,7 @@ async def search_employees(
             legal_entity_ids,
         )
         if not dept_ids and not dir_ids:
-            return []
+            return None
 
         conds = []
         if dept_ids:
@@ -275,6 +369,50 @@ async def search_employees(
         if conds:
             base = base.where(or_(*conds))
 
+    return base
+
+
+async def search_employees(
+    session: AsyncSession,
+    q: str | None = None,
+    org_unit_id: int | None = None,
+    *,
+    skill_filters: dict[str, SkillLevelRange] | None = None,
+    titles: list[str] | None = None,
+    legal_entity_ids: list[int] | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+) -> list[Employee]:
+    """Ищет сотрудников по ФИО, должности, био и фильтрам.
+
+    Параметры:
+        q: поисковая строка (FTS + триграммы).
+        org_unit_id: фильтр по «нижнему» орг-юниту (department/direction).
+        skill_filters: словарь {skill_name: (min_level, max_level)},
+            уровни 1–5 включительно; сотрудник должен подходить под все
+            указанные навыки.
+        titles: список должностей; выбираются сотрудники с title в этом списке.
+        legal_entity_ids: список id org_unit с unit_type='legal_entity';
+            выбираются сотрудники, чьи department/direction лежат под одним
+            из этих юр. лиц.
+        limit: максимальное количество сотрудников в ответе.
+            - Если q не задано и limit=None — отдаём всех (старое поведение).
+            - Если q задано и limit=None — используем SEARCH_DEFAULT_LIMIT.
+        offset: смещение от начала выборки (для пагинации).
+
+    Возвращает:
+        Список ORM-объектов Employee.
+    """
+    base = await _filtered_employees_query(
+        session,
+        org_unit_id=org_unit_id,
+        skill_filters=skill_filters,
+        titles=titles,
+        legal_entity_ids=legal_entity_ids,
+    )
+    if base is None:
+        return []
+
     if not q or not q.strip():
         stmt = base.order_by(
             Employee.last_name.asc(),
@@ -290,39 +428,32 @@ async def search_employees(
         return res.scalars().all()
 
     q_raw = q.strip()
-
-    tsq = func.websearch_to_tsquery("russian", q_raw)
-    ts_match = Employee.search_tsv.op("@@")(tsq)
-    ts_rank = func.ts_rank_cd(Employee.search_tsv, tsq)
-
-    normalized_q = func.unaccent(func.lower(literal(q_raw)))
-
-    lname = func.unaccent(func.lower(func.coalesce(Employee.last_name, "")))
-    fname = func.unaccent(func.lower(func.coalesce(Employee.first_name, "")))
-    title = func.unaccent(func.lower(func.coalesce(Employee.title, "")))
-    blob = func.coalesce(Employee.search_text_norm, "")
-
-    sim_any = func.greatest(
-        func.similarity(lname, normalized_q),
-        func.similarity(fname, normalized_q),
-        func.similarity(title, normalized_q),
-        func.similarity(blob, normalized_q),
+    await set_trgm_thresholds(session)
+
+    # фаза 1: кандидаты через индексы; MATERIALIZED не даёт планировщику
+    # смешать их отбор с ранжированием
+    candidates = (
+        search_candidates_query(q_raw, base)
+        .cte("search_candidates")
+        .prefix_with("MATERIALIZED")
     )
 
-    base = base.where(
-        or_(
-            ts_match,
-            sim_any >= TRGM_SIM_THRESHOLD,
-        ),
+    # фаза 2: ранжирование только кандидатов
+    _, ts_match, similarity = _search_terms(q_raw)
+    ts_rank = func.ts_rank_cd(
+        Employee.search_tsv,
+        func.websearch_to_tsquery("russian", q_raw),
     )
 
     effective_limit = limit or SEARCH_DEFAULT_LIMIT
 
     stmt = (
-        base.order_by(
+        select(Employee)
+        .join(candidates, candidates.c.id == Employee.id)
+        .order_by(
             ts_match.desc(),
             ts_rank.desc(),
-            sim_any.desc(),
+            similarity.desc(),
             Employee.last_name.asc(),
             Employee.first_name.asc(),
         )
@@ -334,27 +465,238 @@ async def search_employees(
     return res.scalars().all()
 
 
-async def search_skill_names(
+@dataclass(frozen=True)
+class FacetCount:
+    """Значение фасета и число сотрудников с ним.
+
+    Для орг-юнитов value — название, id — идентификатор юнита.
+    """
+
+    value: str
+    count: int
+    id: int | None = None
+
+
+@dataclass(frozen=True)
+class SkillFacetCount:
+    """Число сотрудников с навыком на данном уровне."""
+
+    skill: str
+    level: int
+    count: int
+
+
+@dataclass
+class FacetCounts:
+    """Счётчики фасетов по выборке поиска сотрудников.
+
+    truncated=True — под фильтры подходит больше FACET_SCAN_LIMIT
+    сотрудников; тогда total и счётчики посчитаны по первым
+    FACET_SCAN_LIMIT из них.
+    """
+
+    total: int = 0
+    truncated: bool = False
+    titles: list[FacetCount] = field(default_factory=list)
+    legal_entities: list[FacetCount] = field(default_factory=list)
+    departments: list[FacetCount] = field(default_factory=list)
+    work_cities: list[FacetCount] = field(default_factory=list)
+    work_formats: list[FacetCount] = field(default_factory=list)
+    skills: list[SkillFacetCount] = field(default_factory=list)
+
+
+def _employee_legal_entities(employees: CTE) -> Subquery:
+    """Пары (employee_id, legal_entity_id) для сотрудников из employees.
+
+    Правила те же, что у _resolve_units_for_legal_entities (фильтр по
+    юрлицу): сотрудник относится к юрлицу через неархивный департамент
+    юрлица или через неархивное направление такого департамента.
+    """
+    department = aliased(OrgUnit)
+    direction = aliased(OrgUnit)
+    active_department = and_(
+        department.unit_type == "department",
+        department.is_archived.is_(False),
+    )
+
+    via_department = (
+        select(employees.c.id, department.parent_id)
+        .join(Employee, Employee.id == employees.c.id)
+        .join(department, department.id == Employee.department_id)
+        .where(active_department)
+    )
+    via_direction = (
+        select(employees.c.id, department.parent_id)
+        .join(Employee, Employee.id == employees.c.id)
+        .join(direction, direction.id == Employee.direction_id)
+        .join(department, department.id == direction.parent_id)
+        .where(
+            direction.unit_type == "direction",
+            direction.is_archived.is_(False),
+            active_department,
+        )
+    )
+    return union(via_department, via_direction).subquery("employee_legal_entity")
+
+
+async def count_employee_facets(
     session: AsyncSession,
     q: str | None = None,
-    limit: int = SKILL_SEARCH_LIMIT,
-) -> list[str]:
-    """Возвращает список имён навыков с опциональным фильтром по префиксу."""
-    skills_subq = (
+    *,
+    skill_filters: dict[str, SkillLevelRange] | None = None,
+    titles: list[str] | None = None,
+    legal_entity_ids: list[int] | None = None,
+) -> FacetCounts:
+    """Считает фасеты (должность, юрлицо, департамент, город, формат
+    работы, уровни навыков) по сотрудникам, найденным search_employees.
+
+    Все счётчики считаются одним запросом: выборка материализуется в CTE
+    (первые FACET_SCAN_LIMIT сотрудников), а GROUP BY GROUPING SETS
+    группирует её по каждому фасету за один проход. Юрлица сотрудника
+    определяются так же, как в фильтре legal_entity_ids, поэтому выбор
+    значения фасета даёт столько сотрудников, сколько в нём показано.
+    Параметры — как у search_employees.
+    """
+    base = await _filtered_employees_query(
+        session,
+        skill_filters=skill_filters,
+        titles=titles,
+        legal_entity_ids=legal_entity_ids,
+    )
+    if base is None:
+        return FacetCounts()
+
+    if q and q.strip():
+        await set_trgm_thresholds(session)
+        matched = search_candidates_query(q.strip(), base)
+    else:
+        matched = base.with_only_columns(Employee.id)
+
+    scanned = (
+        matched.limit(FACET_SCAN_LIMIT)
+        .cte("facet_employees")
+        .prefix_with("MATERIALIZED")
+    )
+    # выборка обрезана, если за лимитом есть ещё хоть один сотрудник;
+    # подзапрос не коррелирован и выполняется один раз
+    overflow = matched.offset(FACET_SCAN_LIMIT).exists()
+    employee_legal_entity = _employee_legal_entities(scanned)
+
+    department = aliased(OrgUnit)
+    legal_entity = aliased(OrgUnit)
+    # порядок совпадает с аргументами GROUPING(...) ниже
+    keys = (
+        Employee.title,
+        legal_entity.id,
+        department.id,
+        Employee.work_city,
+        Employee.work_format,
+        EmployeeSkill.skill,
+    )
+
+    stmt = (
         select(
-            func.jsonb_object_keys(Employee.skill_ratings).label("skill"),
+            func.grouping(*keys).label("grouping"),
+            Employee.title,
+            legal_entity.id.label("legal_entity_id"),
+            legal_entity.name.label("legal_entity_name"),
+            department.id.label("department_id"),
+            department.name.label("department_name"),
+            Employee.work_city,
+            Employee.work_format,
+            EmployeeSkill.skill,
+            EmployeeSkill.level,
+            # строки размножены навыками и юрлицами, поэтому считаем
+            # уникальных
+            func.count(distinct(Employee.id)).label("count"),
+            overflow.label("truncated"),
+        )
+        .select_from(scanned)
+        .join(Employee, Employee.id == scanned.c.id)
+        .outerjoin(department, department.id == Employee.department_id)
+        .outerjoin(
+            employee_legal_entity,
+            employee_legal_entity.c.id == Employee.id,
+        )
+        .outerjoin(
+            legal_entity,
+            and_(
+                legal_entity.id == employee_legal_entity.c.parent_id,
+                legal_entity.unit_type == "legal_entity",
+            ),
         )
-        .where(Employee.skill_ratings.is_not(None))
-        .subquery()
+        .outerjoin(EmployeeSkill, EmployeeSkill.employee_id == Employee.id)
+        .group_by(
+            func.grouping_sets(
+                tuple_(),
+                tuple_(Employee.title),
+                tuple_(legal_entity.id, legal_entity.name),
+                tuple_(department.id, department.name),
+                tuple_(Employee.work_city),
+                tuple_(Employee.work_format),
+                tuple_(EmployeeSkill.skill, EmployeeSkill.level),
+            ),
+        )
+        .order_by(desc("count"))
     )
 
-    stmt = select(func.distinct(skills_subq.c.skill))
+    # GROUPING() ставит бит каждому ключу, по которому строка НЕ группирована
+    all_bits = (1 << len(keys)) - 1
+    facet_by_grouping = {
+        all_bits ^ (1 << (len(keys) - 1 - i)): i for i in range(len(keys))
+    }
+
+    facets = FacetCounts()
+    collected: list[list[Any]] = [[] for _ in keys]
+    for row in (await session.execute(stmt)).all():
+        if row.grouping == all_bits:
+            facets.total = row.count
+            facets.truncated = row.truncated
+            continue
+
+        index = facet_by_grouping[row.grouping]
+        if index == 0 and row.title:
+            collected[0].append(FacetCount(row.title, row.count))
+        elif index == 1 and row.legal_entity_id is not None:
+            collected[1].append(
+                FacetCount(row.legal_entity_name, row.count, row.legal_entity_id),
+            )
+        elif index == 2 and row.department_id is not None:
+            collected[2].append(
+                FacetCount(row.department_name, row.count, row.department_id),
+            )
+        elif index == 3 and row.work_city:
+            collected[3].append(FacetCount(row.work_city, row.count))
+        elif index == 4 and row.work_format:
+            collected[4].append(FacetCount(row.work_format, row.count))
+        elif index == 5 and row.skill is not None:
+            collected[5].append(SkillFacetCount(row.skill, row.level, row.count))
+
+    (
+        facets.titles,
+        facets.legal_entities,
+        facets.departments,
+        facets.work_cities,
+        facets.work_formats,
+        facets.skills,
+    ) = (values[:FACET_VALUES_LIMIT] for values in collected)
+
+    return facets
+
+
+async def search_skill_names(
+    session: AsyncSession,
+    q: str | None = None,
+    limit: int = SKILL_SEARCH_LIMIT,
+) -> list[str]:
+    """Возвращает список имён навыков с опциональным фильтром по префиксу."""
+    stmt = select(EmployeeSkill.skill).distinct()
 
     if q and q.strip():
         pattern = f"%{q.strip()}%"
-        stmt = stmt.where(skills_subq.c.skill.ilike(pattern))
+        stmt = stmt.where(EmployeeSkill.skill.ilike(pattern))
 
-    stmt = stmt.order_by(skills_subq.c.skill.asc()).limit(limit)
+    stmt = stmt.order_by(EmployeeSkill.skill.asc()).limit(limit)
 
     res = await session.execute(stmt)
     return [row[0] for row in res.all()]
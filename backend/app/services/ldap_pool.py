@@ -0,0 +1,253 @@
+"""Пул переиспользуемых LDAP-подключений к AD.
+
+Подключения создаются лениво и живут на уровне процесса: синхронизация и
+точечные запросы к AD берут уже открытое и забинженное подключение вместо
+того, чтобы каждый раз заново создавать Server/Connection и выполнять bind.
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+from ldap3 import ALL, BASE, NONE, SYNC, Connection, Server
+from ldap3.core.exceptions import (
+    LDAPBindError,
+    LDAPCommunicationError,
+    LDAPException,
+)
+from ldap3.protocol.formatters.formatters import format_integer, format_uuid_le
+
+from app.core.config import settings
+from app.utils.logger import logger
+
+T = TypeVar("T")
+
+# Без загрузки схемы ldap3 не знает синтаксис атрибутов, поэтому задаём
+# форматтеры явно: objectGUID и userAccountControl приходят в том же виде,
+# что и при get_info=ALL ("{guid}" и int), и external_ref не меняется.
+AD_ATTRIBUTE_FORMATTERS: dict[str, Callable] = {
+    "objectGUID": format_uuid_le,
+    "userAccountControl": format_integer,
+}
+
+
+class LdapPoolTimeout(LDAPException):
+    """Не удалось получить подключение из пула за отведённое время."""
+
+
+class LdapConnectionPool:
+    """Потокобезопасный пул синхронных подключений ldap3.
+
+    Подключение выдаётся в монопольное пользование через connection();
+    после использования возвращается в пул. Подключение, простоявшее без
+    дела дольше health_check_interval, перед выдачей проверяется дешёвым
+    запросом к rootDSE и при сбое пересоздаётся (с новым bind).
+    """
+
+    def __init__(
+        self,
+        server_factory: Callable[[], Server],
+        *,
+        user: str | None,
+        password: str | None,
+        max_size: int = 4,
+        health_check_interval: float = 60.0,
+        acquire_timeout: float = 30.0,
+        client_strategy: str = SYNC,
+    ) -> None:
+        """Создаёт пустой пул; подключения открываются по требованию.
+
+        Args:
+            server_factory: Фабрика ldap3.Server (вызывается один раз).
+            user: DN/UPN для bind.
+            password: Пароль для bind.
+            max_size: Максимальное число одновременно открытых подключений.
+            health_check_interval: Через сколько секунд простоя подключение
+                проверяется перед повторной выдачей.
+            acquire_timeout: Сколько секунд ждать свободного подключения.
+            client_strategy: Стратегия ldap3 (SYNC, MOCK_SYNC для тестов).
+        """
+        self._server_factory = server_factory
+        self._server: Server | None = None
+        self._user = user
+        self._password = password
+        self._client_strategy = client_strategy
+        self._health_check_interval = health_check_interval
+        self._acquire_timeout = acquire_timeout
+
+        self._idle: queue.LifoQueue[tuple[Connection, float]] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max(1, max_size))
+        self._lock = threading.Lock()
+
+    @property
+    def server(self) -> Server:
+        """Возвращает ldap3.Server, создавая его при первом обращении."""
+        with self._lock:
+            if self._server is None:
+                self._server = self._server_factory()
+            return self._server
+
+    def _open(self) -> Connection:
+        """Открывает и биндит новое подключение."""
+        conn = Connection(
+            self.server,
+            user=self._user,
+            password=self._password,
+            client_strategy=self._client_strategy,
+        )
+        # bind() явно, а не auto_bind: mock-стратегии ldap3 auto_bind игнорируют
+        if not conn.bind():
+            self._discard(conn)
+            raise LDAPBindError(
+                f"LDAP bind failed: {conn.result.get('description')}",
+            )
+        return conn
+
+    @staticmethod
+    def _discard(conn: Connection) -> None:
+        """Закрывает подключение, игнорируя ошибки сокета."""
+        try:
+            conn.unbind()
+        except Exception:  # noqa: BLE001
+            pass
+
+    def _is_healthy(self, conn: Connection, last_used: float) -> bool:
+        """Проверяет, что подключение живо и забинжено."""
+        if conn.closed or not conn.bound:
+            return False
+        if time.monotonic() - last_used < self._health_check_interval:
+            return True
+        try:
+            return bool(
+                conn.search(
+                    search_base="",
+                    search_filter="(objectClass=*)",
+                    search_scope=BASE,
+                    attributes=["1.1"],
+                ),
+            )
+        except LDAPException:
+            return False
+
+    def _checkout(self) -> Connection:
+        """Берёт здоровое подключение из пула или открывает новое."""
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+
+            if self._is_healthy(conn, last_used):
+                return conn
+
+            logger.info("[LDAP POOL] stale connection dropped, rebinding")
+            self._discard(conn)
+
+    def acquire(self) -> Connection:
+        """Забирает подключение из пула в монопольное пользование.
+
+        Каждый acquire() должен завершаться release(). Нужен там, где
+        подключение удерживается между несколькими операциями (например,
+        постраничный поиск: cookie AD привязан к подключению).
+        """
+        if not self._slots.acquire(timeout=self._acquire_timeout):
+            raise LdapPoolTimeout(
+                f"LDAP pool exhausted: no free connection "
+                f"in {self._acquire_timeout:.0f}s",
+            )
+        try:
+            return self._checkout()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: Connection, *, discard: bool = False) -> None:
+        """Возвращает подключение в пул или закрывает его.
+
+        Args:
+            conn: Подключение, полученное через acquire().
+            discard: Закрыть подключение вместо возврата (после сбоя связи).
+        """
+        try:
+            if discard or conn.closed or not conn.bound:
+                self._discard(conn)
+            else:
+                self._idle.put((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """Выдаёт подключение в монопольное пользование.
+
+        Если во время работы произошёл сетевой сбой, подключение не
+        возвращается в пул, а закрывается.
+        """
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except LDAPCommunicationError:
+            broken = True
+            raise
+        finally:
+            self.release(conn, discard=broken)
+
+    def run(self, fn: Callable[[Connection], T]) -> T:
+        """Выполняет fn на подключении из пула.
+
+        При обрыве связи операция один раз повторяется на новом подключении
+        (например, если контроллер домена закрыл простаивающий сокет).
+        """
+        try:
+            with self.connection() as conn:
+                return fn(conn)
+        except LDAPCommunicationError as exc:
+            logger.warning("[LDAP POOL] connection lost (%s), retrying", exc)
+            with self.connection() as conn:
+                return fn(conn)
+
+    def close(self) -> None:
+        """Закрывает все простаивающие подключения."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(conn)
+
+
+def _make_ad_server() -> Server:
+    """Создаёт ldap3.Server по настройкам AD."""
+    return Server(
+        settings.AD_LDAP_HOST,
+        port=settings.AD_LDAP_PORT,
+        use_ssl=settings.AD_USE_SSL,
+        get_info=ALL if settings.AD_LDAP_LOAD_SCHEMA else NONE,
+        formatter=AD_ATTRIBUTE_FORMATTERS,
+        connect_timeout=settings.AD_CONNECT_TIMEOUT,
+    )
+
+
+_ad_pool: LdapConnectionPool | None = None
+_ad_pool_lock = threading.Lock()
+
+
+def get_ad_pool() -> LdapConnectionPool:
+    """Возвращает пул подключений к AD, создавая его один раз на процесс."""
+    global _ad_pool  # noqa: PLW0603
+    with _ad_pool_lock:
+        if _ad_pool is None:
+            _ad_pool = LdapConnectionPool(
+                _make_ad_server,
+                user=settings.AD_BIND_USER,
+                password=settings.AD_BIND_PASSWORD,
+                max_size=settings.AD_POOL_SIZE,
+                health_check_interval=settings.AD_POOL_HEALTH_CHECK_SECONDS,
+            )
+        return _ad_pool
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import async_session_maker
+from app.models.media_deletion import MediaDeletion
+from app.services.storage_service import DELETE_OBJECTS_LIMIT, delete_objects
+from app.utils.logger import logger
+
+# Задержка повтора после неудачи: 1 мин, 2 мин, 4 мин ... не больше 6 ч
+_RETRY_BASE_SECONDS = 60
+_RETRY_MAX_SECONDS = 6 * 60 * 60
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Экспоненциальная задержка перед следующей попыткой."""
+    seconds = _RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1)
+    return timedelta(seconds=min(seconds, _RETRY_MAX_SECONDS))
+
+
+async def drain_media_deletion_batch(
+    session: AsyncSession,
+    *,
+    batch_size: int = DELETE_OBJECTS_LIMIT,
+) -> tuple[int, int]:
+    """Удаляет из бакета одну пачку объектов из очереди и фиксирует итог.
+
+    Строки очереди берутся FOR UPDATE SKIP LOCKED, поэтому несколько
+    воркеров (процессов API) не удаляют одни и те же объекты. Удалённые
+    объекты убираются из очереди, неудачные откладываются с
+    экспоненциальной задержкой.
+
+    Возвращает (удалено, отложено).
+    """
+    now = datetime.now(timezone.utc)
+    rows = (
+        await session.execute(
+            select(MediaDeletion)
+            .where(MediaDeletion.not_before <= now)
+            .order_by(MediaDeletion.id.asc())
+            .limit(min(batch_size, DELETE_OBJECTS_LIMIT))
+            .with_for_update(skip_locked=True),
+        )
+    ).scalars().all()
+    if not rows:
+        await session.commit()
+        return 0, 0
+
+    try:
+        failed = await delete_objects([row.storage_key for row in rows])
+    except Exception as exc:  # noqa: BLE001
+        failed = {row.storage_key: str(exc) for row in rows}
+
+    done_ids = [row.id for row in rows if row.storage_key not in failed]
+    if done_ids:
+        await session.execute(
+            delete(MediaDeletion).where(MediaDeletion.id.in_(done_ids)),
+        )
+
+    for row in rows:
+        error = failed.get(row.storage_key)
+        if error is None:
+            continue
+        row.attempts += 1
+        row.last_error = error[:1000]
+        row.not_before = now + _retry_delay(row.attempts)
+
+    await session.commit()
+
+    if failed:
+        logger.warning(
+            "[MEDIA] deletion postponed for %d objects: %s",
+            len(failed),
+            next(iter(failed.values())),
+        )
+    return len(done_ids), len(failed)
+
+
+async def drain_media_deletions(
+    session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+    *,
+    batch_size: int = DELETE_OBJECTS_LIMIT,
+) -> tuple[int, int]:
+    """Опустошает очередь: пачки идут, пока есть готовые к удалению строки.
+
+    Возвращает суммарно (удалено, отложено).
+    """
+    deleted = postponed = 0
+    while True:
+        async with session_maker() as session:
+            done, failed = await drain_media_deletion_batch(
+                session,
+                batch_size=batch_size,
+            )
+        deleted += done
+        postponed += failed
+        if done + failed < min(batch_size, DELETE_OBJECTS_LIMIT):
+            return deleted, postponed
+
+
+async def run_media_deletion_worker() -> None:
+    """Фоновая задача приложения: периодически опустошает очередь.
+
+    Интервал и размер пачки — media_deletion_interval_seconds и
+    media_deletion_batch_size. Ошибки итерации логируются, воркер
+    продолжает работу до отмены.
+    """
+    while True:
+        try:
+            deleted, postponed = await drain_media_deletions(
+                batch_size=settings.media_deletion_batch_size,
+            )
+            if deleted or postponed:
+                logger.info(
+                    "[MEDIA] deletion queue: deleted %d, postponed %d",
+                    deleted,
+                    postponed,
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("[MEDIA] deletion worker iteration failed: %s", exc)
+
+        await asyncio.sleep(settings.media_deletion_interval_seconds)
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.db.session import async_session_maker
+from app.models.employee import Employee
+from app.models.media import Media
+from app.models.media_deletion import MediaDeletion
+from app.models.media_variant import MediaVariant
+from app.models.photo_moderation import PhotoModeration
+from app.services.media_service import schedule_media_deletion
+from app.services.storage_service import MEDIA_PREFIX, list_objects
+from app.utils.logger import logger
+
+
+@dataclass
+class MediaGcResult:
+    """Итог прохода сборщика мусора медиа."""
+
+    # записи media без ссылок (удалены вместе с объектами)
+    orphan_media: int = 0
+    # объекты бакета без записи в БД
+    orphan_objects: int = 0
+    # просмотрено объектов бакета
+    scanned_objects: int = 0
+
+
+async def find_orphan_media_ids(
+    session: AsyncSession,
+    *,
+    created_before: datetime,
+    after_id: int = 0,
+    limit: int = 1000,
+) -> list[int]:
+    """Возвращает id media, на которые никто не ссылается.
+
+    Один анти-join: нет сотрудника с таким photo_id и нет заявки на
+    модерацию в статусе pending. Решённые заявки запись не удерживают:
+    внешний ключ photo_moderation.media_id — ON DELETE SET NULL, поэтому
+    после удаления media заявка остаётся в истории без фото. Записи
+    моложе created_before не берутся.
+    """
+    used_as_photo = select(Employee.id).where(Employee.photo_id == Media.id).exists()
+    pending = (
+        select(PhotoModeration.id)
+        .where(
+            PhotoModeration.media_id == Media.id,
+            PhotoModeration.status == "pending",
+        )
+        .exists()
+    )
+    rows = await session.execute(
+        select(Media.id)
+        .where(
+            Media.id > after_id,
+            Media.created_at < created_before,
+            ~used_as_photo,
+            ~pending,
+        )
+        .order_by(Media.id)
+        .limit(limit),
+    )
+    return list(rows.scalars())
+
+
+async def find_unknown_keys(
+    session: AsyncSession,
+    storage_keys: list[str],
+) -> list[str]:
+    """Отбирает ключи, которых нет ни в media, ни в media_variant.
+
+    Ключи, уже стоящие в очереди media_deletion, тоже отбрасываются.
+    """
+    known: set[str] = set()
+    for column in (
+        Media.storage_key,
+        MediaVariant.storage_key,
+        MediaDeletion.storage_key,
+    ):
+        rows = await session.execute(
+            select(column).where(column.in_(storage_keys)),
+        )
+        known.update(rows.scalars())
+    return [key for key in storage_keys if key not in known]
+
+
+async def collect_orphan_media(
+    session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+    *,
+    grace: timedelta,
+    batch_size: int = 1000,
+    dry_run: bool = False,
+) -> int:
+    """Удаляет записи media без ссылок и ставит их объекты в очередь.
+
+    Каждая пачка — отдельная транзакция. Возвращает число найденных
+    записей (при dry_run ничего не удаляется).
+    """
+    created_before = datetime.now(timezone.utc) - grace
+    total = 0
+    after_id = 0
+    while True:
+        async with session_maker() as session:
+            ids = await find_orphan_media_ids(
+                session,
+                created_before=created_before,
+                after_id=after_id,
+                limit=batch_size,
+            )
+            if not ids:
+                return total
+            if not dry_run:
+                await schedule_media_deletion(session, ids)
+                await session.commit()
+        total += len(ids)
+        after_id = ids[-1]
+
+
+async def collect_orphan_objects(
+    session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+    *,
+    grace: timedelta,
+    prefix: str = MEDIA_PREFIX,
+    dry_run: bool = False,
+) -> tuple[int, int]:
+    """Ставит в очередь удаления объекты бакета, которых нет в БД.
+
+    Бакет читается постранично (ListObjectsV2); для каждой страницы
+    известные ключи отбираются одним запросом к каждой таблице. Объекты
+    моложе grace-периода пропускаются: это незавершённые загрузки.
+
+    Возвращает (просмотрено объектов, найдено сирот).
+    """
+    modified_before = datetime.now(timezone.utc) - grace
+    scanned = orphans = 0
+    async for page in list_objects(prefix):
+        scanned += len(page)
+        candidates = [key for key, modified in page if modified < modified_before]
+        if not candidates:
+            continue
+
+        async with session_maker() as session:
+            unknown = await find_unknown_keys(session, candidates)
+            if unknown and not dry_run:
+                await session.execute(
+                    pg_insert(MediaDeletion)
+                    .values([{"storage_key": key} for key in unknown])
+                    .on_conflict_do_nothing(),
+                )
+                await session.commit()
+        orphans += len(unknown)
+    return scanned, orphans
+
+
+async def collect_media_garbage(
+    session_maker: async_sessionmaker[AsyncSession] = async_session_maker,
+    *,
+    grace: timedelta | None = None,
+    batch_size: int | None = None,
+    dry_run: bool = False,
+) -> MediaGcResult:
+    """Полный проход сборщика мусора медиа.
+
+    Сначала удаляются записи media без ссылок (их объекты уходят в
+    очередь media_deletion), затем бакет сверяется с БД. Сами объекты
+    удаляет воркер очереди пачками через DeleteObjects.
+    """
+    if grace is None:
+        grace = timedelta(hours=settings.media_gc_grace_hours)
+    if batch_size is None:
+        batch_size = settings.media_gc_batch_size
+
+    result = MediaGcResult()
+    result.orphan_media = await collect_orphan_media(
+        session_maker,
+        grace=grace,
+        batch_size=batch_size,
+        dry_run=dry_run,
+    )
+    result.scanned_objects, result.orphan_objects = await collect_orphan_objects(
+        session_maker,
+        grace=grace,
+        dry_run=dry_run,
+    )
+
+    logger.info(
+        "[MEDIA] gc%s: orphan media %d, orphan objects %d of %d scanned",
+        " (dry run)" if dry_run else "",
+        result.orphan_media,
+        result.orphan_objects,
+        result.scanned_objects,
+    )
+    return result
@@ -1,53 +1,285 @@
 from __future__ import annotations
 
-from sqlalchemy import select
+from collections.abc import Iterable
+
+from sqlalchemy import ColumnElement, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
+from app.core.config import settings
+from app.models.employee import Employee
 from app.models.media import Media
-from app.services.storage_service import delete_object, object_public_url
+from app.models.media_deletion import MediaDeletion
+from app.models.media_variant import MediaVariant
+from app.models.photo_moderation import PhotoModeration
+from app.schemas.media import MediaInfo
+from app.services.storage_service import (
+    head_object,
+    object_public_urls,
+    object_sha256,
+)
+from app.utils.logger import logger
+
 
+async def _media_in_use(session: AsyncSession, media_ids: set[int]) -> set[int]:
+    """Отбирает media, которые стоят аватаром или ждут модерации."""
+    in_use = set(
+        (
+            await session.execute(
+                select(Employee.photo_id).where(Employee.photo_id.in_(media_ids)),
+            )
+        ).scalars(),
+    )
+    in_use.update(
+        (
+            await session.execute(
+                select(PhotoModeration.media_id).where(
+                    PhotoModeration.media_id.in_(media_ids),
+                    PhotoModeration.status == "pending",
+                ),
+            )
+        ).scalars(),
+    )
+    return in_use
 
-async def delete_media_and_object_by_id(
+
+async def _claim_media(
     session: AsyncSession,
-    media_id: int,
-) -> bool:
-    """Удаляет объект из бакета и запись media по id.
+    condition: ColumnElement[bool],
+) -> Media | None:
+    """Выдаёт существующую запись media для новой загрузки.
+
+    Берётся первая по id запись под condition. Она блокируется, а её
+    created_at сдвигается на текущий момент: сборщик мусора пропускает
+    заблокированные записи и заново отсчитывает grace-период, поэтому
+    файл не удалится, пока загрузивший не сошлётся на него из аватара
+    или заявки. None — записи нет (или её только что удалил сборщик).
+    """
+    first_id = select(func.min(Media.id)).where(condition).scalar_subquery()
+    res = await session.execute(
+        update(Media)
+        .where(Media.id == first_id)
+        .values(created_at=func.now())
+        .returning(Media),
+    )
+    return res.scalar_one_or_none()
+
+
+async def schedule_media_deletion(
+    session: AsyncSession,
+    media_ids: Iterable[int | None],
+) -> int:
+    """Удаляет записи media без ссылок и ставит их объекты в очередь.
+
+    Одна запись media может быть общей для нескольких сотрудников и
+    заявок (дедупликация по SHA-256), поэтому записи, которые стоят
+    аватаром или ждут модерации, пропускаются — вызывающему коду не нужно
+    проверять это самому. Ссылки проверяются под блокировкой строк:
+    новая ссылка на media при проверке внешнего ключа ждёт конца нашей
+    транзакции, а записи, заблокированные другой транзакцией (например,
+    выданные повторной загрузке того же файла), пропускаются.
+
+    Объекты из бакета удаляет фоновый воркер (см.
+    app.services.media_cleanup), поэтому вызов не ходит в хранилище и
+    выполняется в транзакции вызывающего кода: при откате не потеряется
+    ни запись, ни объект.
 
-    Возвращает:
-      - True, если media найдена и объект в бакете успешно удалён,
-      - False, если media не найдена или удаление из бакета не удалось.
+    Возвращает число удалённых записей media.
     """
-    media = (
+    ids = {media_id for media_id in media_ids if media_id}
+    if not ids:
+        return 0
+
+    locked = await session.execute(
+        select(Media.id)
+        .where(Media.id.in_(ids))
+        .order_by(Media.id)
+        .with_for_update(skip_locked=True),
+    )
+    ids = set(locked.scalars())
+    if ids:
+        ids -= await _media_in_use(session, ids)
+    if not ids:
+        return 0
+
+    Variant = aliased(MediaVariant)
+
+    # превью удаляются каскадом вместе с media — их ключи забираем заранее;
+    # ключ превью выводится из содержимого, поэтому общие с другими media
+    # объекты не трогаем
+    shared = (
+        select(MediaVariant.id)
+        .where(
+            MediaVariant.storage_key == Variant.storage_key,
+            MediaVariant.media_id.not_in(ids),
+        )
+        .exists()
+    )
+    variant_keys = (
         await session.execute(
-            select(Media).where(Media.id == media_id),
+            select(Variant.storage_key).where(Variant.media_id.in_(ids), ~shared),
         )
-    ).scalar_one_or_none()
+    ).scalars().all()
+
+    res = await session.execute(
+        delete(Media).where(Media.id.in_(ids)).returning(Media.storage_key),
+    )
+    deleted = [key for (key,) in res.all()]
+    storage_keys = list(dict.fromkeys([*deleted, *variant_keys]))
+    if storage_keys:
+        await session.execute(
+            pg_insert(MediaDeletion)
+            .values([{"storage_key": key} for key in storage_keys])
+            .on_conflict_do_nothing(),
+        )
+    return len(deleted)
 
-    if not media:
-        return False
 
-    try:
-        await delete_object(media.storage_key)
-    except Exception:  # noqa: BLE001
-        return False
+async def finalize_media_upload(
+    session: AsyncSession,
+    storage_key: str,
+) -> Media | None:
+    """Регистрирует загруженный объект как media с дедупликацией.
 
-    await session.delete(media)
-    return True
+    Объект проверяется HEAD-запросом: размер и Content-Type сохраняются
+    в записи. SHA-256 берётся из контрольной суммы S3 (если клиент
+    передал её при init), иначе считается по содержимому. Если такой
+    файл уже есть, возвращается существующая запись (см. _claim_media), а
+    дубликат ставится в очередь на удаление. Повторный finalize того же
+    ключа возвращает ту же запись.
 
+    Возвращает None, если объекта нет в бакете.
+    """
+    existing = await _claim_media(session, Media.storage_key == storage_key)
+    if existing is not None:
+        return existing
 
-async def resolve_media_public_url(
-    session: AsyncSession,
-    media_id: int,
-) -> str | None:
-    """Возвращает public_url по media_id или None, если записи нет."""
-    if not media_id:
+    meta = await head_object(storage_key)
+    if meta is None:
         return None
+    sha256 = meta.sha256 or await object_sha256(storage_key)
 
-    row = await session.execute(
-        select(Media.storage_key).where(Media.id == media_id),
+    while True:
+        # ON CONFLICT без цели — и по storage_key, и по uq_media_sha256
+        res = await session.execute(
+            pg_insert(Media)
+            .values(
+                storage_key=storage_key,
+                byte_size=meta.byte_size,
+                content_type=meta.content_type,
+                sha256=sha256,
+            )
+            .on_conflict_do_nothing()
+            .returning(Media.id),
+        )
+        media_id = res.scalar_one_or_none()
+        if media_id is not None:
+            break
+
+        original = await _claim_media(
+            session,
+            (Media.sha256 == sha256) | (Media.storage_key == storage_key),
+        )
+        if original is None:
+            # запись, с которой конфликтовала вставка, успел удалить
+            # сборщик мусора — вставляем заново
+            continue
+        if original.storage_key != storage_key:
+            await session.execute(
+                pg_insert(MediaDeletion)
+                .values(storage_key=storage_key)
+                .on_conflict_do_nothing(),
+            )
+            logger.info(
+                "[MEDIA] upload %s deduplicated to media %s",
+                storage_key,
+                original.id,
+            )
+        return original
+
+    # ключ от содержимого мог остаться в очереди от удалённой записи
+    await session.execute(
+        delete(MediaDeletion).where(MediaDeletion.storage_key == storage_key),
     )
-    storage_key = row.scalar_one_or_none()
-    if not storage_key:
-        return None
+    return await session.get(Media, media_id)
+
+
+async def merge_duplicate_media(
+    session: AsyncSession,
+    keep_id: int,
+    duplicate_ids: Iterable[int],
+) -> int:
+    """Переносит ссылки с дубликатов на keep_id и удаляет дубликаты.
+
+    Ссылки — фото сотрудников и заявки на модерацию. Объекты дубликатов
+    ставятся в очередь на удаление. Возвращает число удалённых записей.
+    """
+    ids = {media_id for media_id in duplicate_ids if media_id != keep_id}
+    if not ids:
+        return 0
+
+    await session.execute(
+        update(Employee)
+        .where(Employee.photo_id.in_(ids))
+        .values(photo_id=keep_id),
+    )
+    await session.execute(
+        update(PhotoModeration)
+        .where(PhotoModeration.media_id.in_(ids))
+        .values(media_id=keep_id),
+    )
+    return await schedule_media_deletion(session, ids)
 
-    return object_public_url(storage_key)
+
+async def resolve_media_infos(
+    session: AsyncSession,
+    media_ids: Iterable[int | None],
+    *,
+    prefer_size: int | None = None,
+) -> dict[int, MediaInfo]:
+    """Возвращает MediaInfo с URL превью для набора media одним запросом.
+
+    Если задан prefer_size и такое превью есть, public_url указывает на
+    него (списки сотрудников), иначе — на оригинал. URL всей пачки
+    строятся одним вызовом (для приватного бакета — из кеша подписей).
+    Записи без URL в результат не попадают.
+    """
+    ids = {media_id for media_id in media_ids if media_id}
+    if not ids:
+        return {}
+
+    rows = await session.execute(
+        select(Media.id, Media.storage_key, MediaVariant.size, MediaVariant.storage_key)
+        .outerjoin(
+            MediaVariant,
+            (MediaVariant.media_id == Media.id)
+            & (MediaVariant.format == settings.media_variant_format),
+        )
+        .where(Media.id.in_(ids)),
+    )
+
+    rows = rows.all()
+    urls = object_public_urls(
+        [key for row in rows for key in (row[1], row[3]) if key],
+    )
+
+    originals: dict[int, str] = {}
+    variants: dict[int, dict[int, str]] = {}
+    for media_id, storage_key, size, variant_key in rows:
+        originals[media_id] = storage_key
+        url = urls.get(variant_key) if variant_key else None
+        if url:
+            variants.setdefault(media_id, {})[size] = url
+
+    infos: dict[int, MediaInfo] = {}
+    for media_id, storage_key in originals.items():
+        sized = variants.get(media_id, {})
+        url = (
+            sized.get(prefer_size)
+            if prefer_size is not None and prefer_size in sized
+            else urls.get(storage_key)
+        )
+        if url:
+            infos[media_id] = MediaInfo(id=media_id, public_url=url, variants=sized)
+    return infos
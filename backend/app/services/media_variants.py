@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import TypeVar
+
+from PIL import Image, ImageOps
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.media import Media
+from app.models.media_deletion import MediaDeletion
+from app.models.media_variant import MediaVariant
+from app.services.storage_service import (
+    IMMUTABLE_CACHE_CONTROL,
+    MEDIA_VARIANT_PREFIX,
+    get_object_bytes,
+    put_object_bytes,
+)
+from app.utils.logger import logger
+
+# Формат превью → (формат Pillow, MIME-тип, расширение)
+VARIANT_FORMATS: dict[str, tuple[str, str, str]] = {
+    "webp": ("WEBP", "image/webp", "webp"),
+    "jpeg": ("JPEG", "image/jpeg", "jpg"),
+}
+
+# Защита от «декомпрессионных бомб»: не больше ~50 Мп
+Image.MAX_IMAGE_PIXELS = 50_000_000
+
+_pool: ProcessPoolExecutor | None = None
+
+_T = TypeVar("_T")
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Возвращает пул процессов для ресайза, создавая его один раз."""
+    global _pool  # noqa: PLW0603
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=max(1, settings.media_variant_workers))
+    return _pool
+
+
+async def run_in_image_pool(func: Callable[..., _T], *args: object) -> _T:
+    """Выполняет функцию обработки изображений в пуле процессов.
+
+    Функция и аргументы должны сериализоваться pickle (функции уровня
+    модуля, bytes, списки).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), func, *args)
+
+
+def render_variants(
+    data: bytes,
+    sizes: list[int],
+    fmt: str,
+) -> list[tuple[int, bytes]]:
+    """Строит квадратные превью изображения (выполняется в пуле процессов).
+
+    Изображение поворачивается по EXIF, обрезается по центру до квадрата
+    и уменьшается до каждого размера; увеличения нет — превью не больше
+    меньшей стороны оригинала. Возвращает пары (размер, байты превью).
+    """
+    pil_format = VARIANT_FORMATS[fmt][0]
+
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        has_alpha = image.mode in ("RGBA", "LA") or "transparency" in image.info
+        if pil_format == "JPEG" or not has_alpha:
+            image = image.convert("RGB")
+        else:
+            image = image.convert("RGBA")
+
+        side = min(image.size)
+        square = ImageOps.fit(image, (side, side), method=Image.Resampling.LANCZOS)
+
+        variants: list[tuple[int, bytes]] = []
+        for size in sorted(set(sizes), reverse=True):
+            target = min(size, side)
+            resized = (
+                square
+                if target == side
+                else square.resize((target, target), Image.Resampling.LANCZOS)
+            )
+            out = io.BytesIO()
+            resized.save(out, format=pil_format, quality=82, method=4)
+            variants.append((size, out.getvalue()))
+    return variants
+
+
+def variant_storage_key(data: bytes, ext: str) -> str:
+    """Ключ превью от его содержимого: одинаковые превью — один объект."""
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{MEDIA_VARIANT_PREFIX}{digest[:2]}/{digest}.{ext}"
+
+
+async def generate_media_variants(
+    session: AsyncSession,
+    media: Media,
+) -> int:
+    """Строит и сохраняет превью медиа-объекта.
+
+    Оригинал скачивается из хранилища, ресайз идёт в пуле процессов,
+    превью загружаются под неизменяемыми ключами с долгим Cache-Control
+    и записываются в media_variant. Уже существующие размеры не
+    пересоздаются.
+
+    Возвращает число новых превью.
+    """
+    fmt = settings.media_variant_format
+    if fmt not in VARIANT_FORMATS:
+        raise ValueError(f"Unsupported media variant format: {fmt}")
+    _, content_type, ext = VARIANT_FORMATS[fmt]
+
+    existing = set(
+        (
+            await session.execute(
+                select(MediaVariant.size).where(
+                    MediaVariant.media_id == media.id,
+                    MediaVariant.format == fmt,
+                ),
+            )
+        ).scalars(),
+    )
+    sizes = [size for size in settings.media_variant_sizes if size not in existing]
+    if not sizes:
+        return 0
+
+    data = await get_object_bytes(
+        media.storage_key,
+        max_bytes=settings.media_variant_max_source_bytes,
+    )
+    rendered = await run_in_image_pool(render_variants, data, sizes, fmt)
+
+    rows = []
+    for size, payload in rendered:
+        key = variant_storage_key(payload, ext)
+        await put_object_bytes(
+            key,
+            payload,
+            content_type=content_type,
+            cache_control=IMMUTABLE_CACHE_CONTROL,
+        )
+        rows.append(
+            {
+                "media_id": media.id,
+                "size": size,
+                "format": fmt,
+                "storage_key": key,
+                "byte_size": len(payload),
+            },
+        )
+
+    # тот же объект мог стоять в очереди на удаление (общий ключ превью)
+    await session.execute(
+        delete(MediaDeletion).where(
+            MediaDeletion.storage_key.in_([row["storage_key"] for row in rows]),
+        ),
+    )
+    await session.execute(
+        pg_insert(MediaVariant).values(rows).on_conflict_do_nothing(),
+    )
+    return len(rows)
+
+
+async def try_generate_media_variants(
+    session: AsyncSession,
+    media: Media,
+) -> None:
+    """Как generate_media_variants, но ошибка только логируется.
+
+    Без превью клиенты получают оригинал, поэтому сбой ресайза не должен
+    ломать загрузку фото.
+    """
+    try:
+        async with session.begin_nested():
+            await generate_media_variants(session, media)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning(
+            "[MEDIA] variants for media %s failed: %s",
+            media.id,
+            exc,
+        )
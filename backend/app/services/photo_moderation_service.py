@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import delete, select
+from sqlalchemy import Select, delete, func, or_, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.models.employee import Employee
 from app.models.media import Media
 from app.models.photo_moderation import PhotoModeration
-from app.services.media_service import delete_media_and_object_by_id
+from app.services.media_service import schedule_media_deletion
 
 
 # --- доменные исключения ---
@@ -68,14 +72,52 @@ async def _ensure_media(
 async def _get_by_id(
     session: AsyncSession,
     moderation_id: int,
+    *,
+    for_update: bool = False,
 ) -> PhotoModeration | None:
-    """Возвращает заявку модерации по id или None."""
-    res = await session.execute(
-        select(PhotoModeration).where(PhotoModeration.id == moderation_id),
-    )
+    """Возвращает заявку модерации по id или None.
+
+    С for_update строка блокируется до конца транзакции: параллельные
+    решения по одной заявке выполняются по очереди.
+    """
+    stmt = select(PhotoModeration).where(PhotoModeration.id == moderation_id)
+    if for_update:
+        stmt = stmt.with_for_update()
+    res = await session.execute(stmt)
     return res.scalar_one_or_none()
 
 
+def _check_claim(pm: PhotoModeration, reviewer_id: int) -> None:
+    """Бросает Conflict, если заявку арендовал другой модератор."""
+    if (
+        pm.claimed_by_employee_id is not None
+        and pm.claimed_by_employee_id != reviewer_id
+        and pm.claim_expires_at is not None
+        and pm.claim_expires_at > datetime.now(timezone.utc)
+    ):
+        raise Conflict("Request is claimed by another moderator")
+
+
+def _with_employee_and_photo(*columns: object) -> Select:
+    """SELECT заявок с ФИО сотрудника и ключом фото (JOIN employee и media).
+
+    Строки: (PhotoModeration, first_name, middle_name, last_name,
+    storage_key, *columns).
+    """
+    return (
+        select(
+            PhotoModeration,
+            Employee.first_name,
+            Employee.middle_name,
+            Employee.last_name,
+            Media.storage_key,
+            *columns,
+        )
+        .join(Employee, Employee.id == PhotoModeration.employee_id)
+        .outerjoin(Media, Media.id == PhotoModeration.media_id)
+    )
+
+
 # --- public API ---
 
 
@@ -84,15 +126,47 @@ async def create_or_replace_request_for_employee(
     employee_id: int,
     media_id: int,
 ) -> PhotoModeration:
-    """Создаёт новую pending-заявку на модерацию, удаляя прошлые заявки сотрудника."""
-    await _ensure_employee(session, employee_id)
+    """Создаёт новую pending-заявку на модерацию вместо прежней pending-заявки.
+
+    Решённые заявки остаются в истории модерации. Фото заменённой pending-
+    заявки и отклонённых заявок ставятся в очередь на удаление (отклонённые
+    заявки сохраняются без media_id). Одинаковые файлы дедуплицируются
+    в одну запись media, поэтому повторная отправка текущего аватара или уже
+    отклонённого фото отсекается без модератора.
+    """
+    employee = await _ensure_employee(session, employee_id)
     await _ensure_media(session, media_id)
 
-    await session.execute(
-        delete(PhotoModeration).where(
+    if media_id == employee.photo_id:
+        raise BadRequest("Photo is already the current avatar")
+    rejected = await session.execute(
+        select(PhotoModeration.id)
+        .where(
+            PhotoModeration.employee_id == employee_id,
+            PhotoModeration.media_id == media_id,
+            PhotoModeration.status == "rejected",
+        )
+        .limit(1),
+    )
+    if rejected.scalar_one_or_none() is not None:
+        raise BadRequest("This photo has already been rejected")
+
+    res = await session.execute(
+        delete(PhotoModeration)
+        .where(
+            PhotoModeration.employee_id == employee_id,
+            PhotoModeration.status == "pending",
+        )
+        .returning(PhotoModeration.media_id),
+    )
+    stale_media_ids = set(res.scalars().all())
+    res = await session.execute(
+        select(PhotoModeration.media_id).where(
             PhotoModeration.employee_id == employee_id,
+            PhotoModeration.status == "rejected",
         ),
     )
+    stale_media_ids.update(res.scalars().all())
 
     pm = PhotoModeration(
         employee_id=employee_id,
@@ -104,6 +178,9 @@ async def create_or_replace_request_for_employee(
     )
     session.add(pm)
     await session.flush()
+
+    # новая заявка и текущий аватар удержат свои media сами
+    await schedule_media_deletion(session, stale_media_ids)
     return pm
 
 
@@ -121,16 +198,250 @@ async def get_latest_for_employee(
     return res.scalar_one_or_none()
 
 
-async def list_pending(session: AsyncSession) -> list[PhotoModeration]:
-    """Возвращает все заявки в статусе pending."""
-    rows = (
-        await session.execute(
-            select(PhotoModeration)
-            .where(PhotoModeration.status == "pending")
-            .order_by(PhotoModeration.created_at.asc()),
+@dataclass(frozen=True)
+class ModerationPage:
+    """Страница списка заявок.
+
+    rows — строки (PhotoModeration, first_name, middle_name, last_name,
+    storage_key); next_cursor — курсор следующей страницы или None.
+    """
+
+    rows: list[tuple[PhotoModeration, str, str | None, str, str | None]]
+    total: int
+    next_cursor: str | None
+
+
+def encode_cursor(created_at: datetime, moderation_id: int) -> str:
+    """Кодирует позицию (created_at, id) в непрозрачный курсор."""
+    raw = f"{created_at.isoformat()}|{moderation_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Разбирает курсор страницы или бросает BadRequest."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, moderation_id = (
+            base64.urlsafe_b64decode(padded).decode().split("|", 1)
         )
-    ).scalars().all()
-    return rows
+        return datetime.fromisoformat(created_at), int(moderation_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise BadRequest("Invalid cursor") from exc
+
+
+async def _list_page(
+    session: AsyncSession,
+    *,
+    filters: list,
+    limit: int,
+    cursor: str | None,
+    newest_first: bool,
+) -> ModerationPage:
+    """Страница заявок под фильтрами с keyset-пагинацией по (created_at, id).
+
+    Заявки, ФИО сотрудников, ключи фото и общее число подходящих заявок
+    читаются одним запросом (JOIN employee и media, total — скалярным
+    подзапросом). Без OFFSET: следующая страница начинается строго после
+    (created_at, id) последней строки курсора.
+    """
+    total = (
+        select(func.count())
+        .select_from(PhotoModeration)
+        .where(*filters)
+        .scalar_subquery()
+    )
+
+    if newest_first:
+        order = (PhotoModeration.created_at.desc(), PhotoModeration.id.desc())
+    else:
+        order = (PhotoModeration.created_at.asc(), PhotoModeration.id.asc())
+    stmt = (
+        _with_employee_and_photo(total)
+        .where(*filters)
+        .order_by(*order)
+        .limit(limit + 1)
+    )
+    if cursor:
+        position = tuple_(PhotoModeration.created_at, PhotoModeration.id)
+        after = tuple_(*decode_cursor(cursor))
+        stmt = stmt.where(position < after if newest_first else position > after)
+
+    rows = list((await session.execute(stmt)).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    if rows:
+        count = rows[0][-1]
+    else:
+        count = await session.scalar(select(total))
+
+    return ModerationPage(
+        rows=[tuple(row[:-1]) for row in rows],
+        total=int(count or 0),
+        next_cursor=next_cursor,
+    )
+
+
+async def list_pending_page(
+    session: AsyncSession,
+    *,
+    limit: int,
+    cursor: str | None = None,
+) -> ModerationPage:
+    """Возвращает страницу pending-заявок в порядке (created_at, id).
+
+    Заявки, ФИО сотрудников, ключи фото и общее число pending-заявок
+    читаются одним запросом (JOIN employee и media, total — скалярным
+    подзапросом). Пагинация — keyset по (created_at, id), без OFFSET.
+    """
+    return await _list_page(
+        session,
+        filters=[PhotoModeration.status == "pending"],
+        limit=limit,
+        cursor=cursor,
+        newest_first=False,
+    )
+
+
+async def list_history_page(
+    session: AsyncSession,
+    *,
+    limit: int,
+    cursor: str | None = None,
+    statuses: list[str] | None = None,
+    reviewer_id: int | None = None,
+    employee_id: int | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+) -> ModerationPage:
+    """Возвращает страницу истории заявок, от новых к старым.
+
+    Фильтры — по статусам, проверяющему, сотруднику и периоду создания
+    [created_from, created_to); под каждый есть индекс
+    (idx_photo_moderation_status / _reviewer / _employee / _created_at).
+    Пагинация — keyset по (created_at, id) в обратном порядке.
+    """
+    # время без часового пояса считается UTC
+    if created_from is not None and created_from.tzinfo is None:
+        created_from = created_from.replace(tzinfo=timezone.utc)
+    if created_to is not None and created_to.tzinfo is None:
+        created_to = created_to.replace(tzinfo=timezone.utc)
+    if created_from and created_to and created_from >= created_to:
+        raise BadRequest("created_from must be earlier than created_to")
+
+    filters = []
+    if statuses:
+        filters.append(PhotoModeration.status.in_(statuses))
+    if reviewer_id is not None:
+        filters.append(PhotoModeration.reviewer_employee_id == reviewer_id)
+    if employee_id is not None:
+        filters.append(PhotoModeration.employee_id == employee_id)
+    if created_from is not None:
+        filters.append(PhotoModeration.created_at >= created_from)
+    if created_to is not None:
+        filters.append(PhotoModeration.created_at < created_to)
+
+    return await _list_page(
+        session,
+        filters=filters,
+        limit=limit,
+        cursor=cursor,
+        newest_first=True,
+    )
+
+
+@dataclass(frozen=True)
+class ModerationClaim:
+    """Заявки, выданные модератору в аренду.
+
+    rows — строки в формате ModerationPage.rows; expires_at — до какого
+    момента заявки закреплены за модератором.
+    """
+
+    rows: list[tuple[PhotoModeration, str, str | None, str, str | None]]
+    expires_at: datetime
+
+
+async def claim_pending(
+    session: AsyncSession,
+    *,
+    reviewer_id: int,
+    limit: int,
+    ttl_seconds: int | None = None,
+) -> ModerationClaim:
+    """Выдаёт модератору до limit самых старых pending-заявок в аренду.
+
+    Свободными считаются заявки без аренды или с истёкшей арендой; свои
+    ещё не истёкшие заявки модератор получает снова, с продлённым
+    сроком. Строки отбираются SELECT ... FOR UPDATE SKIP LOCKED: заявки,
+    которые в этот момент выдаются другому модератору, пропускаются без
+    ожидания, поэтому параллельные вызовы получают непересекающиеся
+    наборы.
+    """
+    if ttl_seconds is None:
+        ttl_seconds = settings.photo_moderation_claim_ttl_seconds
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    res = await session.execute(
+        select(PhotoModeration.id)
+        .where(
+            PhotoModeration.status == "pending",
+            or_(
+                PhotoModeration.claim_expires_at.is_(None),
+                PhotoModeration.claim_expires_at <= now,
+                PhotoModeration.claimed_by_employee_id == reviewer_id,
+            ),
+        )
+        .order_by(PhotoModeration.created_at.asc(), PhotoModeration.id.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True),
+    )
+    ids = list(res.scalars())
+    if not ids:
+        return ModerationClaim(rows=[], expires_at=expires_at)
+
+    await session.execute(
+        update(PhotoModeration)
+        .where(PhotoModeration.id.in_(ids))
+        .values(claimed_by_employee_id=reviewer_id, claim_expires_at=expires_at)
+        .execution_options(synchronize_session=False),
+    )
+    rows = await session.execute(
+        _with_employee_and_photo()
+        .where(PhotoModeration.id.in_(ids))
+        .order_by(PhotoModeration.created_at.asc(), PhotoModeration.id.asc())
+        .execution_options(populate_existing=True),
+    )
+    return ModerationClaim(
+        rows=[tuple(row) for row in rows.all()],
+        expires_at=expires_at,
+    )
+
+
+async def release_claims(
+    session: AsyncSession,
+    *,
+    reviewer_id: int,
+) -> int:
+    """Возвращает в очередь все pending-заявки, арендованные модератором.
+
+    Возвращает число освобождённых заявок.
+    """
+    res = await session.execute(
+        update(PhotoModeration)
+        .where(
+            PhotoModeration.status == "pending",
+            PhotoModeration.claimed_by_employee_id == reviewer_id,
+        )
+        .values(claimed_by_employee_id=None, claim_expires_at=None)
+        .execution_options(synchronize_session=False),
+    )
+    return res.rowcount or 0
 
 
 async def approve(
@@ -139,13 +450,17 @@ async def approve(
     moderation_id: int,
     reviewer_id: int,
 ) -> PhotoModeration:
-    """Подтверждает заявку: статус approved и установка photo_id сотруднику."""
-    pm = await _get_by_id(session, moderation_id)
+    """Подтверждает заявку: статус approved и установка photo_id сотруднику.
+
+    Заявку, арендованную другим модератором, подтвердить нельзя (Conflict).
+    """
+    pm = await _get_by_id(session, moderation_id, for_update=True)
     if not pm:
         raise NotFound("Moderation request not found")
 
     if pm.status != "pending":
         raise Conflict("Request is not pending (already processed)")
+    _check_claim(pm, reviewer_id)
 
     employee = (
         await session.execute(
@@ -161,21 +476,142 @@ async def approve(
     pm.status = "approved"
     pm.reviewer_employee_id = reviewer_id
     pm.reviewed_at = datetime.now(timezone.utc)
+    pm.claimed_by_employee_id = None
+    pm.claim_expires_at = None
 
     session.add(employee)
     session.add(pm)
 
     await session.flush()
 
+    # объект старого аватара удалит фоновый воркер
     if old_photo_id and old_photo_id != pm.media_id:
-        try:
-            await delete_media_and_object_by_id(session, old_photo_id)
-        except Exception:  # намеренно глушим ошибку удаления старого объекта
-            pass
+        await schedule_media_deletion(session, [old_photo_id])
 
     return pm
 
 
+@dataclass(frozen=True)
+class DecisionOutcome:
+    """Итог решения по одной заявке из пакета.
+
+    status — новый статус заявки; при ошибке None, а error — доменное
+    исключение (NotFound / Conflict / BadRequest).
+    """
+
+    moderation_id: int
+    status: str | None
+    error: ModerationError | None = None
+
+
+async def decide_batch(
+    session: AsyncSession,
+    *,
+    decisions: list[tuple[int, str, str | None]],
+    reviewer_id: int,
+) -> list[DecisionOutcome]:
+    """Применяет пакет решений (moderation_id, decision, reason).
+
+    Заявки и текущие фото сотрудников читаются одним запросом с
+    блокировкой строк заявок (FOR UPDATE, в порядке id — параллельные
+    пакеты не взаимоблокируются). Проверки те же, что у approve и
+    reject; ошибка по одной заявке не мешает остальным. Одобренные
+    заявки и photo_id сотрудников обновляются одним UPDATE каждые,
+    отклонённые — одним executemany по первичному ключу; заменённые
+    аватары ставятся в очередь на удаление. Всё — в транзакции
+    вызывающего кода.
+
+    Возвращает итоги в порядке решений.
+    """
+    ids = [moderation_id for moderation_id, _, _ in decisions]
+    rows = await session.execute(
+        select(PhotoModeration, Employee.photo_id)
+        .join(Employee, Employee.id == PhotoModeration.employee_id)
+        .where(PhotoModeration.id.in_(ids))
+        .order_by(PhotoModeration.id)
+        .with_for_update(of=PhotoModeration),
+    )
+    found = {pm.id: (pm, photo_id) for pm, photo_id in rows.all()}
+
+    outcomes: list[DecisionOutcome] = []
+    approved: list[PhotoModeration] = []
+    rejected: list[tuple[PhotoModeration, str]] = []
+    old_photo_ids: set[int] = set()
+    seen: set[int] = set()
+    for moderation_id, decision, reason in decisions:
+        try:
+            if moderation_id in seen:
+                raise BadRequest("Duplicate decision for the same request")
+            seen.add(moderation_id)
+            if moderation_id not in found:
+                raise NotFound(f"Moderation #{moderation_id} not found")
+            pm, photo_id = found[moderation_id]
+            if pm.status != "pending":
+                raise Conflict("Request is not pending (already processed)")
+            _check_claim(pm, reviewer_id)
+
+            if decision == "approve":
+                approved.append(pm)
+                if photo_id and photo_id != pm.media_id:
+                    old_photo_ids.add(photo_id)
+                status = "approved"
+            elif decision == "reject":
+                if not reason or not reason.strip():
+                    raise BadRequest("Reject reason is required")
+                rejected.append((pm, reason.strip()))
+                status = "rejected"
+            else:
+                raise BadRequest(f"Unknown decision: {decision}")
+        except ModerationError as exc:
+            outcomes.append(DecisionOutcome(moderation_id, None, exc))
+        else:
+            outcomes.append(DecisionOutcome(moderation_id, status))
+
+    now = datetime.now(timezone.utc)
+    reviewed = {
+        "reviewer_employee_id": reviewer_id,
+        "reviewed_at": now,
+        "claimed_by_employee_id": None,
+        "claim_expires_at": None,
+    }
+    if approved:
+        approved_ids = [pm.id for pm in approved]
+        # UPDATE employee ... FROM photo_moderation: photo_id из заявки
+        await session.execute(
+            update(Employee)
+            .where(
+                Employee.id == PhotoModeration.employee_id,
+                PhotoModeration.id.in_(approved_ids),
+            )
+            .values(photo_id=PhotoModeration.media_id)
+            .execution_options(synchronize_session=False),
+        )
+        await session.execute(
+            update(PhotoModeration)
+            .where(PhotoModeration.id.in_(approved_ids))
+            .values(status="approved", **reviewed)
+            .execution_options(synchronize_session=False),
+        )
+    if rejected:
+        # причины разные — bulk UPDATE по первичному ключу (executemany)
+        await session.execute(
+            update(PhotoModeration),
+            [
+                {"id": pm.id, "status": "rejected", "reject_reason": reason, **reviewed}
+                for pm, reason in rejected
+            ],
+        )
+
+    # загруженные выше объекты заявок устарели после UPDATE
+    for pm, _ in found.values():
+        session.expire(pm)
+
+    # объекты старых аватаров удалит фоновый воркер; media, ставшие фото
+    # другого сотрудника или заявкой, schedule_media_deletion пропустит
+    await schedule_media_deletion(session, old_photo_ids)
+    return outcomes
+
+
 async def reject(
     session: AsyncSession,
     *,
@@ -183,16 +619,20 @@ async def reject(
     reviewer_id: int,
     reason: str,
 ) -> PhotoModeration:
-    """Отклоняет заявку: статус rejected и сохранение причины отказа."""
+    """Отклоняет заявку: статус rejected и сохранение причины отказа.
+
+    Заявку, арендованную другим модератором, отклонить нельзя (Conflict).
+    """
     if not reason or not reason.strip():
         raise BadRequest("Reject reason is required")
 
-    pm = await _get_by_id(session, moderation_id)
+    pm = await _get_by_id(session, moderation_id, for_update=True)
     if not pm:
         raise NotFound(f"Moderation #{moderation_id} not found")
 
     if pm.status != "pending":
         raise Conflict("Request is not pending (already processed)")
+    _check_claim(pm, reviewer_id)
 
     reviewer = await _ensure_employee(session, reviewer_id)
 
@@ -200,6 +640,8 @@ async def reject(
     pm.reviewer_employee_id = reviewer.id
     pm.reviewed_at = datetime.now(timezone.utc)
     pm.reject_reason = reason.strip()
+    pm.claimed_by_employee_id = None
+    pm.claim_expires_at = None
 
     session.add(pm)
     await session.flush()
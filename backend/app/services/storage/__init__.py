@@ -0,0 +1,60 @@
+"""Хранилища объектов для фото и превью.
+
+Хранилище выбирается настройкой STORAGE_BACKEND: s3 (S3-совместимый
+бакет) или local (каталог STORAGE_LOCAL_ROOT, файлы отдаёт само API).
+Остальной код работает через функции app.services.storage_service.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from app.core.config import settings
+from app.services.storage.base import ObjectInfo, ObjectMeta, StorageBackend
+from app.services.storage.local import LocalStorageBackend, UploadRejected
+from app.services.storage.s3 import S3StorageBackend
+
+__all__ = [
+    "LocalStorageBackend",
+    "ObjectInfo",
+    "ObjectMeta",
+    "S3StorageBackend",
+    "StorageBackend",
+    "UploadRejected",
+    "get_storage_backend",
+    "register_storage_backend",
+]
+
+_BACKEND_FACTORIES: dict[str, Callable[[], StorageBackend]] = {
+    "s3": S3StorageBackend,
+    "local": LocalStorageBackend,
+}
+
+_backend: StorageBackend | None = None
+
+
+def register_storage_backend(
+    name: str,
+    factory: Callable[[], StorageBackend],
+) -> None:
+    """Регистрирует фабрику хранилища под именем для STORAGE_BACKEND."""
+    _BACKEND_FACTORIES[name.strip().lower()] = factory
+
+
+def get_storage_backend() -> StorageBackend:
+    """Возвращает хранилище из настроек, создавая его один раз на процесс.
+
+    Raises:
+        ValueError: Хранилище с таким именем не зарегистрировано.
+    """
+    global _backend  # noqa: PLW0603
+    if _backend is None:
+        key = settings.storage_backend.strip().lower()
+        factory = _BACKEND_FACTORIES.get(key)
+        if factory is None:
+            raise ValueError(
+                f"Unknown storage backend {key!r}; "
+                f"available: {', '.join(sorted(_BACKEND_FACTORIES))}",
+            )
+        _backend = factory()
+    return _backend
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO
+
+# Наибольшая пачка ключей для delete_many: столько принимает один запрос
+# DeleteObjects в S3; очередь удаления не берёт за раз больше
+DELETE_OBJECTS_LIMIT = 1000
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    """Информация об объекте хранилища."""
+
+    storage_key: str
+    public_url: str | None = None
+    presigned_url: str | None = None
+    # заголовки, которые клиент обязан передать в PUT (входят в подпись)
+    upload_headers: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ObjectMeta:
+    """Метаданные объекта (аналог HEAD-запроса)."""
+
+    storage_key: str
+    byte_size: int
+    content_type: str | None = None
+    # SHA-256 (hex), если хранилище знает контрольную сумму объекта
+    sha256: str | None = None
+
+
+class StorageBackend(ABC):
+    """Хранилище объектов (фото и их превью).
+
+    Объекты адресуются ключом вида "media/...". Клиенты загружают файлы
+    напрямую по presigned PUT URL и читают по публичному URL; сервер
+    ходит в хранилище только за метаданными, превью и удалением.
+    Чтобы подключить новое хранилище, достаточно реализовать методы ниже
+    и зарегистрировать фабрику (см. register_storage_backend).
+    """
+
+    #: Имя хранилища в настройке STORAGE_BACKEND.
+    name: str = ""
+
+    @abstractmethod
+    def public_url(self, storage_key: str) -> str | None:
+        """Публичный URL объекта или None, если публичного доступа нет."""
+
+    def public_urls(self, storage_keys: Iterable[str]) -> dict[str, str | None]:
+        """Публичные URL набора объектов (для страниц списков)."""
+        return {key: self.public_url(key) for key in storage_keys}
+
+    @abstractmethod
+    def presign_put(
+        self,
+        storage_key: str,
+        *,
+        content_type: str | None,
+        sha256: str | None,
+        expires_seconds: int,
+    ) -> ObjectInfo:
+        """Presigned URL для загрузки объекта одним PUT-запросом.
+
+        С sha256 хранилище обязано отклонить файл с другой суммой.
+        """
+
+    @abstractmethod
+    async def head(self, storage_key: str) -> ObjectMeta | None:
+        """Метаданные объекта или None, если его нет."""
+
+    @abstractmethod
+    async def sha256(self, storage_key: str) -> str:
+        """SHA-256 содержимого объекта (hex), читая его потоком."""
+
+    @abstractmethod
+    async def get_bytes(self, storage_key: str, *, max_bytes: int) -> bytes:
+        """Объект целиком; ValueError, если он больше max_bytes."""
+
+    @abstractmethod
+    async def put_bytes(
+        self,
+        storage_key: str,
+        data: bytes,
+        *,
+        content_type: str,
+        cache_control: str | None = None,
+    ) -> None:
+        """Сохраняет объект из памяти под заданным ключом."""
+
+    @abstractmethod
+    async def upload_fileobj(
+        self,
+        fp: BinaryIO,
+        *,
+        storage_key: str,
+        content_type: str,
+    ) -> None:
+        """Сохраняет объект из файлового объекта, читая его потоком."""
+
+    @abstractmethod
+    async def delete_many(self, storage_keys: list[str]) -> dict[str, str]:
+        """Удаляет объекты; возвращает неудалённые ключи с текстом ошибки.
+
+        Отсутствующий объект ошибкой не считается.
+        """
+
+    @abstractmethod
+    def list_pages(
+        self,
+        prefix: str,
+        *,
+        page_size: int,
+    ) -> AsyncIterator[list[tuple[str, datetime]]]:
+        """Перебирает объекты под префиксом страницами (ключ, время изменения)."""
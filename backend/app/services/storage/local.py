@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import mimetypes
+import os
+import time
+import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import BinaryIO
+from urllib.parse import quote, urlencode
+
+import anyio
+
+from app.core.config import settings
+from app.services.storage.base import ObjectInfo, ObjectMeta, StorageBackend
+
+# Каталог незавершённых загрузок внутри корня (не виден в list_pages)
+_UPLOADS_DIR = ".uploads"
+
+_COPY_CHUNK_SIZE = 1 << 20
+
+
+class UploadRejected(Exception):
+    """Загрузка по presigned URL отклонена (размер или контрольная сумма)."""
+
+
+class LocalStorageBackend(StorageBackend):
+    """Хранилище на локальной файловой системе (on-prem, тестовые стенды).
+
+    Ключ хранения — относительный путь внутри STORAGE_LOCAL_ROOT. Файлы
+    отдаёт и принимает роутер app.api.local_storage_router: presigned URL
+    здесь — адрес PUT-эндпоинта с HMAC-подписью (SECRET_KEY) ключа,
+    срока, Content-Type и SHA-256. Запись идёт во временный файл с
+    атомарной заменой, поэтому читатели не видят недописанных объектов.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str | Path | None = None) -> None:
+        self.root = Path(root or settings.storage_local_root).resolve()
+
+    # --- ключи и подписи ---
+
+    def path_for(self, storage_key: str) -> Path:
+        """Путь файла по ключу; ValueError для ключей вне корня."""
+        parts = storage_key.split("/")
+        if (
+            not storage_key
+            or storage_key.startswith("/")
+            or any(part in ("", ".", "..") for part in parts)
+            or parts[0] == _UPLOADS_DIR
+        ):
+            raise ValueError(f"Invalid storage key: {storage_key!r}")
+        return self.root.joinpath(*parts)
+
+    def _sign(
+        self,
+        storage_key: str,
+        *,
+        expires: int,
+        content_type: str | None,
+        sha256: str | None,
+    ) -> str:
+        message = "\n".join(
+            ("PUT", storage_key, str(expires), content_type or "", sha256 or ""),
+        )
+        return hmac.new(
+            settings.secret_key.encode("utf-8"),
+            message.encode("utf-8"),
+            hashlib.sha256,
+        ).hexdigest()
+
+    def verify_upload(
+        self,
+        storage_key: str,
+        *,
+        expires: int,
+        content_type: str | None,
+        sha256: str | None,
+        signature: str,
+    ) -> bool:
+        """Проверяет подпись и срок действия presigned PUT URL."""
+        if expires < time.time():
+            return False
+        expected = self._sign(
+            storage_key,
+            expires=expires,
+            content_type=content_type,
+            sha256=sha256,
+        )
+        return hmac.compare_digest(expected, signature)
+
+    def _url(self, storage_key: str) -> str:
+        base = settings.storage_local_public_base.rstrip("/")
+        return f"{base}/{quote(storage_key)}"
+
+    def public_url(self, storage_key: str) -> str | None:
+        """URL файла на GET-эндпоинте локального хранилища."""
+        return self._url(storage_key)
+
+    def presign_put(
+        self,
+        storage_key: str,
+        *,
+        content_type: str | None,
+        sha256: str | None,
+        expires_seconds: int,
+    ) -> ObjectInfo:
+        """Подписанный URL PUT-эндпоинта локального хранилища."""
+        self.path_for(storage_key)
+        expires = int(time.time()) + expires_seconds
+        params = {"expires": str(expires)}
+        if sha256:
+            params["sha256"] = sha256
+        params["signature"] = self._sign(
+            storage_key,
+            expires=expires,
+            content_type=content_type,
+            sha256=sha256,
+        )
+
+        headers = {"Content-Type": content_type} if content_type else {}
+        return ObjectInfo(
+            storage_key=storage_key,
+            public_url=self.public_url(storage_key),
+            presigned_url=f"{self._url(storage_key)}?{urlencode(params)}",
+            upload_headers=headers,
+        )
+
+    # --- запись ---
+
+    def _temp_path(self) -> Path:
+        uploads = self.root / _UPLOADS_DIR
+        uploads.mkdir(parents=True, exist_ok=True)
+        return uploads / f"{uuid.uuid4().hex}.part"
+
+    def _commit(self, temp: Path, storage_key: str) -> None:
+        target = self.path_for(storage_key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp, target)
+
+    async def write_stream(
+        self,
+        storage_key: str,
+        chunks: AsyncIterable[bytes],
+        *,
+        max_bytes: int,
+        sha256: str | None = None,
+    ) -> int:
+        """Пишет поток кусков в файл, не держа его в памяти целиком.
+
+        Размер и (если задан) SHA-256 проверяются по ходу записи; при
+        ошибке временный файл удаляется и бросается UploadRejected.
+        Возвращает размер файла.
+        """
+        self.path_for(storage_key)
+        temp = await anyio.to_thread.run_sync(self._temp_path)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with await anyio.open_file(temp, "wb") as fh:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise UploadRejected(f"Upload exceeds {max_bytes} bytes")
+                    digest.update(chunk)
+                    await fh.write(chunk)
+
+            if sha256 and digest.hexdigest() != sha256.lower():
+                raise UploadRejected("SHA-256 of the upload does not match")
+            await anyio.to_thread.run_sync(self._commit, temp, storage_key)
+        except BaseException:
+            await anyio.to_thread.run_sync(lambda: temp.unlink(missing_ok=True))
+            raise
+        return size
+
+    async def put_bytes(
+        self,
+        storage_key: str,
+        data: bytes,
+        *,
+        content_type: str,
+        cache_control: str | None = None,
+    ) -> None:
+        """Сохраняет объект из памяти.
+
+        content_type и cache_control не хранятся: тип определяется по
+        расширению ключа, а Cache-Control выставляет роутер.
+        """
+
+        def _do() -> None:
+            temp = self._temp_path()
+            try:
+                temp.write_bytes(data)
+                self._commit(temp, storage_key)
+            finally:
+                temp.unlink(missing_ok=True)
+
+        await anyio.to_thread.run_sync(_do)
+
+    async def upload_fileobj(
+        self,
+        fp: BinaryIO,
+        *,
+        storage_key: str,
+        content_type: str,
+    ) -> None:
+        """Копирует файловый объект кусками."""
+
+        def _do() -> None:
+            temp = self._temp_path()
+            try:
+                with temp.open("wb") as out:
+                    while chunk := fp.read(_COPY_CHUNK_SIZE):
+                        out.write(chunk)
+                self._commit(temp, storage_key)
+            finally:
+                temp.unlink(missing_ok=True)
+
+        await anyio.to_thread.run_sync(_do)
+
+    # --- чтение ---
+
+    async def head(self, storage_key: str) -> ObjectMeta | None:
+        """Метаданные файла; тип — по расширению ключа."""
+        path = self.path_for(storage_key)
+        try:
+            stat = await anyio.to_thread.run_sync(path.stat)
+        except FileNotFoundError:
+            return None
+        return ObjectMeta(
+            storage_key=storage_key,
+            byte_size=stat.st_size,
+            content_type=mimetypes.guess_type(storage_key)[0],
+        )
+
+    async def sha256(self, storage_key: str) -> str:
+        """Считает SHA-256 файла, читая его кусками."""
+        path = self.path_for(storage_key)
+
+        def _do() -> str:
+            digest = hashlib.sha256()
+            with path.open("rb") as fh:
+                while chunk := fh.read(_COPY_CHUNK_SIZE):
+                    digest.update(chunk)
+            return digest.hexdigest()
+
+        return await anyio.to_thread.run_sync(_do)
+
+    async def get_bytes(self, storage_key: str, *, max_bytes: int) -> bytes:
+        """Читает файл целиком; ValueError, если он больше max_bytes."""
+        path = self.path_for(storage_key)
+
+        def _do() -> bytes:
+            with path.open("rb") as fh:
+                data = fh.read(max_bytes + 1)
+            if len(data) > max_bytes:
+                raise ValueError(f"Object {storage_key} exceeds {max_bytes} bytes")
+            return data
+
+        return await anyio.to_thread.run_sync(_do)
+
+    # --- удаление и перечисление ---
+
+    async def delete_many(self, storage_keys: list[str]) -> dict[str, str]:
+        """Удаляет файлы; отсутствующие пропускаются."""
+
+        def _do() -> dict[str, str]:
+            failed: dict[str, str] = {}
+            for key in storage_keys:
+                try:
+                    self.path_for(key).unlink(missing_ok=True)
+                except (OSError, ValueError) as exc:
+                    failed[key] = f"{type(exc).__name__}: {exc}"
+            return failed
+
+        return await anyio.to_thread.run_sync(_do)
+
+    def _iter_keys(self, prefix: str) -> Iterator[tuple[str, datetime]]:
+        """Обходит файлы под префиксом (порядок стабилен между проходами)."""
+        base = self.root.joinpath(*prefix.split("/")[:-1])
+        if not base.is_dir():
+            return
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames[:] = sorted(d for d in dirnames if d != _UPLOADS_DIR)
+            for name in sorted(filenames):
+                path = Path(dirpath, name)
+                key = path.relative_to(self.root).as_posix()
+                if not key.startswith(prefix):
+                    continue
+                try:
+                    mtime = path.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                yield key, datetime.fromtimestamp(mtime, tz=timezone.utc)
+
+    async def list_pages(
+        self,
+        prefix: str,
+        *,
+        page_size: int,
+    ) -> AsyncIterator[list[tuple[str, datetime]]]:
+        """Перебирает файлы под префиксом страницами, обход — в потоке."""
+        keys = self._iter_keys(prefix)
+
+        def _next_page() -> list[tuple[str, datetime]]:
+            page: list[tuple[str, datetime]] = []
+            for item in keys:
+                page.append(item)
+                if len(page) >= page_size:
+                    break
+            return page
+
+        try:
+            while page := await anyio.to_thread.run_sync(_next_page):
+                yield page
+        finally:
+            keys.close()
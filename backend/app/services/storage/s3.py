@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterable
+from datetime import datetime
+from typing import BinaryIO
+
+import anyio
+import boto3
+from botocore.client import Config
+from botocore.exceptions import ClientError
+
+from app.core.config import settings
+from app.services.storage.base import (
+    DELETE_OBJECTS_LIMIT,
+    ObjectInfo,
+    ObjectMeta,
+    StorageBackend,
+)
+
+
+def sha256_to_checksum(sha256: str) -> str:
+    """Переводит hex SHA-256 в формат заголовка x-amz-checksum-sha256."""
+    return base64.b64encode(bytes.fromhex(sha256)).decode("ascii")
+
+
+class _PresignedUrlCache:
+    """LRU-кеш presigned GET URL по ключу хранения.
+
+    Запись живёт до refresh_at — момента, когда до истечения подписи
+    остаётся S3_PRESIGNED_GET_REFRESH_SECONDS; после этого URL
+    подписывается заново, так что клиент всегда получает ссылку с
+    запасом времени. Пока запись жива, URL не меняется и его можно
+    кешировать в браузере.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max(1, max_size)
+        self._items: OrderedDict[str, tuple[str, float]] = OrderedDict()
+
+    def get(self, storage_key: str, now: float) -> str | None:
+        entry = self._items.get(storage_key)
+        if entry is None:
+            return None
+        url, refresh_at = entry
+        if refresh_at <= now:
+            del self._items[storage_key]
+            return None
+        self._items.move_to_end(storage_key)
+        return url
+
+    def put(self, storage_key: str, url: str, refresh_at: float) -> None:
+        self._items[storage_key] = (url, refresh_at)
+        self._items.move_to_end(storage_key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+
+class S3StorageBackend(StorageBackend):
+    """S3-совместимое хранилище (Yandex Object Storage, MinIO и т. п.)."""
+
+    name = "s3"
+
+    def __init__(self) -> None:
+        self._client = None  # лениво инициализируемый клиент S3
+        self._url_cache = _PresignedUrlCache(settings.s3_presigned_get_cache_size)
+
+    def _get_client(self):
+        """Возвращает S3-клиент, создавая его один раз на процесс."""
+        if self._client is None:
+            missing = [
+                env
+                for env, value in (
+                    ("S3_ENDPOINT_URL", settings.s3_endpoint_url),
+                    ("S3_BUCKET", settings.s3_bucket),
+                    ("S3_ACCESS_KEY_ID", settings.s3_access_key_id),
+                    ("S3_SECRET_ACCESS_KEY", settings.s3_secret_access_key),
+                )
+                if not value
+            ]
+            if missing:
+                raise RuntimeError(
+                    f"S3 storage is not configured: {', '.join(missing)} not set",
+                )
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=settings.s3_endpoint_url,
+                region_name=settings.s3_region,
+                aws_access_key_id=settings.s3_access_key_id,
+                aws_secret_access_key=settings.s3_secret_access_key,
+                config=Config(
+                    signature_version="s3v4",
+                    max_pool_connections=settings.s3_max_pool_connections,
+                    s3={"addressing_style": settings.s3_addressing_style},
+                    retries={
+                        "max_attempts": settings.s3_max_attempts,
+                        "mode": "standard",
+                    },
+                ),
+            )
+        return self._client
+
+    def public_url(self, storage_key: str) -> str | None:
+        """URL для чтения объекта.
+
+        С S3_PUBLIC_BASE — публичный URL, иначе (приватный бакет) —
+        presigned GET из кеша; при S3_PRESIGNED_GET_TTL_SECONDS=0 — None.
+        """
+        return self.public_urls([storage_key])[storage_key]
+
+    def public_urls(self, storage_keys: Iterable[str]) -> dict[str, str | None]:
+        """URL для чтения набора объектов (страница списка).
+
+        Недостающие в кеше presigned URL подписываются через botocore;
+        благодаря кешу это происходит раз в TTL на ключ, а не на каждую
+        страницу.
+        """
+        keys = list(dict.fromkeys(storage_keys))
+        if settings.s3_public_base:
+            base = settings.s3_public_base.rstrip("/")
+            return {key: f"{base}/{key}" for key in keys}
+
+        ttl = settings.s3_presigned_get_ttl_seconds
+        if ttl <= 0:
+            return dict.fromkeys(keys)
+
+        now = time.time()
+        urls: dict[str, str | None] = {}
+        missing: list[str] = []
+        for key in keys:
+            urls[key] = self._url_cache.get(key, now)
+            if urls[key] is None:
+                missing.append(key)
+        if not missing:
+            return urls
+
+        client = self._get_client()
+        refresh_at = now + max(ttl - settings.s3_presigned_get_refresh_seconds, 0)
+        for key in missing:
+            url = client.generate_presigned_url(
+                ClientMethod="get_object",
+                Params={"Bucket": settings.s3_bucket, "Key": key},
+                ExpiresIn=ttl,
+            )
+            self._url_cache.put(key, url, refresh_at)
+            urls[key] = url
+        return urls
+
+    def presign_put(
+        self,
+        storage_key: str,
+        *,
+        content_type: str | None,
+        sha256: str | None,
+        expires_seconds: int,
+    ) -> ObjectInfo:
+        """Presigned URL для put_object.
+
+        С sha256 в подпись входит заголовок x-amz-checksum-sha256: S3 примет
+        только файл с этой суммой и сохранит её (её вернёт head).
+        """
+        params: dict[str, str] = {
+            "Bucket": settings.s3_bucket,
+            "Key": storage_key,
+        }
+        headers: dict[str, str] = {}
+        if content_type:
+            params["ContentType"] = content_type
+            headers["Content-Type"] = content_type
+        if sha256:
+            params["ChecksumSHA256"] = sha256_to_checksum(sha256)
+            headers["x-amz-checksum-sha256"] = params["ChecksumSHA256"]
+
+        url = self._get_client().generate_presigned_url(
+            ClientMethod="put_object",
+            Params=params,
+            ExpiresIn=expires_seconds,
+        )
+        return ObjectInfo(
+            storage_key=storage_key,
+            public_url=(
+                f"{settings.s3_public_base.rstrip('/')}/{storage_key}"
+                if settings.s3_public_base
+                else None
+            ),
+            presigned_url=url,
+            upload_headers=headers,
+        )
+
+    async def head(self, storage_key: str) -> ObjectMeta | None:
+        """HEAD объекта вместе с контрольной суммой (ChecksumMode)."""
+
+        def _do() -> ObjectMeta | None:
+            try:
+                response = self._get_client().head_object(
+                    Bucket=settings.s3_bucket,
+                    Key=storage_key,
+                    ChecksumMode="ENABLED",
+                )
+            except ClientError as exc:
+                if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                    return None
+                raise
+
+            # у составных (multipart) сумм есть суффикс "-N", это не SHA-256 файла
+            checksum = response.get("ChecksumSHA256")
+            sha256 = (
+                base64.b64decode(checksum).hex()
+                if checksum and "-" not in checksum
+                else None
+            )
+            return ObjectMeta(
+                storage_key=storage_key,
+                byte_size=response.get("ContentLength", 0),
+                content_type=response.get("ContentType"),
+                sha256=sha256,
+            )
+
+        return await anyio.to_thread.run_sync(_do)
+
+    async def sha256(self, storage_key: str, *, chunk_size: int = 1 << 20) -> str:
+        """Считает SHA-256 объекта, читая его потоком."""
+
+        def _do() -> str:
+            response = self._get_client().get_object(
+                Bucket=settings.s3_bucket,
+                Key=storage_key,
+            )
+            digest = hashlib.sha256()
+            body = response["Body"]
+            try:
+                for chunk in body.iter_chunks(chunk_size):
+                    digest.update(chunk)
+            finally:
+                body.close()
+            return digest.hexdigest()
+
+        return await anyio.to_thread.run_sync(_do)
+
+    async def get_bytes(self, storage_key: str, *, max_bytes: int) -> bytes:
+        """Скачивает объект целиком; ValueError, если он больше max_bytes."""
+
+        def _do() -> bytes:
+            response = self._get_client().get_object(
+                Bucket=settings.s3_bucket,
+                Key=storage_key,
+            )
+            body = response["Body"]
+            try:
+                if response.get("ContentLength", 0) > max_bytes:
+                    raise ValueError(f"Object {storage_key} exceeds {max_bytes} bytes")
+                data = body.read(max_bytes + 1)
+            finally:
+                body.close()
+            if len(data) > max_bytes:
+                raise ValueError(f"Object {storage_key} exceeds {max_bytes} bytes")
+            return data
+
+        return await anyio.to_thread.run_sync(_do)
+
+    async def put_bytes(
+        self,
+        storage_key: str,
+        data: bytes,
+        *,
+        content_type: str,
+        cache_control: str | None = None,
+    ) -> None:
+        """Загружает объект из памяти под заданным ключом."""
+        params: dict[str, object] = {
+            "Bucket": settings.s3_bucket,
+            "Key": storage_key,
+            "Body": data,
+            "ContentType": content_type,
+        }
+        if cache_control:
+            params["CacheControl"] = cache_control
+
+        await anyio.to_thread.run_sync(
+            lambda: self._get_client().put_object(**params),
+        )
+
+    async def upload_fileobj(
+        self,
+        fp: BinaryIO,
+        *,
+        storage_key: str,
+        content_type: str,
+    ) -> None:
+        """Загружает потоковый объект (multipart для больших файлов)."""
+
+        def _do() -> None:
+            self._get_client().upload_fileobj(
+                Fileobj=fp,
+                Bucket=settings.s3_bucket,
+                Key=storage_key,
+                ExtraArgs={"ContentType": content_type},
+            )
+
+        await anyio.to_thread.run_sync(_do)
+
+    async def delete_many(self, storage_keys: list[str]) -> dict[str, str]:
+        """Удаляет объекты пачками через DeleteObjects.
+
+        Если запрос целиком не прошёл (после повторов клиента),
+        исключение пробрасывается.
+        """
+
+        def _do(keys: list[str]) -> list[dict[str, str]]:
+            response = self._get_client().delete_objects(
+                Bucket=settings.s3_bucket,
+                Delete={
+                    "Objects": [{"Key": key} for key in keys],
+                    "Quiet": True,
+                },
+            )
+            return response.get("Errors", [])
+
+        failed: dict[str, str] = {}
+        for start in range(0, len(storage_keys), DELETE_OBJECTS_LIMIT):
+            chunk = storage_keys[start:start + DELETE_OBJECTS_LIMIT]
+            for error in await anyio.to_thread.run_sync(_do, chunk):
+                if error.get("Code") == "NoSuchKey":
+                    continue
+                failed[error["Key"]] = (
+                    f"{error.get('Code', 'Error')}: {error.get('Message', '')}"
+                )
+        return failed
+
+    async def list_pages(
+        self,
+        prefix: str,
+        *,
+        page_size: int,
+    ) -> AsyncIterator[list[tuple[str, datetime]]]:
+        """Перебирает объекты бакета постранично (ListObjectsV2)."""
+
+        def _page(token: str | None) -> dict:
+            params: dict[str, object] = {
+                "Bucket": settings.s3_bucket,
+                "Prefix": prefix,
+                "MaxKeys": page_size,
+            }
+            if token:
+                params["ContinuationToken"] = token
+            return self._get_client().list_objects_v2(**params)
+
+        token: str | None = None
+        while True:
+            response = await anyio.to_thread.run_sync(_page, token)
+            objects = [
+                (item["Key"], item["LastModified"])
+                for item in response.get("Contents", [])
+            ]
+            if objects:
+                yield objects
+            if not response.get("IsTruncated"):
+                return
+            token = response.get("NextContinuationToken")
@@ -1,55 +1,46 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections.abc import AsyncIterator, Iterable
+from datetime import datetime
 from typing import BinaryIO
 import mimetypes
 import uuid
 
-import anyio
-import boto3
-from botocore.client import Config
+from app.services.storage import ObjectInfo, ObjectMeta, get_storage_backend
+from app.services.storage.base import DELETE_OBJECTS_LIMIT
 
-from app.core.config import settings
+# Объекты приложения лежат под MEDIA_PREFIX, превью — под MEDIA_VARIANT_PREFIX
+MEDIA_PREFIX = "media/"
+MEDIA_VARIANT_PREFIX = "media/v/"
 
 
-@dataclass(frozen=True)
-class S3ObjectInfo:
-    """Информация об объекте в S3-совместимом хранилище."""
-
-    storage_key: str
-    public_url: str | None = None
-    presigned_url: str | None = None
-
-
-_s3_client = None  # лениво инициализируемый клиент S3
-
-
-def _get_client():
-    """Возвращает S3-клиент, создавая его один раз на процесс."""
-    global _s3_client  # noqa: PLW0603
-    if _s3_client is None:
-        _s3_client = boto3.client(
-            "s3",
-            endpoint_url=settings.s3_endpoint_url,
-            region_name=settings.s3_region,
-            aws_access_key_id=settings.s3_access_key_id,
-            aws_secret_access_key=settings.s3_secret_access_key,
-            config=Config(s3={"addressing_style": "virtual"}),
-        )
-    return _s3_client
-
-
-def make_storage_key(suffix: str | None = None) -> str:
+def make_storage_key(
+    suffix: str | None = None,
+    *,
+    sha256: str | None = None,
+) -> str:
     """Генерирует ключ хранения для объекта.
 
-    Пример результата: "media/<uuid>.jpg".
+    Пример результата: "media/<uuid>.jpg". Если известен SHA-256
+    содержимого, ключ выводится из него: "media/ab/<sha256>.jpg" —
+    повторная загрузка того же файла попадает в тот же объект.
 
     Параметры:
         suffix: расширение файла (с точкой или без), например ".jpg" или "jpg".
+        sha256: SHA-256 содержимого (hex), если клиент его передал.
     """
     ext = (suffix or "").lstrip(".")
-    fname = f"{uuid.uuid4().hex}{('.' + ext) if ext else ''}"
-    return f"media/{fname}"
+    dot_ext = f".{ext}" if ext else ""
+    if sha256:
+        return f"{MEDIA_PREFIX}{sha256[:2]}/{sha256}{dot_ext}"
+    return f"{MEDIA_PREFIX}{uuid.uuid4().hex}{dot_ext}"
+
+
+def is_upload_key(storage_key: str) -> bool:
+    """Проверяет, что ключ мог быть выдан init-загрузкой (не превью)."""
+    return storage_key.startswith(MEDIA_PREFIX) and not storage_key.startswith(
+        MEDIA_VARIANT_PREFIX,
+    )
 
 
 async def upload_fileobj(
@@ -57,76 +48,117 @@ async def upload_fileobj(
     *,
     storage_key: str,
     content_type: str | None = None,
-) -> S3ObjectInfo:
-    """Загружает потоковый объект в бакет под заданным ключом."""
-    ctype = content_type or "application/octet-stream"
-
-    def _do() -> None:
-        _get_client().upload_fileobj(
-            Fileobj=fp,
-            Bucket=settings.s3_bucket,
-            Key=storage_key,
-            ExtraArgs={"ContentType": ctype},
-        )
-
-    await anyio.to_thread.run_sync(_do)
-
-    public = (
-        f"{settings.s3_public_base.rstrip('/')}/{storage_key}"
-        if settings.s3_public_base
-        else None
+) -> ObjectInfo:
+    """Загружает потоковый объект в хранилище под заданным ключом."""
+    backend = get_storage_backend()
+    await backend.upload_fileobj(
+        fp,
+        storage_key=storage_key,
+        content_type=content_type or "application/octet-stream",
+    )
+    return ObjectInfo(
+        storage_key=storage_key,
+        public_url=backend.public_url(storage_key),
     )
-    return S3ObjectInfo(storage_key=storage_key, public_url=public)
 
 
 def presign_put_url(
     storage_key: str,
     *,
     content_type: str | None = None,
+    sha256: str | None = None,
     expires_seconds: int = 900,
-) -> S3ObjectInfo:
-    """Возвращает presigned URL для загрузки объекта PUT-запросом."""
-    params: dict[str, str] = {
-        "Bucket": settings.s3_bucket,
-        "Key": storage_key,
-    }
-    if content_type:
-        params["ContentType"] = content_type
-
-    url = _get_client().generate_presigned_url(
-        ClientMethod="put_object",
-        Params=params,
-        ExpiresIn=expires_seconds,
-    )
-    public = (
-        f"{settings.s3_public_base.rstrip('/')}/{storage_key}"
-        if settings.s3_public_base
-        else None
-    )
-    return S3ObjectInfo(
-        storage_key=storage_key,
-        public_url=public,
-        presigned_url=url,
+) -> ObjectInfo:
+    """Возвращает presigned URL для загрузки объекта PUT-запросом.
+
+    С sha256 хранилище примет только файл с этой суммой. Заголовки,
+    входящие в подпись, — в upload_headers.
+    """
+    return get_storage_backend().presign_put(
+        storage_key,
+        content_type=content_type,
+        sha256=sha256,
+        expires_seconds=expires_seconds,
     )
 
 
 def object_public_url(storage_key: str) -> str | None:
-    """Строит публичный URL по ключу хранения."""
-    if not settings.s3_public_base:
-        return None
-    return f"{settings.s3_public_base.rstrip('/')}/{storage_key}"
+    """Строит URL для чтения объекта по ключу хранения.
+
+    Для приватного бакета это presigned GET из кеша процесса.
+    """
+    return get_storage_backend().public_url(storage_key)
+
+
+def object_public_urls(storage_keys: Iterable[str]) -> dict[str, str | None]:
+    """URL для чтения набора объектов; presigned URL берутся из кеша."""
+    return get_storage_backend().public_urls(storage_keys)
 
 
 async def delete_object(storage_key: str) -> None:
-    """Удаляет объект из бакета по ключу хранения."""
+    """Удаляет объект из хранилища по ключу хранения."""
+    failed = await get_storage_backend().delete_many([storage_key])
+    if failed:
+        raise RuntimeError(failed[storage_key])
+
+
+async def head_object(storage_key: str) -> ObjectMeta | None:
+    """Возвращает метаданные объекта или None, если его нет в хранилище."""
+    return await get_storage_backend().head(storage_key)
+
+
+async def object_sha256(storage_key: str) -> str:
+    """Считает SHA-256 объекта, читая его потоком (hex)."""
+    return await get_storage_backend().sha256(storage_key)
+
+
+# Cache-Control для объектов с ключом от содержимого: не меняются никогда
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+async def get_object_bytes(storage_key: str, *, max_bytes: int) -> bytes:
+    """Скачивает объект целиком; ValueError, если он больше max_bytes."""
+    return await get_storage_backend().get_bytes(storage_key, max_bytes=max_bytes)
+
 
-    def _do() -> None:
-        _get_client().delete_object(
-            Bucket=settings.s3_bucket,
-            Key=storage_key,
-        )
+async def put_object_bytes(
+    storage_key: str,
+    data: bytes,
+    *,
+    content_type: str,
+    cache_control: str | None = None,
+) -> None:
+    """Загружает объект из памяти под заданным ключом."""
+    await get_storage_backend().put_bytes(
+        storage_key,
+        data,
+        content_type=content_type,
+        cache_control=cache_control,
+    )
 
-    await anyio.to_thread.run_sync(_do)
+
+async def delete_objects(storage_keys: list[str]) -> dict[str, str]:
+    """Удаляет объекты пачками (в S3 — DeleteObjects по DELETE_OBJECTS_LIMIT).
+
+    Возвращает ключи, которые удалить не удалось, с текстом ошибки.
+    Отсутствующий объект ошибкой не считается. Если запрос целиком не
+    прошёл, исключение пробрасывается.
+    """
+    return await get_storage_backend().delete_many(storage_keys)
+
+
+async def list_objects(
+    prefix: str,
+    *,
+    page_size: int = 1000,
+) -> AsyncIterator[list[tuple[str, datetime]]]:
+    """Перебирает объекты хранилища под префиксом постранично.
+
+    Отдаёт страницы пар (ключ, время изменения); в памяти держится только
+    текущая страница.
+    """
+    async for page in get_storage_backend().list_pages(prefix, page_size=page_size):
+        yield page
 
 
 def guess_ext_from_mime(content_type: str | None) -> str | None:
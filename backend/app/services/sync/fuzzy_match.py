@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from collections.abc import Hashable, Iterable
+
+import numpy as np
+
+_NON_WORD_RE = re.compile(r"[^0-9a-zа-я]+")
+
+
+def normalize_name(value: str | None) -> str:
+    """Приводит строку к виду для сравнения: нижний регистр, ё → е,
+    только буквы и цифры, одиночные пробелы.
+    """
+    if not value:
+        return ""
+    value = value.lower().replace("ё", "е")
+    return _NON_WORD_RE.sub(" ", value).strip()
+
+
+def block_key(last_name: str | None, company: str | None) -> tuple[str, str]:
+    """Ключ блока: кандидаты сравниваются только внутри блока."""
+    return normalize_name(last_name), (company or "").strip().lower()
+
+
+def match_text(
+    first_name: str | None,
+    middle_name: str | None,
+    email: str | None,
+) -> str:
+    """Строка для сравнения внутри блока: имя, отчество, логин e-mail.
+
+    Фамилия и юрлицо совпадают по построению блока, поэтому не
+    участвуют в оценке.
+    """
+    local_part = (email or "").split("@", 1)[0]
+    return " ".join(
+        part
+        for part in (
+            normalize_name(first_name),
+            normalize_name(middle_name),
+            normalize_name(local_part),
+        )
+        if part
+    )
+
+
+def _trigram_matrix(
+    texts: list[str],
+    vocabulary: dict[str, int],
+) -> np.ndarray:
+    """Строит L2-нормированную матрицу частот символьных триграмм."""
+    rows: list[int] = []
+    cols: list[int] = []
+    for row, text in enumerate(texts):
+        padded = f"  {text} "
+        for i in range(len(padded) - 2):
+            rows.append(row)
+            cols.append(vocabulary.setdefault(padded[i:i + 3], len(vocabulary)))
+
+    matrix = np.zeros((len(texts), len(vocabulary)), dtype=np.float32)
+    np.add.at(matrix, (rows, cols), 1.0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
+    return matrix
+
+
+def _runner_up(scores: np.ndarray, axis: int) -> np.ndarray:
+    """Второе по величине значение вдоль оси (0, если значение одно)."""
+    if scores.shape[axis] < 2:
+        shape = list(scores.shape)
+        del shape[axis]
+        return np.zeros(shape, dtype=scores.dtype)
+    return np.sort(scores, axis=axis).take(-2, axis=axis)
+
+
+def _match_block(
+    record_texts: list[str],
+    candidate_texts: list[str],
+    *,
+    threshold: float,
+    margin: float,
+) -> list[tuple[int, int, float]]:
+    """Сопоставляет записи и кандидатов одного блока.
+
+    Оценка — косинусная близость векторов триграмм. Пара принимается,
+    если оценка не ниже threshold и отрывается от второй лучшей оценки
+    и записи, и кандидата не меньше чем на margin. Каждый кандидат
+    достаётся не более чем одной записи.
+    """
+    vocabulary: dict[str, int] = {}
+    records = _trigram_matrix(record_texts, vocabulary)
+    candidates = _trigram_matrix(candidate_texts, vocabulary)
+    # матрица записей строилась при меньшем словаре — дополняем нулями
+    records = np.pad(records, ((0, 0), (0, len(vocabulary) - records.shape[1])))
+
+    scores = records @ candidates.T
+    best = scores.argmax(axis=1)
+    best_scores = scores[np.arange(len(record_texts)), best]
+    row_second = _runner_up(scores, axis=1)
+    col_second = _runner_up(scores, axis=0)
+
+    accepted: list[tuple[int, int, float]] = []
+    used: set[int] = set()
+    for row in np.argsort(-best_scores):
+        col = int(best[row])
+        score = float(best_scores[row])
+        if score < threshold or col in used:
+            continue
+        if score - max(row_second[row], col_second[col]) < margin:
+            continue
+        used.add(col)
+        accepted.append((int(row), col, score))
+    return accepted
+
+
+def match_records(
+    records: Iterable[tuple[Hashable, tuple[str, str], str]],
+    candidates: Iterable[tuple[int, tuple[str, str], str]],
+    *,
+    threshold: float = 0.8,
+    margin: float = 0.1,
+) -> dict[Hashable, tuple[int, float]]:
+    """Пакетно сопоставляет несопоставленные записи с сотрудниками.
+
+    Args:
+        records: Тройки (ключ записи, block_key, match_text).
+        candidates: Тройки (id сотрудника, block_key, match_text).
+        threshold: Минимальная косинусная близость.
+        margin: Минимальный отрыв от ближайшего конкурента.
+
+    Возвращает ключ записи → (id сотрудника, оценка) для уверенных пар.
+    """
+    record_blocks: dict[tuple[str, str], list[tuple[Hashable, str]]] = (
+        defaultdict(list)
+    )
+    for key, block, text in records:
+        if block[0] and text:
+            record_blocks[block].append((key, text))
+
+    candidate_blocks: dict[tuple[str, str], list[tuple[int, str]]] = (
+        defaultdict(list)
+    )
+    for employee_id, block, text in candidates:
+        if block in record_blocks and text:
+            candidate_blocks[block].append((employee_id, text))
+
+    result: dict[Hashable, tuple[int, float]] = {}
+    for block, block_records in record_blocks.items():
+        block_candidates = candidate_blocks.get(block)
+        if not block_candidates:
+            continue
+        pairs = _match_block(
+            [text for _, text in block_records],
+            [text for _, text in block_candidates],
+            threshold=threshold,
+            margin=margin,
+        )
+        for row, col, score in pairs:
+            result[block_records[row][0]] = (block_candidates[col][0], score)
+    return result
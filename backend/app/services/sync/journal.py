@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.sync import SyncJob
+from app.utils.logger import logger
+
+# Партиции sync_record называются по границам диапазона job_id: [lo, hi)
+_PARTITION_NAME_RE = re.compile(r"^sync_record_j(\d+)_(\d+)$")
+
+# Ключ advisory-блокировки DDL над партициями sync_record
+_PARTITION_LOCK_KEY = 0x5EC0D
+
+
+def _partition_name(lo: int, hi: int) -> str:
+    return f"sync_record_j{lo}_{hi}"
+
+
+async def list_sync_record_partitions(
+    session: AsyncSession,
+) -> list[tuple[str, int, int]]:
+    """Возвращает партиции sync_record как (имя, lo, hi), по возрастанию lo."""
+    res = await session.execute(
+        text(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'sync_record'::regclass
+            """,
+        ),
+    )
+    partitions: list[tuple[str, int, int]] = []
+    for (name,) in res.all():
+        match = _PARTITION_NAME_RE.match(name)
+        if match:
+            partitions.append((name, int(match.group(1)), int(match.group(2))))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+async def ensure_sync_record_partition(
+    session: AsyncSession,
+    job_id: int,
+    *,
+    width: int,
+) -> None:
+    """Создаёт партицию sync_record для запуска, если её ещё нет.
+
+    Диапазоны выровнены по width запусков и не пересекаются с
+    существующими партициями (в том числе созданными при другой ширине).
+    DDL сериализуется advisory-блокировкой до конца транзакции —
+    вызывающий код должен её зафиксировать.
+    """
+    width = max(1, width)
+    await session.execute(
+        select(func.pg_advisory_xact_lock(_PARTITION_LOCK_KEY)),
+    )
+
+    lo = job_id // width * width
+    hi = lo + width
+    for _, p_lo, p_hi in await list_sync_record_partitions(session):
+        if p_lo <= job_id < p_hi:
+            return
+        if p_hi <= job_id:
+            lo = max(lo, p_hi)
+        else:
+            hi = min(hi, p_lo)
+
+    name = _partition_name(lo, hi)
+    await session.execute(
+        text(
+            f"CREATE TABLE {name} PARTITION OF sync_record "
+            f"FOR VALUES FROM ({lo}) TO ({hi})",
+        ),
+    )
+    logger.info("[SYNC] created journal partition %s", name)
+
+
+async def drop_expired_sync_record_partitions(
+    session: AsyncSession,
+    *,
+    retention_days: int,
+) -> list[str]:
+    """Удаляет партиции журнала, все запуски которых старше retention_days.
+
+    Партиция удаляется целиком (DROP TABLE), без построчного DELETE.
+    Партиция с последним запуском и партиции с незавершёнными запусками
+    не трогаются. Сами SyncJob со сводками остаются.
+
+    Возвращает имена удалённых партиций.
+    """
+    if retention_days <= 0:
+        return []
+
+    await session.execute(
+        select(func.pg_advisory_xact_lock(_PARTITION_LOCK_KEY)),
+    )
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    last_job_id = await session.scalar(select(func.max(SyncJob.id))) or 0
+
+    dropped: list[str] = []
+    for name, lo, hi in await list_sync_record_partitions(session):
+        if hi > last_job_id:
+            continue
+
+        newest, running = (
+            await session.execute(
+                select(
+                    func.max(SyncJob.started_at),
+                    func.count().filter(SyncJob.status == "running"),
+                ).where(SyncJob.id >= lo, SyncJob.id < hi),
+            )
+        ).one()
+        if running or (newest is not None and newest >= cutoff):
+            continue
+
+        await session.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+        logger.info("[SYNC] dropped journal partition %s", name)
+
+    return dropped
@@ -2,45 +2,169 @@ from __future__ import annotations
 
 from typing import Any
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Text,
+    and_,
+    cast,
+    delete,
+    exists,
+    func,
+    insert,
+    null,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
 
 from app.models.employee import Employee
+from app.models.employee_identity import EmployeeIdentity
 from app.models.org_unit import OrgUnit
+from app.models.sync import (
+    SyncDnRef,
+    SyncFuzzyPending,
+    SyncJob,
+    SyncManagerLink,
+    SyncRecord,
+    SyncSeenRef,
+)
 
 
-async def get_employee_by_external_ref(
+async def resolve_identities(
     session: AsyncSession,
-    external_ref: str | None,
-) -> Employee | None:
-    """Возвращает сотрудника по external_ref или None, если не найден."""
-    if not external_ref:
-        return None
+    source: str,
+    refs: set[str],
+) -> dict[str, int]:
+    """Разрешает external_ref внешней системы в id сотрудников.
+
+    Один запрос по уникальному индексу (source, external_ref).
+    """
+    if not refs:
+        return {}
 
     res = await session.execute(
-        select(Employee).where(Employee.external_ref == external_ref),
+        select(EmployeeIdentity.external_ref, EmployeeIdentity.employee_id).where(
+            EmployeeIdentity.source == source,
+            EmployeeIdentity.external_ref.in_(refs),
+        ),
     )
-    return res.scalar_one_or_none()
+    return {ref: employee_id for ref, employee_id in res.all()}
 
 
-async def get_employee_by_email(
+async def register_identities(
     session: AsyncSession,
-    email: str | None,
-) -> Employee | None:
-    """Возвращает сотрудника по email или None, если не найден."""
-    if not email:
-        return None
+    source: str,
+    identities: dict[str, int],
+) -> None:
+    """Сохраняет соответствия external_ref → id сотрудника.
 
-    res = await session.execute(
-        select(Employee).where(Employee.email == email),
+    Уже известные идентификаторы не перезаписываются.
+    """
+    if not identities:
+        return
+
+    await session.execute(
+        pg_insert(EmployeeIdentity)
+        .values(
+            [
+                {
+                    "source": source,
+                    "external_ref": ref,
+                    "employee_id": employee_id,
+                }
+                for ref, employee_id in identities.items()
+            ],
+        )
+        .on_conflict_do_nothing(),
     )
-    return res.scalar_one_or_none()
+
+
+async def load_sync_candidates(
+    session: AsyncSession,
+    *,
+    ids: set[int],
+    refs: set[str],
+    emails: set[str],
+) -> list[Employee]:
+    """Загружает сотрудников, с которыми сопоставляются записи пачки.
+
+    Одним запросом: по id из реестра идентификаторов, по
+    employee.external_ref (идентификаторы, которых ещё нет в реестре)
+    и по e-mail.
+    """
+    conditions = []
+    if ids:
+        conditions.append(Employee.id.in_(ids))
+    if refs:
+        conditions.append(Employee.external_ref.in_(refs))
+    if emails:
+        conditions.append(Employee.email.in_(emails))
+    if not conditions:
+        return []
+
+    res = await session.execute(select(Employee).where(or_(*conditions)))
+    return list(res.scalars().all())
+
+
+async def load_fuzzy_candidates(
+    session: AsyncSession,
+    *,
+    last_names: set[str],
+    companies: set[str],
+    exclude_ids: set[int],
+    job_id: int,
+    source: str,
+) -> list[tuple[Employee, str]]:
+    """Загружает активных сотрудников для нечёткого сопоставления.
+
+    Кандидаты отбираются по фамилии (в нижнем регистре, ё → е) и ad_name
+    юрлица их департамента. Сотрудники, уже сопоставленные в запуске
+    job_id, не берутся: их external_ref, e-mail или идентификатор в
+    реестре (source) есть среди ключей запуска (sync_seen_ref).
+    Возвращает пары (сотрудник, ad_name юрлица).
+    """
+    if not last_names or not companies:
+        return []
+
+    Department = aliased(OrgUnit)
+    LegalEntity = aliased(OrgUnit)
+
+    stmt = (
+        select(Employee, LegalEntity.ad_name)
+        .join(Department, Employee.department_id == Department.id)
+        .join(LegalEntity, Department.parent_id == LegalEntity.id)
+        .where(
+            Employee.status == "active",
+            func.replace(func.lower(Employee.last_name), "ё", "е").in_(last_names),
+            LegalEntity.unit_type == "legal_entity",
+            LegalEntity.ad_name.in_(companies),
+        )
+    )
+    if exclude_ids:
+        stmt = stmt.where(Employee.id.not_in(exclude_ids))
+
+    seen = SyncSeenRef.__table__
+    identity = EmployeeIdentity.__table__
+    stmt = stmt.where(
+        _missing_from_source(job_id, active_only=False),
+        ~exists().where(
+            identity.c.employee_id == Employee.id,
+            identity.c.source == source,
+            seen.c.job_id == job_id,
+            seen.c.ref == identity.c.external_ref,
+        ),
+    )
+
+    res = await session.execute(stmt)
+    return [(emp, company) for emp, company in res.all()]
 
 
 async def upsert_employee_core(
     session: AsyncSession,
     *,
+    existing: Employee | None,
     external_ref: str | None,
     email: str,
     first_name: str,
@@ -54,25 +178,15 @@ async def upsert_employee_core(
 ) -> tuple[Employee, bool, bool, bool]:
     """Создаёт или обновляет сотрудника.
 
+    Сопоставление с существующим сотрудником (existing) выполняет
+    вызывающий код — пачкой, через реестр идентификаторов.
+
     Возвращает кортеж (employee, created, changed, dismissed_now).
     """
     created = False
     changed = False
     dismissed_now = False
 
-    existing: Employee | None = None
-    if external_ref:
-        res = await session.execute(
-            select(Employee).where(Employee.external_ref == external_ref),
-        )
-        existing = res.scalar_one_or_none()
-
-    if existing is None:
-        res = await session.execute(
-            select(Employee).where(Employee.email == email),
-        )
-        existing = res.scalar_one_or_none()
-
     if existing:
 
         def set_if(field: str, value: Any) -> None:
@@ -134,31 +248,548 @@ async def upsert_employee_core(
     return emp, created, changed, dismissed_now
 
 
-async def resolve_department_id_for_sync(
+async def load_department_map(
     session: AsyncSession,
-    *,
-    company: str | None,
-    department: str | None,
-) -> int | None:
-    """Ищет департамент по (company, department) через OrgUnit.ad_name."""
-    if not company or not department:
-        return None
+) -> dict[tuple[str, str], int]:
+    """Загружает соответствие (company, department) → id департамента.
 
+    Один запрос по OrgUnit.ad_name юрлиц и их департаментов; при
+    совпадении ad_name берётся департамент с меньшим id.
+    """
     Parent = aliased(OrgUnit)
     Child = aliased(OrgUnit)
 
     res = await session.execute(
-        select(Child.id)
+        select(Parent.ad_name, Child.ad_name, Child.id)
         .join(Parent, Child.parent_id == Parent.id)
         .where(
             Parent.unit_type == "legal_entity",
-            Parent.ad_name == company,
+            Parent.ad_name.is_not(None),
             Parent.is_archived.is_(False),
             Child.unit_type == "department",
-            Child.ad_name == department,
+            Child.ad_name.is_not(None),
             Child.is_archived.is_(False),
         )
-        .limit(1),
+        .order_by(Child.id.asc()),
     )
 
-    return res.scalar_one_or_none()
+    departments: dict[tuple[str, str], int] = {}
+    for company, department, dept_id in res.all():
+        departments.setdefault((company, department), dept_id)
+    return departments
+
+
+async def create_missing_departments(
+    session: AsyncSession,
+    pairs: set[tuple[str, str]],
+) -> tuple[dict[tuple[str, str], int], int]:
+    """Создаёт недостающие департаменты под юрлицами по ad_name.
+
+    Юрлица не создаются: пары с неизвестной company остаются
+    неразрешёнными. Имя департамента уникально среди всех юрлиц
+    (uq_org_unit_type_name_lower), поэтому перед вставкой ищутся
+    департаменты с тем же именем. Департамент того же юрлица без ad_name
+    (созданный вручную) или с тем же ad_name (архивный) подхватывается:
+    ему проставляется ad_name и снимается архивность. Если имя занято
+    департаментом другого юрлица, создаётся "Отдел (Юрлицо)". Остальные
+    пары (имя занято департаментом того же юрлица с другим ad_name или
+    вставлено параллельно) остаются неразрешёнными.
+
+    Возвращает (разрешённые пары → id департамента, сколько создано).
+    """
+    if not pairs:
+        return {}, 0
+
+    res = await session.execute(
+        select(OrgUnit.id, OrgUnit.ad_name)
+        .where(
+            OrgUnit.unit_type == "legal_entity",
+            OrgUnit.ad_name.in_({company for company, _ in pairs}),
+            OrgUnit.is_archived.is_(False),
+        )
+        .order_by(OrgUnit.id.asc()),
+    )
+    parent_by_company: dict[str, int] = {}
+    for parent_id, company in res.all():
+        parent_by_company.setdefault(company, parent_id)
+    company_by_parent = {pid: c for c, pid in parent_by_company.items()}
+
+    if not parent_by_company:
+        return {}, 0
+
+    # департаменты могли появиться после загрузки кэша
+    res = await session.execute(
+        select(OrgUnit.parent_id, OrgUnit.ad_name, OrgUnit.id)
+        .where(
+            OrgUnit.unit_type == "department",
+            OrgUnit.parent_id.in_(parent_by_company.values()),
+            OrgUnit.ad_name.in_({department for _, department in pairs}),
+            OrgUnit.is_archived.is_(False),
+        )
+        .order_by(OrgUnit.id.asc()),
+    )
+    resolved: dict[tuple[str, str], int] = {}
+    for parent_id, department, dept_id in res.all():
+        resolved.setdefault((company_by_parent[parent_id], department), dept_id)
+
+    to_create = sorted(
+        pair
+        for pair in pairs
+        if pair not in resolved and pair[0] in parent_by_company
+    )
+    created = 0
+
+    for make_name in (
+        lambda company, department: department,
+        lambda company, department: f"{department} ({company})",
+    ):
+        if not to_create:
+            break
+
+        names = {pair: make_name(*pair) for pair in to_create}
+        taken = await _departments_by_name(session, set(names.values()))
+
+        to_insert: list[tuple[str, str]] = []
+        to_adopt: dict[tuple[str, str], int] = {}
+        retry: list[tuple[str, str]] = []
+        for pair, name in names.items():
+            company, department = pair
+            owner = taken.get(name.lower())
+            if owner is None:
+                to_insert.append(pair)
+                continue
+
+            dept_id, parent_id, ad_name = owner
+            if parent_id != parent_by_company[company]:
+                # имя занято департаментом другого юрлица
+                retry.append(pair)
+            elif ad_name is None or ad_name == department:
+                # созданный вручную или архивный департамент того же юрлица
+                to_adopt[pair] = dept_id
+
+        if to_adopt:
+            await session.execute(
+                update(OrgUnit),
+                [
+                    {
+                        "id": dept_id,
+                        "ad_name": department,
+                        "is_archived": False,
+                    }
+                    for (_, department), dept_id in to_adopt.items()
+                ],
+            )
+            resolved.update(to_adopt)
+
+        if to_insert:
+            res = await session.execute(
+                pg_insert(OrgUnit)
+                .values(
+                    [
+                        {
+                            "parent_id": parent_by_company[company],
+                            "unit_type": "department",
+                            "name": names[(company, department)],
+                            "ad_name": department,
+                            "is_archived": False,
+                        }
+                        for company, department in to_insert
+                    ],
+                )
+                .on_conflict_do_nothing()
+                .returning(OrgUnit.parent_id, OrgUnit.ad_name, OrgUnit.id),
+            )
+            for parent_id, department, dept_id in res.all():
+                resolved[(company_by_parent[parent_id], department)] = dept_id
+                created += 1
+
+        to_create = retry
+
+    return resolved, created
+
+
+async def _departments_by_name(
+    session: AsyncSession,
+    names: set[str],
+) -> dict[str, tuple[int, int | None, str | None]]:
+    """Департаменты с такими именами без учёта регистра, в том числе архивные.
+
+    Возвращает lower(name) → (id, parent_id, ad_name).
+    """
+    res = await session.execute(
+        select(
+            func.lower(OrgUnit.name),
+            OrgUnit.id,
+            OrgUnit.parent_id,
+            OrgUnit.ad_name,
+        ).where(
+            OrgUnit.unit_type == "department",
+            func.lower(OrgUnit.name).in_({name.lower() for name in names}),
+        ),
+    )
+    return {
+        name: (dept_id, parent_id, ad_name)
+        for name, dept_id, parent_id, ad_name in res.all()
+    }
+
+
+async def record_manager_links(
+    session: AsyncSession,
+    job_id: int,
+    links: dict[str, tuple[int | None, str | None, str]],
+) -> None:
+    """Запоминает ссылки на руководителей до конца запуска.
+
+    Args:
+        session: Асинхронная сессия БД.
+        job_id: Запуск синхронизации.
+        links: Ключ записи → (id подчинённого или None, external_ref
+            подчинённого, external_ref или DN руководителя). Если id
+            неизвестен (запись не применилась или пропущена при
+            продолжении), подчинённый ищется по external_ref; уже
+            известный id при этом не затирается.
+    """
+    if not links:
+        return
+
+    stmt = pg_insert(SyncManagerLink).values(
+        [
+            {
+                "job_id": job_id,
+                "key": key,
+                "employee_id": employee_id,
+                "sub_ref": sub_ref,
+                "manager_ref": manager_ref,
+            }
+            for key, (employee_id, sub_ref, manager_ref) in links.items()
+        ],
+    )
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[SyncManagerLink.job_id, SyncManagerLink.key],
+            set_={
+                "employee_id": func.coalesce(
+                    stmt.excluded.employee_id,
+                    SyncManagerLink.employee_id,
+                ),
+                "sub_ref": stmt.excluded.sub_ref,
+                "manager_ref": stmt.excluded.manager_ref,
+            },
+        ),
+    )
+
+
+async def record_dn_refs(
+    session: AsyncSession,
+    job_id: int,
+    refs: dict[str, str],
+) -> set[str]:
+    """Запоминает DN (в нижнем регистре) → external_ref записей запуска.
+
+    Возвращает DN, которых в запуске ещё не было: повторы отсекает
+    первичный ключ sync_dn_ref.
+    """
+    if not refs:
+        return set()
+
+    res = await session.execute(
+        pg_insert(SyncDnRef)
+        .values(
+            [
+                {"job_id": job_id, "dn": dn, "external_ref": external_ref}
+                for dn, external_ref in refs.items()
+            ],
+        )
+        .on_conflict_do_nothing()
+        .returning(SyncDnRef.dn),
+    )
+    return set(res.scalars())
+
+
+async def clear_dn_refs(session: AsyncSession, job_id: int) -> None:
+    """Удаляет DN запуска (перед полным проходом источника заново)."""
+    await session.execute(delete(SyncDnRef).where(SyncDnRef.job_id == job_id))
+
+
+async def link_managers_for_job(
+    session: AsyncSession,
+    job_id: int,
+    *,
+    source: str = "ad",
+) -> int:
+    """Проставляет manager_id по ссылкам запуска одним UPDATE ... FROM.
+
+    Ссылка-DN разрешается в external_ref по sync_dn_ref запуска, то есть
+    и между OU. Сотрудники по external_ref ищутся в реестре
+    employee_identity (source), затем по employee.external_ref —
+    идентификаторы, которых ещё нет в реестре.
+
+    Возвращает число сотрудников, у которых изменился руководитель.
+    """
+    link = SyncManagerLink
+    manager_identity = aliased(EmployeeIdentity)
+    manager = aliased(Employee)
+    sub_identity = aliased(EmployeeIdentity)
+    sub = aliased(Employee)
+    manager_ref = func.coalesce(SyncDnRef.external_ref, link.manager_ref)
+
+    resolved = (
+        select(
+            func.coalesce(
+                link.employee_id,
+                sub_identity.employee_id,
+                sub.id,
+            ).label("sub_id"),
+            func.coalesce(manager_identity.employee_id, manager.id).label(
+                "manager_id",
+            ),
+        )
+        .select_from(link)
+        .outerjoin(
+            SyncDnRef,
+            and_(
+                SyncDnRef.job_id == link.job_id,
+                SyncDnRef.dn == func.lower(link.manager_ref),
+            ),
+        )
+        .outerjoin(
+            manager_identity,
+            and_(
+                manager_identity.source == source,
+                manager_identity.external_ref == manager_ref,
+            ),
+        )
+        .outerjoin(
+            manager,
+            and_(
+                manager_identity.employee_id.is_(None),
+                manager.external_ref == manager_ref,
+            ),
+        )
+        .outerjoin(
+            sub_identity,
+            and_(
+                link.employee_id.is_(None),
+                sub_identity.source == source,
+                sub_identity.external_ref == link.sub_ref,
+            ),
+        )
+        .outerjoin(
+            sub,
+            and_(
+                link.employee_id.is_(None),
+                sub_identity.employee_id.is_(None),
+                sub.external_ref == link.sub_ref,
+            ),
+        )
+        .where(link.job_id == job_id)
+        .subquery("resolved_link")
+    )
+
+    res = await session.execute(
+        update(Employee)
+        .where(
+            Employee.id == resolved.c.sub_id,
+            resolved.c.manager_id.is_not(None),
+            Employee.manager_id.is_distinct_from(resolved.c.manager_id),
+        )
+        .values(manager_id=resolved.c.manager_id)
+        .execution_options(synchronize_session=False),
+    )
+    return res.rowcount or 0
+
+
+async def record_seen_refs(
+    session: AsyncSession,
+    job_id: int,
+    refs: set[str],
+) -> None:
+    """Запоминает ключи (external_ref и e-mail), пришедшие в запуске."""
+    if not refs:
+        return
+
+    await session.execute(
+        pg_insert(SyncSeenRef)
+        .values([{"job_id": job_id, "ref": ref} for ref in refs])
+        .on_conflict_do_nothing(),
+    )
+
+
+def _missing_from_source(job_id: int, *, active_only: bool = True) -> Any:
+    """Условие: сотрудника нет среди ключей запуска.
+
+    По умолчанию — активный сотрудник из каталога (с external_ref),
+    которого нет в запуске; active_only=False — только проверка ключей.
+    """
+    seen = SyncSeenRef.__table__
+    condition = ~exists().where(
+        seen.c.job_id == job_id,
+        seen.c.ref == Employee.external_ref,
+    ) & ~exists().where(
+        seen.c.job_id == job_id,
+        seen.c.ref == func.lower(cast(Employee.email, Text)),
+    )
+    if not active_only:
+        return condition
+    return (
+        (Employee.status == "active")
+        & Employee.external_ref.is_not(None)
+        & condition
+    )
+
+
+async def count_missing_employees(
+    session: AsyncSession,
+    job_id: int,
+) -> tuple[int, int]:
+    """Считает активных сотрудников из каталога, не пришедших в запуске.
+
+    Возвращает (пропавшие, всего активных с external_ref).
+    """
+    res = await session.execute(
+        select(
+            func.count().filter(_missing_from_source(job_id)),
+            func.count(),
+        ).where(
+            Employee.status == "active",
+            Employee.external_ref.is_not(None),
+        ),
+    )
+    missing, total = res.one()
+    return int(missing or 0), int(total or 0)
+
+
+async def archive_missing_employees(
+    session: AsyncSession,
+    job_id: int,
+    *,
+    message: str,
+    chunk_size: int = 1000,
+) -> int:
+    """Увольняет сотрудников, пропавших из источника, одним UPDATE.
+
+    На каждого уволенного пишется запись журнала archive.
+    Возвращает число уволенных.
+    """
+    res = await session.execute(
+        update(Employee)
+        .where(_missing_from_source(job_id))
+        .values(status="dismissed", is_blocked=True)
+        .returning(Employee.external_ref)
+        .execution_options(synchronize_session=False),
+    )
+    refs = [ref for (ref,) in res.all()]
+
+    for start in range(0, len(refs), chunk_size):
+        await session.execute(
+            insert(SyncRecord),
+            [
+                {
+                    "job_id": job_id,
+                    "external_ref": ref,
+                    "action": "archive",
+                    "status": "applied",
+                    "error_code": None,
+                    "message": message,
+                }
+                for ref in refs[start:start + chunk_size]
+            ],
+        )
+
+    return len(refs)
+
+
+async def clear_job_refs(session: AsyncSession, job_id: int) -> None:
+    """Удаляет служебные строки завершённого запуска.
+
+    Ключи сверки, ссылки на руководителей и DN записей.
+    """
+    for table in (SyncSeenRef, SyncManagerLink, SyncDnRef):
+        await session.execute(delete(table).where(table.job_id == job_id))
+
+
+async def supersede_interrupted_jobs(session: AsyncSession, job_id: int) -> int:
+    """Закрывает продолжение запусков, прерванных раньше job_id.
+
+    Вызывается, когда запуск job_id прошёл источник целиком: продолжать
+    более ранние прерванные запуски (error / cancelled) больше незачем.
+    Их checkpoint сбрасывается, служебные строки (см. clear_job_refs) и
+    отложенные до нечёткого сопоставления записи удаляются.
+    Возвращает число запусков, у которых был checkpoint.
+    """
+    interrupted = (SyncJob.id < job_id) & SyncJob.status.in_(("error", "cancelled"))
+
+    res = await session.execute(
+        update(SyncJob)
+        .where(interrupted, SyncJob.checkpoint.is_not(None))
+        .values(checkpoint=null())
+        .returning(SyncJob.id)
+        .execution_options(synchronize_session=False),
+    )
+    superseded = len(res.all())
+
+    for table in (SyncSeenRef, SyncManagerLink, SyncDnRef, SyncFuzzyPending):
+        await session.execute(
+            delete(table).where(
+                table.job_id.in_(select(SyncJob.id).where(interrupted)),
+            ),
+        )
+    return superseded
+
+
+async def defer_fuzzy_records(
+    session: AsyncSession,
+    job_id: int,
+    records: dict[str, dict[str, Any]],
+) -> None:
+    """Откладывает записи (ключ → payload) до нечёткого сопоставления.
+
+    Повторно применённая после сбоя пачка пишет те же строки, поэтому
+    ON CONFLICT DO NOTHING.
+    """
+    if not records:
+        return
+
+    await session.execute(
+        pg_insert(SyncFuzzyPending)
+        .values(
+            [
+                {"job_id": job_id, "key": key, "payload": payload}
+                for key, payload in records.items()
+            ],
+        )
+        .on_conflict_do_nothing(),
+    )
+
+
+async def load_fuzzy_pending(
+    session: AsyncSession,
+    job_id: int,
+    *,
+    limit: int,
+) -> list[tuple[str, dict[str, Any]]]:
+    """Возвращает первые limit отложенных записей запуска по ключу."""
+    res = await session.execute(
+        select(SyncFuzzyPending.key, SyncFuzzyPending.payload)
+        .where(SyncFuzzyPending.job_id == job_id)
+        .order_by(SyncFuzzyPending.key.asc())
+        .limit(limit),
+    )
+    return [(key, payload) for key, payload in res.all()]
+
+
+async def delete_fuzzy_pending(
+    session: AsyncSession,
+    job_id: int,
+    keys: list[str],
+) -> None:
+    """Удаляет обработанные отложенные записи запуска."""
+    if not keys:
+        return
+
+    await session.execute(
+        delete(SyncFuzzyPending).where(
+            SyncFuzzyPending.job_id == job_id,
+            SyncFuzzyPending.key.in_(keys),
+        ),
+    )
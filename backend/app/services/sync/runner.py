@@ -1,19 +1,56 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import asyncio
+import zlib
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
 
+from app.core.config import settings
+from app.db.session import async_session_maker, engine
 from app.models.employee import Employee
 from app.models.sync import SyncJob, SyncRecord
 from app.schemas.sync import SyncEmployeePayload
-from app.services.sync.preprocessor import load_sync_payload
+from app.services.sync.fuzzy_match import block_key, match_records, match_text
+from app.services.sync.journal import (
+    drop_expired_sync_record_partitions,
+    ensure_sync_record_partition,
+)
+from app.services.sync.preprocessor import normalize_sync_batch
 from app.services.sync.repository import (
-    get_employee_by_email,
-    get_employee_by_external_ref,
-    resolve_department_id_for_sync,
+    archive_missing_employees,
+    clear_dn_refs,
+    clear_job_refs,
+    count_missing_employees,
+    create_missing_departments,
+    defer_fuzzy_records,
+    delete_fuzzy_pending,
+    link_managers_for_job,
+    load_department_map,
+    load_fuzzy_candidates,
+    load_fuzzy_pending,
+    load_sync_candidates,
+    record_dn_refs,
+    record_manager_links,
+    record_seen_refs,
+    register_identities,
+    resolve_identities,
+    supersede_interrupted_jobs,
     upsert_employee_core,
 )
+from app.services.sync.sources import SyncSource, get_sync_source
+from app.utils.logger import logger
+
+# Маркер конца потока в очередях конвейера
+_END_OF_STREAM = object()
+
+# Первый ключ advisory-блокировки запуска; второй — id запуска
+_JOB_LOCK_CLASS = 0x5EC1
 
 
 class SyncSummary(dict):
@@ -24,19 +61,72 @@ class SyncSummary(dict):
         self[key] = int(self.get(key, 0)) + delta
 
 
-async def _detect_intended_action(
-    session: AsyncSession,
-    *,
-    external_ref: str | None,
-    email: str,
-) -> str:
-    """Определяет предполагаемое действие: create или update."""
-    existing: Employee | None = None
-    if external_ref:
-        existing = await get_employee_by_external_ref(session, external_ref)
-    if existing is None:
-        existing = await get_employee_by_email(session, email)
-    return "update" if existing else "create"
+class SyncResumeError(Exception):
+    """Запуск синхронизации нельзя продолжить."""
+
+
+class SyncJobBusyError(SyncResumeError):
+    """Запуск ещё выполняется (или недавно сохранял checkpoint)."""
+
+
+class _CheckpointMismatch(Exception):
+    """Источник отдаёт записи не в том порядке, что при прерванном запуске."""
+
+
+class _SyncState:
+    """Состояние одного запуска синхронизации, общее для стадий конвейера."""
+
+    def __init__(
+        self,
+        job: SyncJob,
+        summary: SyncSummary,
+        *,
+        apply_partitions: int = 1,
+        chunk_size: int = 2000,
+        reconcile: bool = False,
+        create_org_units: bool = False,
+        identity_source: str = "ad",
+        fuzzy_mode: str = "off",
+        journal_mode: str = "full",
+    ) -> None:
+        self.job = job
+        self.job_id = job.id
+        self.summary = summary
+        self.apply_partitions = max(1, apply_partitions)
+        self.chunk_size = max(1, chunk_size)
+        # запоминать ключи записей для сверки с каталогом
+        self.reconcile = reconcile
+        # (company, department) → id департамента; недостающие
+        # департаменты досоздаются перед применением пачки
+        self.create_org_units = create_org_units
+        # внешняя система, в которой выданы external_ref записей источника
+        self.identity_source = identity_source
+        # нечёткое сопоставление несопоставленных записей: off/propose/apply
+        self.fuzzy_mode = fuzzy_mode if fuzzy_mode in ("propose", "apply") else "off"
+        # ключи записей (sync_seen_ref) нужны сверке и нечёткому
+        # сопоставлению — оно не предлагает уже сопоставленных сотрудников
+        self.track_seen = reconcile or self.fuzzy_mode != "off"
+        # compact — в журнал пишутся только ошибки и увольнения
+        self.journal_mode = "compact" if journal_mode == "compact" else "full"
+        self.departments: dict[tuple[str, str], int] = {}
+        self.unresolved_departments: set[tuple[str, str]] = set()
+
+        # позиция в потоке источника и ключ последней записи
+        self.position = 0
+        self.last_key: str | None = None
+        self.uncommitted = 0
+        # сводка на момент последнего коммита — её и сохраняем при сбое
+        self.committed_summary: dict[str, Any] = dict(summary)
+        # checkpoint прерванного запуска: первые resume_from записей пропускаем
+        self.resume_from = 0
+        self.resume_key: str | None = None
+
+    def restart(self) -> None:
+        """Сбрасывает позицию для полного прохода без пропуска записей."""
+        self.position = 0
+        self.last_key = None
+        self.resume_from = 0
+        self.resume_key = None
 
 
 def _calc_is_blocked_from_sync(payload: SyncEmployeePayload) -> bool | None:
@@ -55,176 +145,1012 @@ def _calc_status_from_sync(payload: SyncEmployeePayload) -> str | None:
     return None
 
 
-async def run_employee_sync(
+class _BatchMatches:
+    """Сопоставление записей пачки с сотрудниками каталога.
+
+    Запись ищется по идентификатору в реестре employee_identity, затем по
+    employee.external_ref (идентификаторы, ещё не попавшие в реестр) и по
+    e-mail. Созданные и сопоставленные по ходу пачки сотрудники
+    запоминаются, а их новые идентификаторы копятся в new_identities.
+    """
+
+    def __init__(
+        self,
+        identities: dict[str, int],
+        employees: list[Employee],
+    ) -> None:
+        self.identities = identities
+        self.by_id: dict[int, Employee] = {}
+        self.by_ref: dict[str, Employee] = {}
+        self.by_email: dict[str, Employee] = {}
+        for emp in sorted(employees, key=lambda e: e.id):
+            self._add(emp)
+        self.new_identities: dict[str, int] = {}
+
+    @classmethod
+    async def load(
+        cls,
+        session: AsyncSession,
+        items: list[SyncEmployeePayload],
+        source: str,
+    ) -> _BatchMatches:
+        """Загружает кандидатов для пачки тремя запросами на всю пачку."""
+        refs = {item.external_ref for item in items if item.external_ref}
+        identities = await resolve_identities(session, source, refs)
+        employees = await load_sync_candidates(
+            session,
+            ids=set(identities.values()),
+            refs=refs - identities.keys(),
+            emails={item.email for item in items if item.email},
+        )
+        return cls(identities, employees)
+
+    def _add(self, emp: Employee) -> None:
+        self.by_id[emp.id] = emp
+        if emp.external_ref:
+            self.by_ref.setdefault(emp.external_ref, emp)
+        self.by_email.setdefault(emp.email.lower(), emp)
+
+    def find(self, item: SyncEmployeePayload) -> Employee | None:
+        """Возвращает сотрудника для записи или None, если его ещё нет."""
+        if item.external_ref:
+            emp_id = self.identities.get(item.external_ref)
+            if emp_id is not None and emp_id in self.by_id:
+                return self.by_id[emp_id]
+            if item.external_ref in self.by_ref:
+                return self.by_ref[item.external_ref]
+        return self.by_email.get(item.email.lower()) if item.email else None
+
+    def remember(self, item: SyncEmployeePayload, emp: Employee) -> None:
+        """Запоминает применённого сотрудника и его идентификатор."""
+        self._add(emp)
+        ref = item.external_ref
+        if ref and ref not in self.identities:
+            self.identities[ref] = emp.id
+            self.new_identities[ref] = emp.id
+
+
+async def _apply_item(
     session: AsyncSession,
-    *,
-    trigger: str = "manual",
-) -> dict[str, int]:
-    """Запускает полную синхронизацию сотрудников из AD.
+    item: SyncEmployeePayload,
+    state: _SyncState,
+    existing: Employee | None,
+) -> Employee | None:
+    """Применяет одну запись синхронизации и пишет её в журнал.
 
-    Источник данных определяется в load_sync_payload(), который:
-    * в dev-режиме читает тестовый JSON-файл;
-    * в бою обращается к интеграции с AD.
+    Возвращает сотрудника или None, если запись не применилась.
     """
-    job = SyncJob(
-        trigger=trigger,
-        status="running",
-        started_at=datetime.now(timezone.utc),
-        summary=None,
-    )
-    session.add(job)
-    await session.flush()
+    summary = state.summary
 
-    summary = SyncSummary(created=0, updated=0, archived=0, errors=0)
+    intended_action = "update" if existing else "create"
 
-    try:
-        raw_items: list[SyncEmployeePayload] = await load_sync_payload()
-        by_external: dict[str, int] = {}
+    # company / department обязательны
+    if not item.company or not item.department:
+        summary.inc("errors")
+        session.add(
+            SyncRecord(
+                job_id=state.job_id,
+                external_ref=item.external_ref or item.email,
+                action=intended_action,
+                status="error",
+                error_code="ORG_UNIT_MISSING",
+                message="Missing company or department in sync payload",
+            ),
+        )
+        return None
+
+    department_id = state.departments.get((item.company, item.department))
 
-        for item in raw_items:
-            intended_action = await _detect_intended_action(
+    if department_id is None:
+        summary.inc("errors")
+        session.add(
+            SyncRecord(
+                job_id=state.job_id,
+                external_ref=item.external_ref or item.email,
+                action=intended_action,
+                status="error",
+                error_code="ORG_UNIT_NOT_FOUND",
+                message=(
+                    "Org unit not found for "
+                    f"company='{item.company}', "
+                    f"department='{item.department}'"
+                ),
+            ),
+        )
+        return None
+
+    is_blocked_from_sync = _calc_is_blocked_from_sync(item)
+    status_from_sync = _calc_status_from_sync(item)
+
+    emp: Employee | None = None
+    async with session.begin_nested():
+        try:
+            (
+                emp,
+                created,
+                changed,
+                dismissed_now,
+            ) = await upsert_employee_core(
                 session,
+                existing=existing,
                 external_ref=item.external_ref,
                 email=item.email,
+                first_name=item.first_name,
+                middle_name=item.middle_name,
+                last_name=item.last_name,
+                title=item.title,
+                department_id=department_id,
+                password_hash=item.password_hash,
+                is_blocked_from_sync=is_blocked_from_sync,
+                status_from_sync=status_from_sync,
             )
 
-            # company / department обязательны
-            if not item.company or not item.department:
-                summary.inc("errors")
+            action: str | None = None
+            if created:
+                action = "create"
+                summary.inc("created")
+            elif dismissed_now:
+                action = "archive"
+                summary.inc("archived")
+            elif changed:
+                action = "update"
+                summary.inc("updated")
+
+            if action is not None and (
+                action == "archive" or state.journal_mode == "full"
+            ):
                 session.add(
                     SyncRecord(
-                        job_id=job.id,
+                        job_id=state.job_id,
                         external_ref=item.external_ref or item.email,
-                        action=intended_action,
-                        status="error",
-                        error_code="ORG_UNIT_MISSING",
-                        message="Missing company or department in sync payload",
+                        action=action,
+                        status="applied",
+                        error_code=None,
+                        message=None,
                     ),
                 )
-                continue
 
-            department_id: int | None = await resolve_department_id_for_sync(
-                session,
-                company=item.company,
-                department=item.department,
+        except Exception as exc:
+            emp = None
+            summary.inc("errors")
+
+            error_action = (
+                "archive" if item.is_in_blocked_ou is True else intended_action
             )
 
-            if department_id is None:
-                summary.inc("errors")
-                session.add(
-                    SyncRecord(
-                        job_id=job.id,
-                        external_ref=item.external_ref or item.email,
-                        action=intended_action,
-                        status="error",
-                        error_code="ORG_UNIT_NOT_FOUND",
-                        message=(
-                            "Org unit not found for "
-                            f"company='{item.company}', "
-                            f"department='{item.department}'"
-                        ),
+            session.add(
+                SyncRecord(
+                    job_id=state.job_id,
+                    external_ref=item.external_ref or item.email,
+                    action=error_action,
+                    status="error",
+                    error_code="APPLY_ERROR",
+                    message=str(exc),
+                ),
+            )
+
+    return emp
+
+
+def _sync_key(item: SyncEmployeePayload) -> str:
+    """Ключ записи для партиционирования и порядка применения."""
+    return (item.external_ref or item.email or "").lower()
+
+
+def _manager_ref(item: SyncEmployeePayload) -> str:
+    """Ссылка записи на руководителя: external_ref или DN (может быть пустой)."""
+    return (item.manager_external_ref or item.manager_dn or "").strip()
+
+
+def _needs_fuzzy_match(item: SyncEmployeePayload, matches: _BatchMatches) -> bool:
+    """Запись не найдена по ключам, но её можно сопоставить по ФИО."""
+    return bool(item.last_name and item.company) and matches.find(item) is None
+
+
+async def _fuzzy_match(
+    session: AsyncSession,
+    items: list[SyncEmployeePayload],
+    matches: _BatchMatches,
+    state: _SyncState,
+) -> dict[str, tuple[Employee, float]]:
+    """Подбирает сотрудников для записей, не найденных по ключам.
+
+    Кандидаты — активные сотрудники с той же фамилией в том же юрлице,
+    ещё не сопоставленные ни с записями пачки, ни с другими записями
+    запуска (по его ключам); оценка считается пакетно (см.
+    app.services.sync.fuzzy_match). Возвращает ключ записи →
+    (сотрудник, оценка).
+    """
+    unmatched = [item for item in items if _needs_fuzzy_match(item, matches)]
+    if not unmatched:
+        return {}
+
+    matched_ids = {
+        emp.id for emp in (matches.find(item) for item in items) if emp is not None
+    }
+    candidates = await load_fuzzy_candidates(
+        session,
+        last_names={item.last_name.lower().replace("ё", "е") for item in unmatched},
+        companies={item.company for item in unmatched},
+        exclude_ids=matched_ids,
+        job_id=state.job_id,
+        source=state.identity_source,
+    )
+    if not candidates:
+        return {}
+
+    employees = {emp.id: emp for emp, _ in candidates}
+    found = match_records(
+        (
+            (
+                _sync_key(item),
+                block_key(item.last_name, item.company),
+                match_text(item.first_name, item.middle_name, item.email),
+            )
+            for item in unmatched
+        ),
+        (
+            (
+                emp.id,
+                block_key(emp.last_name, company),
+                match_text(emp.first_name, emp.middle_name, emp.email),
+            )
+            for emp, company in candidates
+        ),
+        threshold=settings.SYNC_FUZZY_MATCH_THRESHOLD,
+        margin=settings.SYNC_FUZZY_MATCH_MARGIN,
+    )
+    return {
+        key: (employees[employee_id], score)
+        for key, (employee_id, score) in found.items()
+    }
+
+
+def _partition_batch(
+    batch: list[SyncEmployeePayload],
+    partitions: int,
+) -> list[list[SyncEmployeePayload]]:
+    """Делит пачку на партиции по хешу ключа.
+
+    Внутри партиции записи отсортированы по ключу: параллельные транзакции
+    захватывают строки employee в одном порядке и не ловят взаимных
+    блокировок.
+    """
+    parts: list[list[SyncEmployeePayload]] = [[] for _ in range(partitions)]
+    for item in batch:
+        key = _sync_key(item)
+        parts[zlib.crc32(key.encode("utf-8")) % partitions].append(item)
+    for part in parts:
+        part.sort(key=_sync_key)
+    return [part for part in parts if part]
+
+
+async def _apply_items(
+    session: AsyncSession,
+    items: list[SyncEmployeePayload],
+    state: _SyncState,
+    *,
+    fuzzy_pass: bool = False,
+) -> None:
+    """Применяет записи в сессии и запоминает ссылки на руководителей.
+
+    Сотрудники для всех записей сопоставляются заранее (см.
+    _BatchMatches), новые идентификаторы регистрируются одним INSERT.
+    Записи без совпадений при SYNC_FUZZY_MATCH_MODE=propose/apply
+    откладываются в sync_fuzzy_pending и сопоставляются нечётко после
+    прохода по всему источнику (fuzzy_pass, см. _apply_fuzzy_pending).
+    """
+    matches = await _BatchMatches.load(session, items, state.identity_source)
+    fuzzy: dict[str, tuple[Employee, float]] = {}
+    if fuzzy_pass:
+        fuzzy = await _fuzzy_match(session, items, matches, state)
+    elif state.fuzzy_mode != "off":
+        deferred = {
+            _sync_key(item): item.model_dump(mode="json")
+            for item in items
+            if _needs_fuzzy_match(item, matches)
+        }
+        await defer_fuzzy_records(session, state.job_id, deferred)
+        items = [item for item in items if _sync_key(item) not in deferred]
+
+    links: dict[str, tuple[int | None, str | None, str]] = {}
+    for item in items:
+        existing = matches.find(item)
+        proposal = fuzzy.get(_sync_key(item)) if existing is None else None
+
+        if proposal is not None and state.fuzzy_mode == "propose":
+            # запись не применяется, пока связь не подтвердят
+            candidate, score = proposal
+            state.summary.inc("fuzzy_proposed")
+            state.summary.inc("errors")
+            session.add(
+                SyncRecord(
+                    job_id=state.job_id,
+                    external_ref=item.external_ref or item.email,
+                    action="update",
+                    status="error",
+                    error_code="FUZZY_MATCH_PROPOSED",
+                    message=(
+                        f"Possible match: employee id={candidate.id} "
+                        f"({candidate.email}), score={score:.2f}"
                     ),
-                )
-                continue
+                ),
+            )
+            continue
 
-            is_blocked_from_sync = _calc_is_blocked_from_sync(item)
-            status_from_sync = _calc_status_from_sync(item)
-
-            async with session.begin_nested():
-                try:
-                    (
-                        emp,
-                        created,
-                        changed,
-                        dismissed_now,
-                    ) = await upsert_employee_core(
-                        session,
-                        external_ref=item.external_ref,
-                        email=item.email,
-                        first_name=item.first_name,
-                        middle_name=item.middle_name,
-                        last_name=item.last_name,
-                        title=item.title,
-                        department_id=department_id,
-                        password_hash=item.password_hash,
-                        is_blocked_from_sync=is_blocked_from_sync,
-                        status_from_sync=status_from_sync,
-                    )
-
-                    action: str | None = None
-                    if created:
-                        action = "create"
-                        summary.inc("created")
-                    elif dismissed_now:
-                        action = "archive"
-                        summary.inc("archived")
-                    elif changed:
-                        action = "update"
-                        summary.inc("updated")
-
-                    if action is not None:
-                        session.add(
-                            SyncRecord(
-                                job_id=job.id,
-                                external_ref=item.external_ref or item.email,
-                                action=action,
-                                status="applied",
-                                error_code=None,
-                                message=None,
-                            ),
-                        )
-
-                    if item.external_ref:
-                        by_external[item.external_ref] = emp.id
-
-                except Exception as exc:
-                    summary.inc("errors")
-
-                    error_action = (
-                        "archive" if item.is_in_blocked_ou is True else intended_action
-                    )
-
-                    session.add(
-                        SyncRecord(
-                            job_id=job.id,
-                            external_ref=item.external_ref or item.email,
-                            action=error_action,
-                            status="error",
-                            error_code="APPLY_ERROR",
-                            message=str(exc),
-                        ),
-                    )
-
-        await session.flush()
-
-        # Вторая фаза — проставляем менеджеров по manager_external_ref
-        for item in raw_items:
-            mgr_ext = (item.manager_external_ref or "").strip()
-            if not mgr_ext:
-                continue
+        if proposal is not None:
+            existing, score = proposal
+            state.summary.inc("fuzzy_matched")
+            logger.info(
+                "[SYNC] job %s: fuzzy match %s -> employee %s (score %.2f)",
+                state.job_id,
+                item.external_ref or item.email,
+                existing.id,
+                score,
+            )
+
+        emp = await _apply_item(session, item, state, existing)
+        employee_id: int | None = None
+        if emp is not None:
+            employee_id = emp.id
+            matches.remember(item, emp)
+
+        manager_ref = _manager_ref(item)
+        if manager_ref:
+            links[_sync_key(item)] = (employee_id, item.external_ref, manager_ref)
+
+    await register_identities(
+        session,
+        state.identity_source,
+        matches.new_identities,
+    )
+    await record_manager_links(session, state.job_id, links)
+
+
+async def _apply_partition(
+    items: list[SyncEmployeePayload],
+    state: _SyncState,
+) -> None:
+    """Применяет одну партицию в отдельной сессии и фиксирует её.
+
+    Партиция коммитится сразу, не дожидаясь соседних: при общей
+    строке (например, одна почта у двух записей) партиции ждут
+    блокировки друг друга, и отложенный коммит их бы заклинил.
+    """
+    async with async_session_maker() as part_session:
+        try:
+            await _apply_items(part_session, items, state)
+            await part_session.commit()
+        except BaseException:
+            await part_session.rollback()
+            raise
+
+
+async def _ensure_departments(
+    batch: list[SyncEmployeePayload],
+    state: _SyncState,
+) -> None:
+    """Досоздаёт департаменты, которых нет в кэше, до применения пачки.
+
+    Выполняется в отдельной короткой транзакции, чтобы новые департаменты
+    сразу были видны и партициям применения.
+    """
+    pairs = {
+        (item.company, item.department)
+        for item in batch
+        if item.company and item.department
+    }
+    pairs -= state.departments.keys()
+    pairs -= state.unresolved_departments
+    if not pairs:
+        return
+
+    async with async_session_maker() as ou_session:
+        resolved, created = await create_missing_departments(ou_session, pairs)
+        await ou_session.commit()
+
+    state.departments.update(resolved)
+    state.unresolved_departments.update(pairs - resolved.keys())
+    if created:
+        state.summary.inc("org_units_created", created)
+        logger.info(
+            "[SYNC] job %s: departments created: %d",
+            state.job_id,
+            created,
+        )
+
+
+async def _apply_batch(
+    session: AsyncSession,
+    batch: list[SyncEmployeePayload],
+    state: _SyncState,
+) -> None:
+    """Применяет пачку записей.
+
+    При SYNC_APPLY_PARTITIONS > 1 пачка делится на партиции, которые
+    применяются одновременно в отдельных сессиях; иначе — в основной.
+    Партиции фиксируются сами, поэтому checkpoint после такой пачки
+    сохраняется сразу (см. _apply_stage).
+    """
+    if state.apply_partitions == 1:
+        await _apply_items(session, batch, state)
+        return
 
-            subordinate_id = (
-                by_external.get(item.external_ref) if item.external_ref else None
+    await _run_stages(
+        *(
+            _apply_partition(part, state)
+            for part in _partition_batch(batch, state.apply_partitions)
+        ),
+    )
+
+
+def _skip_checkpointed(
+    batch: list[SyncEmployeePayload],
+    state: _SyncState,
+) -> tuple[list[SyncEmployeePayload], list[SyncEmployeePayload]]:
+    """Отделяет записи, уже применённые прерванным запуском.
+
+    Возвращает (пропущенные, остальные). Пропущенные записи не
+    применяются, но ссылки на руководителей по ним пишутся заново (см.
+    _apply_stage): связи проставляются только в конце запуска. Если ключ
+    записи на позиции checkpoint не совпал с сохранённым, порядок
+    источника изменился и пропуск небезопасен.
+    """
+    if state.position >= state.resume_from:
+        return [], batch
+
+    skip = min(len(batch), state.resume_from - state.position)
+    skipped, rest = batch[:skip], batch[skip:]
+
+    state.position += skip
+    if state.position == state.resume_from:
+        state.last_key = _sync_key(skipped[-1])
+        if state.last_key != state.resume_key:
+            raise _CheckpointMismatch(
+                f"expected {state.resume_key!r} at position "
+                f"{state.resume_from}, got {state.last_key!r}",
             )
-            if subordinate_id:
-                subordinate = await session.get(Employee, subordinate_id)
-            elif item.external_ref:
-                subordinate = await get_employee_by_external_ref(
-                    session,
-                    item.external_ref,
-                )
-            else:
-                subordinate = None
+    return skipped, rest
 
-            if not subordinate:
-                continue
 
-            manager = await get_employee_by_external_ref(session, mgr_ext)
-            if not manager:
+async def _record_dns(
+    session: AsyncSession,
+    batch: list[SyncEmployeePayload],
+    state: _SyncState,
+) -> set[str]:
+    """Пишет DN записей пачки и возвращает DN, впервые встреченные в запуске.
+
+    Повторы DN (пересекающиеся базы поиска AD) отсекает первичный ключ
+    sync_dn_ref, поэтому источнику не нужно помнить все DN выгрузки.
+    """
+    refs: dict[str, str] = {}
+    for item in batch:
+        if item.dn and item.external_ref:
+            refs.setdefault(item.dn.lower(), item.external_ref)
+    return await record_dn_refs(session, state.job_id, refs)
+
+
+def _drop_repeated_dns(
+    items: list[SyncEmployeePayload],
+    fresh_dns: set[str],
+) -> list[SyncEmployeePayload]:
+    """Оставляет записи без DN и первые записи с DN из fresh_dns."""
+    fresh = set(fresh_dns)
+    kept: list[SyncEmployeePayload] = []
+    for item in items:
+        if item.dn and item.external_ref:
+            dn = item.dn.lower()
+            if dn not in fresh:
                 continue
+            fresh.discard(dn)
+        kept.append(item)
+    return kept
+
 
-            if subordinate.manager_id != manager.id:
-                subordinate.manager_id = manager.id
+def _seen_refs(batch: list[SyncEmployeePayload]) -> set[str]:
+    """Ключи, по которым сотрудник считается присутствующим в источнике.
+
+    Берутся и external_ref, и e-mail: сотрудник мог быть сопоставлен по
+    почте и иметь в БД другой external_ref.
+    """
+    refs: set[str] = set()
+    for item in batch:
+        if item.external_ref:
+            refs.add(item.external_ref)
+        if item.email:
+            refs.add(item.email.lower())
+    return refs
+
+
+async def _commit_chunk(session: AsyncSession, state: _SyncState) -> None:
+    """Фиксирует применённые записи и сохраняет checkpoint в SyncJob.
+
+    После коммита сессия очищается (кроме самой SyncJob), чтобы identity
+    map не росла вместе со справочником.
+    """
+    job = state.job
+    job.checkpoint = {
+        "processed": state.position,
+        "last_key": state.last_key,
+        "summary": dict(state.summary),
+        "saved_at": datetime.now(timezone.utc).isoformat(),
+    }
+    job.summary = dict(state.summary)
+    await session.commit()
+
+    state.committed_summary = dict(state.summary)
+    session.expunge_all()
+    session.add(job)
+    state.uncommitted = 0
+
+
+async def _fetch_stage(
+    source: AsyncIterator[list[Any]],
+    out: asyncio.Queue[Any],
+) -> None:
+    """Стадия 1: читает сырые пачки из источника в очередь."""
+    async for raw_batch in source:
+        await out.put(raw_batch)
+    await out.put(_END_OF_STREAM)
+
+
+async def _normalize_stage(
+    inp: asyncio.Queue[Any],
+    out: asyncio.Queue[Any],
+    executor: Executor | None,
+    workers: int,
+) -> None:
+    """Стадия 2: нормализует пачки, сохраняя порядок источника.
+
+    С пулом процессов одновременно в работе до workers пачек; результаты
+    отдаются дальше строго в порядке поступления.
+    """
+    loop = asyncio.get_running_loop()
+    in_flight: deque[asyncio.Future[list[SyncEmployeePayload]]] = deque()
+
+    while True:
+        raw_batch = await inp.get()
+        if raw_batch is _END_OF_STREAM:
+            break
+
+        if executor is None:
+            await out.put(normalize_sync_batch(raw_batch))
+            continue
+
+        in_flight.append(
+            loop.run_in_executor(executor, normalize_sync_batch, raw_batch),
+        )
+        if len(in_flight) >= workers:
+            await out.put(await in_flight.popleft())
+
+    while in_flight:
+        await out.put(await in_flight.popleft())
+    await out.put(_END_OF_STREAM)
+
+
+async def _apply_stage(
+    session: AsyncSession,
+    inp: asyncio.Queue[Any],
+    state: _SyncState,
+) -> None:
+    """Стадия 3: применяет нормализованные пачки к БД.
+
+    Каждые SYNC_CHUNK_SIZE записей изменения фиксируются вместе с
+    checkpoint, поэтому сбой теряет не больше одного чанка.
+
+    Партиции коммитят свои сессии раньше основной, и сбой между их
+    коммитами и коммитом checkpoint оставляет применённые записи за
+    checkpoint. Поэтому в этом режиме checkpoint сохраняется после
+    каждой пачки — когда все партиции уже зафиксированы, — и при
+    продолжении повторно применяется не больше одной пачки. Повтор
+    безопасен: сотрудник находится по зарегистрированному
+    идентификатору или почте и не меняется, реестр идентификаторов и
+    ключи сверки пишутся через ON CONFLICT DO NOTHING, DN повторной
+    пачки не зафиксированы вместе с её checkpoint и повтором не
+    считаются. Счётчики сводки за эту пачку при этом теряются.
+
+    Позиция checkpoint считается по всем записям источника, включая
+    отброшенные повторы DN.
+    """
+    while True:
+        batch = await inp.get()
+        if batch is _END_OF_STREAM:
+            break
+
+        # служебные строки пишутся и для пропущенных записей: строки
+        # прерванного запуска могли не сохраниться (таблицы UNLOGGED)
+        if state.track_seen:
+            await record_seen_refs(session, state.job_id, _seen_refs(batch))
+        fresh_dns = await _record_dns(session, batch, state)
+
+        skipped, batch = _skip_checkpointed(batch, state)
+        await record_manager_links(
+            session,
+            state.job_id,
+            {
+                _sync_key(item): (None, item.external_ref, _manager_ref(item))
+                for item in skipped
+                if item.external_ref and _manager_ref(item)
+            },
+        )
+        if not batch:
+            continue
+
+        fresh_dns -= {item.dn.lower() for item in skipped if item.dn}
+        applied = _drop_repeated_dns(batch, fresh_dns)
+        if applied:
+            if state.create_org_units:
+                await _ensure_departments(applied, state)
+            await _apply_batch(session, applied, state)
+        state.position += len(batch)
+        state.last_key = _sync_key(batch[-1])
+        state.uncommitted += len(batch)
+
+        if state.uncommitted >= state.chunk_size or state.apply_partitions > 1:
+            await _commit_chunk(session, state)
+
+    if state.uncommitted:
+        await _commit_chunk(session, state)
+
+
+async def _run_stages(*stages: Any) -> None:
+    """Запускает стадии конвейера и ждёт их завершения.
+
+    Ошибка любой стадии отменяет остальные и пробрасывается наружу как есть.
+    """
+    tasks = [asyncio.create_task(stage) for stage in stages]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def _run_pipeline(
+    session: AsyncSession,
+    state: _SyncState,
+    source: SyncSource,
+) -> None:
+    """Прогоняет данные источника через конвейер fetch → normalize → apply.
+
+    Стадии связаны очередями ёмкостью SYNC_QUEUE_SIZE: пока применяется
+    пачка N, из AD уже читается пачка N+1, но выгрузка не может уйти
+    вперёд больше чем на размер очередей (backpressure).
+    """
+    queue_size = max(1, settings.SYNC_QUEUE_SIZE)
+    raw_queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size)
+    payload_queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size)
+
+    workers = max(0, settings.SYNC_NORMALIZE_WORKERS)
+    executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+
+    raw_batches = source.raw_batches(max(1, settings.SYNC_BATCH_SIZE))
+
+    try:
+        await _run_stages(
+            _fetch_stage(raw_batches, raw_queue),
+            _normalize_stage(raw_queue, payload_queue, executor, workers),
+            _apply_stage(session, payload_queue, state),
+        )
+    finally:
+        await raw_batches.aclose()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_resumable_pipeline(
+    session: AsyncSession,
+    state: _SyncState,
+    source: SyncSource,
+) -> None:
+    """Прогоняет конвейер с учётом checkpoint прерванного запуска.
+
+    Если источник отдал записи в другом порядке или их стало меньше, чем
+    было обработано, выполняется полный проход: применение идемпотентно,
+    а до расхождения ничего, кроме пропуска, сделано не было.
+    """
+    while True:
+        try:
+            await _run_pipeline(session, state, source)
+        except _CheckpointMismatch as exc:
+            reason = str(exc)
+        else:
+            if state.position >= state.resume_from:
+                return
+            reason = f"source ended at {state.position} of {state.resume_from}"
+
+        logger.warning(
+            "[SYNC] job %s: checkpoint mismatch (%s), full pass",
+            state.job_id,
+            reason,
+        )
+        # DN пропущенных записей иначе сочлись бы повторами
+        await clear_dn_refs(session, state.job_id)
+        state.restart()
+
+
+async def _lock_job(conn: AsyncConnection, job_id: int) -> bool:
+    """Пытается взять advisory-блокировку запуска на соединении conn.
+
+    Блокировка сессионная: она переживает коммиты чанков и держится до
+    _unlock_jobs или закрытия соединения, то есть снимается и при падении
+    процесса. Транзакция соединения сразу закрывается, чтобы оно не
+    висело idle in transaction весь прогон.
+    """
+    locked = await conn.scalar(
+        select(func.pg_try_advisory_lock(_JOB_LOCK_CLASS, job_id)),
+    )
+    await conn.commit()
+    return bool(locked)
+
+
+async def _unlock_jobs(conn: AsyncConnection) -> None:
+    """Снимает блокировки запусков и закрывает соединение.
+
+    Если снять не удалось, соединение не возвращается в пул: блокировку
+    снимет сервер при его закрытии.
+    """
+    try:
+        await conn.execute(select(func.pg_advisory_unlock_all()))
+        await conn.commit()
+    except BaseException:
+        await conn.invalidate()
+        raise
+    finally:
+        await conn.close()
+
+
+def _last_activity(job: SyncJob) -> datetime:
+    """Время последнего checkpoint запуска (или его старта)."""
+    saved_at = (job.checkpoint or {}).get("saved_at")
+    if saved_at:
+        return datetime.fromisoformat(saved_at)
+    return job.started_at
+
+
+async def _load_resumable_job(session: AsyncSession, job_id: int) -> SyncJob:
+    """Загружает прерванный запуск, который можно продолжить.
+
+    Вызывается под блокировкой запуска (см. _lock_job), поэтому статус
+    running означает, что выполнявший его процесс завершился, не успев
+    обновить статус. Такой запуск продолжается, только если его
+    checkpoint не обновлялся SYNC_RESUME_STALE_MINUTES: запуски, начатые
+    до появления блокировки, по ней не видны.
+    """
+    job = await session.get(SyncJob, job_id)
+    if job is None:
+        raise SyncResumeError(f"Sync job {job_id} not found")
+    if job.status not in ("running", "error", "cancelled"):
+        raise SyncResumeError(
+            f"Sync job {job_id} is {job.status} and cannot be resumed",
+        )
+    if job.status == "running":
+        stale_after = timedelta(minutes=settings.SYNC_RESUME_STALE_MINUTES)
+        if datetime.now(timezone.utc) - _last_activity(job) < stale_after:
+            raise SyncJobBusyError(f"Sync job {job_id} is still running")
+    if not job.checkpoint:
+        raise SyncResumeError(f"Sync job {job_id} has no checkpoint")
+    return job
+
+
+async def _apply_fuzzy_pending(session: AsyncSession, state: _SyncState) -> None:
+    """Применяет отложенные записи с нечётким сопоставлением.
+
+    Выполняется после прохода по всему источнику, поэтому кандидаты
+    исключают всех сотрудников, сопоставленных в запуске по ключам, а не
+    только в той же пачке. Записи читаются из sync_fuzzy_pending порциями
+    по SYNC_CHUNK_SIZE; порция применяется, удаляется из таблицы и
+    фиксируется вместе со сводкой одним коммитом, так что продолжение
+    после сбоя начинает с необработанных записей.
+    """
+    while True:
+        rows = await load_fuzzy_pending(
+            session,
+            state.job_id,
+            limit=state.chunk_size,
+        )
+        if not rows:
+            return
+
+        items = [SyncEmployeePayload.model_validate(payload) for _, payload in rows]
+        await _apply_items(session, items, state, fuzzy_pass=True)
+        await delete_fuzzy_pending(session, state.job_id, [key for key, _ in rows])
+        await _commit_chunk(session, state)
+
+
+async def _reconcile_missing(session: AsyncSession, state: _SyncState) -> None:
+    """Увольняет активных сотрудников, которых нет в источнике.
+
+    Пропавшие находятся одним anti-join по ключам запуска. Если их доля
+    превышает SYNC_MAX_ARCHIVE_PERCENT, сверка не выполняется: скорее
+    всего, источник вернул неполный ответ.
+    """
+    summary = state.summary
+    missing, total = await count_missing_employees(session, state.job_id)
+    summary["missing"] = missing
+    if not missing:
+        return
+
+    percent = missing * 100 / total
+    if percent > settings.SYNC_MAX_ARCHIVE_PERCENT:
+        reason = (
+            f"{missing} of {total} active employees ({percent:.1f}%) are "
+            f"missing from the source, limit is "
+            f"{settings.SYNC_MAX_ARCHIVE_PERCENT:g}%"
+        )
+        logger.warning("[SYNC] job %s: reconcile skipped: %s", state.job_id, reason)
+        summary["reconcile_error"] = reason
+        summary.inc("errors")
+        return
+
+    archived = await archive_missing_employees(
+        session,
+        state.job_id,
+        message="Missing from sync source",
+    )
+    summary.inc("archived", archived)
+    logger.info("[SYNC] job %s: archived missing: %d", state.job_id, archived)
+
+
+async def _link_managers(session: AsyncSession, state: _SyncState) -> None:
+    """Вторая фаза — проставляет руководителей после применения всех пачек.
+
+    Ссылки копятся за весь прогон в sync_manager_link, а не в памяти, и
+    разрешаются одним UPDATE ... FROM; ссылки в виде DN (постраничная
+    выгрузка AD) — через sync_dn_ref, то есть и между OU.
+    """
+    linked = await link_managers_for_job(
+        session,
+        state.job_id,
+        source=state.identity_source,
+    )
+    logger.info("[SYNC] job %s: manager links updated: %d", state.job_id, linked)
+
+
+async def run_employee_sync(
+    session: AsyncSession,
+    *,
+    trigger: str = "manual",
+    apply_partitions: int | None = None,
+    resume_job_id: int | None = None,
+    source: SyncSource | None = None,
+    reconcile: bool | None = None,
+) -> dict[str, Any]:
+    """Запускает полную синхронизацию сотрудников.
+
+    Источник данных по умолчанию выбирается настройкой SYNC_SOURCE (см.
+    app.services.sync.sources): тестовый файл, CSV-выгрузка HR или AD.
+
+    Данные идут через конвейер fetch → normalize → apply (см.
+    _run_pipeline) и фиксируются чанками по SYNC_CHUNK_SIZE записей с
+    сохранением checkpoint в SyncJob. После всех пачек выполняется сверка
+    (если включена) и проставляются руководители.
+
+    Args:
+        session: Основная сессия (запись SyncJob, связи с руководителями).
+        trigger: Источник запуска: manual / scheduled.
+        apply_partitions: Число параллельных сессий применения; по
+            умолчанию SYNC_APPLY_PARTITIONS.
+        resume_job_id: Продолжить прерванный запуск с его checkpoint
+            вместо создания нового.
+        source: Источник данных вместо выбранного настройками.
+        reconcile: Увольнять сотрудников, которых нет в источнике; по
+            умолчанию SYNC_RECONCILE_MISSING. Только для полных выгрузок.
+
+    Запуск на всё время выполнения держит advisory-блокировку по своему
+    id на отдельном соединении: продолжить его параллельно нельзя.
+
+    Raises:
+        SyncJobBusyError: Запуск resume_job_id ещё выполняется.
+        SyncResumeError: Запуск resume_job_id не найден или уже завершён.
+    """
+    lock_conn = await engine.connect()
+    try:
+        return await _run_locked_sync(
+            session,
+            lock_conn,
+            trigger=trigger,
+            apply_partitions=apply_partitions,
+            resume_job_id=resume_job_id,
+            source=source,
+            reconcile=reconcile,
+        )
+    finally:
+        await _unlock_jobs(lock_conn)
+
+
+async def _run_locked_sync(
+    session: AsyncSession,
+    lock_conn: AsyncConnection,
+    *,
+    trigger: str,
+    apply_partitions: int | None,
+    resume_job_id: int | None,
+    source: SyncSource | None,
+    reconcile: bool | None,
+) -> dict[str, Any]:
+    """Выполняет run_employee_sync; блокировки запуска берутся на lock_conn."""
+    if resume_job_id is not None:
+        if not await _lock_job(lock_conn, resume_job_id):
+            raise SyncJobBusyError(f"Sync job {resume_job_id} is running")
+        job = await _load_resumable_job(session, resume_job_id)
+        checkpoint = job.checkpoint
+        # сводка на момент checkpoint (ошибка самого прерывания пишется
+        # только в job.summary и сюда не попадает)
+        summary = SyncSummary(checkpoint.get("summary") or {})
+        for key in ("created", "updated", "archived", "errors"):
+            summary.setdefault(key, 0)
+        job.status = "running"
+        job.finished_at = None
+    else:
+        job = SyncJob(
+            trigger=trigger,
+            status="running",
+            started_at=datetime.now(timezone.utc),
+            summary=None,
+        )
+        session.add(job)
+        checkpoint = {}
+        summary = SyncSummary(created=0, updated=0, archived=0, errors=0)
+
+    # запись job фиксируется сразу: чанки и партиции ссылаются на неё;
+    # вместе с ней — партиция журнала для её job_id
+    await session.flush()
+    if resume_job_id is None:
+        # блокировка берётся до коммита: запуск ещё никому не виден
+        await _lock_job(lock_conn, job.id)
+    await ensure_sync_record_partition(
+        session,
+        job.id,
+        width=settings.SYNC_RECORD_PARTITION_JOBS,
+    )
+    await session.commit()
+
+    partitions = (
+        settings.SYNC_APPLY_PARTITIONS
+        if apply_partitions is None
+        else apply_partitions
+    )
+    if source is None:
+        source = get_sync_source()
+    state = _SyncState(
+        job,
+        summary,
+        apply_partitions=partitions,
+        chunk_size=settings.SYNC_CHUNK_SIZE,
+        reconcile=(
+            settings.SYNC_RECONCILE_MISSING if reconcile is None else reconcile
+        ),
+        create_org_units=settings.SYNC_CREATE_ORG_UNITS,
+        identity_source=source.identity_source,
+        fuzzy_mode=settings.SYNC_FUZZY_MATCH_MODE,
+        journal_mode=settings.SYNC_JOURNAL_MODE,
+    )
+    summary["journal_mode"] = state.journal_mode
+    state.departments = await load_department_map(session)
+    state.resume_from = int(checkpoint.get("processed", 0))
+    state.resume_key = checkpoint.get("last_key")
+    if state.resume_from:
+        logger.info(
+            "[SYNC] job %s: resuming after %d records",
+            job.id,
+            state.resume_from,
+        )
+
+    try:
+        await _run_resumable_pipeline(session, state, source)
+        if source.timings:
+            summary["source_timings"] = list(source.timings)
+
+        if state.fuzzy_mode != "off":
+            await _apply_fuzzy_pending(session, state)
+
+        if state.reconcile:
+            await _reconcile_missing(session, state)
+        await _link_managers(session, state)
+        await clear_job_refs(session, job.id)
 
         errors = summary.get("errors", 0)
         successes = (
@@ -242,16 +1168,72 @@ async def run_employee_sync(
 
         job.finished_at = datetime.now(timezone.utc)
         job.summary = dict(summary)
+        job.checkpoint = None
+
+        superseded = await supersede_interrupted_jobs(session, job.id)
+        if superseded:
+            logger.info(
+                "[SYNC] job %s: interrupted jobs superseded: %d",
+                job.id,
+                superseded,
+            )
 
         await session.commit()
+        await _drop_expired_journal(session)
         return dict(summary)
 
+    except asyncio.CancelledError:
+        await _finish_interrupted_job(session, state, "cancelled", None)
+        raise
+
+    except Exception as exc:  # noqa: BLE001
+        await _finish_interrupted_job(session, state, "error", str(exc))
+        raise
+
+
+async def _drop_expired_journal(session: AsyncSession) -> None:
+    """Удаляет устаревшие партиции журнала (SYNC_RECORD_RETENTION_DAYS).
+
+    Ошибка очистки не влияет на результат уже завершённого запуска.
+    """
+    if settings.SYNC_RECORD_RETENTION_DAYS <= 0:
+        return
+
+    try:
+        await drop_expired_sync_record_partitions(
+            session,
+            retention_days=settings.SYNC_RECORD_RETENTION_DAYS,
+        )
+        await session.commit()
     except Exception as exc:  # noqa: BLE001
         await session.rollback()
-        job.status = "error"
-        job.finished_at = datetime.now(timezone.utc)
+        logger.warning("[SYNC] journal retention failed: %s", exc)
+
+
+async def _finish_interrupted_job(
+    session: AsyncSession,
+    state: _SyncState,
+    status: str,
+    error: str | None,
+) -> None:
+    """Помечает прерванный запуск.
+
+    Зафиксированные чанки и checkpoint остаются: запуск можно продолжить
+    через run_employee_sync(resume_job_id=...). Сводка берётся на момент
+    последнего коммита, чтобы откатанный чанк не посчитался дважды.
+    """
+    await session.rollback()
+
+    job = await session.get(SyncJob, state.job_id)
+    if job is None:
+        return
+
+    summary = SyncSummary(state.committed_summary)
+    if error is not None:
         summary.inc("errors")
-        job.summary = dict(summary) | {"error": str(exc)}
-        session.add(job)
-        await session.commit()
-        raise
+        summary["error"] = error
+
+    job.status = status
+    job.finished_at = datetime.now(timezone.utc)
+    job.summary = dict(summary)
+    await session.commit()
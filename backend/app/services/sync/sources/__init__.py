@@ -0,0 +1,61 @@
+"""Источники данных для синхронизации сотрудников.
+
+Источник выбирается настройкой SYNC_SOURCE: file (JSON/NDJSON), csv
+(выгрузка HR) или ldap (AD). Пустое значение сохраняет старое поведение:
+тестовый файл при SYNC_USE_TEST_FILE, иначе AD.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+
+from app.core.config import settings
+from app.services.sync.sources.base import SyncSource
+from app.services.sync.sources.csv_export import CsvFileSource
+from app.services.sync.sources.file import JsonFileSource
+from app.services.sync.sources.ldap import LdapSource
+from app.services.sync.sources.memory import InMemorySource
+
+__all__ = [
+    "CsvFileSource",
+    "InMemorySource",
+    "JsonFileSource",
+    "LdapSource",
+    "SyncSource",
+    "get_sync_source",
+    "register_sync_source",
+]
+
+_SOURCE_FACTORIES: dict[str, Callable[[], SyncSource]] = {
+    "file": lambda: JsonFileSource(settings.SYNC_INGEST_FILE_PATH),
+    "csv": lambda: CsvFileSource(
+        settings.SYNC_INGEST_FILE_PATH,
+        delimiter=settings.SYNC_CSV_DELIMITER,
+        encoding=settings.SYNC_CSV_ENCODING,
+    ),
+    "ldap": LdapSource,
+}
+
+
+def register_sync_source(name: str, factory: Callable[[], SyncSource]) -> None:
+    """Регистрирует фабрику источника под именем для SYNC_SOURCE."""
+    _SOURCE_FACTORIES[name.strip().lower()] = factory
+
+
+def get_sync_source(name: str | None = None) -> SyncSource:
+    """Создаёт источник по имени (по умолчанию — из настроек).
+
+    Raises:
+        ValueError: Источник с таким именем не зарегистрирован.
+    """
+    key = (name if name is not None else settings.SYNC_SOURCE).strip().lower()
+    if not key:
+        key = "file" if settings.SYNC_USE_TEST_FILE else "ldap"
+
+    factory = _SOURCE_FACTORIES.get(key)
+    if factory is None:
+        raise ValueError(
+            f"Unknown sync source {key!r}; "
+            f"available: {', '.join(sorted(_SOURCE_FACTORIES))}",
+        )
+    return factory()
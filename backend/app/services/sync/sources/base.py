@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterable, Iterator
+from typing import Any, TypeVar
+
+from app.schemas.sync import SyncEmployeePayload
+from app.services.sync.preprocessor import normalize_sync_batch
+
+T = TypeVar("T")
+
+
+class SyncSource(ABC):
+    """Источник данных для синхронизации сотрудников.
+
+    Источник отдаёт записи пачками и не держит весь справочник в памяти.
+    Сырые пачки (raw_batches) — это dict в формате тестового JSON-файла;
+    их нормализует normalize_sync_batch(), в том числе в пуле процессов.
+    Чтобы подключить новый источник, достаточно реализовать raw_batches()
+    и зарегистрировать фабрику (см. register_sync_source).
+    """
+
+    #: Имя источника в настройке SYNC_SOURCE.
+    name: str = ""
+
+    #: Внешняя система, в которой выданы external_ref записей
+    #: (employee_identity.source). Файловые выгрузки в формате AD — "ad".
+    identity_source: str = "ad"
+
+    def __init__(self) -> None:
+        # статистика выгрузки по частям источника (например, OU в AD)
+        self.timings: list[dict[str, Any]] = []
+
+    @abstractmethod
+    def raw_batches(self, batch_size: int) -> AsyncIterator[list[dict[str, Any]]]:
+        """Отдаёт сырые записи сотрудников пачками не больше batch_size."""
+
+    async def batches(
+        self,
+        batch_size: int,
+    ) -> AsyncIterator[list[SyncEmployeePayload]]:
+        """Отдаёт нормализованные пачки SyncEmployeePayload."""
+        async for raw_batch in self.raw_batches(batch_size):
+            yield normalize_sync_batch(raw_batch)
+
+
+def chunked(
+    items: Iterable[dict[str, Any]],
+    size: int,
+) -> Iterator[list[dict[str, Any]]]:
+    """Режет поток записей на пачки по size штук."""
+    batch: list[dict[str, Any]] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+_DONE = object()
+
+
+async def iter_in_thread(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """Проходит по блокирующему итератору (чтение файла) в рабочем потоке.
+
+    Каждый шаг выполняется через asyncio.to_thread, поэтому чтение и
+    разбор файла не блокируют event loop.
+    """
+    try:
+        while True:
+            item = await asyncio.to_thread(next, iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import csv
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Any
+
+from app.services.sync.sources.base import SyncSource, chunked, iter_in_thread
+
+# Заголовки колонок выгрузки HR → поля сырой записи сотрудника.
+# Колонки, названные как поля SyncEmployeePayload, распознаются и так.
+CSV_COLUMN_ALIASES: dict[str, str] = {
+    "табельный номер": "external_ref",
+    "e-mail": "email",
+    "почта": "email",
+    "фамилия": "last_name",
+    "имя": "first_name",
+    "отчество": "middle_name",
+    "должность": "title",
+    "юрлицо": "company",
+    "юридическое лицо": "company",
+    "компания": "company",
+    "подразделение": "department",
+    "отдел": "department",
+    "табельный номер руководителя": "manager_external_ref",
+    "заблокирован": "is_blocked_from_ad",
+    "уволен": "is_in_blocked_ou",
+}
+
+_PAYLOAD_FIELDS = frozenset(
+    {
+        "external_ref",
+        "email",
+        "first_name",
+        "last_name",
+        "middle_name",
+        "title",
+        "company",
+        "department",
+        "manager_external_ref",
+        "is_blocked_from_ad",
+        "is_in_blocked_ou",
+    },
+)
+
+
+def _map_header(header: str) -> str | None:
+    """Возвращает поле записи для колонки CSV или None, если колонка лишняя."""
+    key = header.strip().lower()
+    if key in _PAYLOAD_FIELDS:
+        return key
+    return CSV_COLUMN_ALIASES.get(key)
+
+
+class CsvFileSource(SyncSource):
+    """Выгрузка сотрудников из CSV-файла HR-системы.
+
+    Первая строка — заголовки; неизвестные колонки игнорируются. Пустые
+    ячейки считаются отсутствующими значениями.
+    """
+
+    name = "csv"
+    identity_source = "hr"
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        delimiter: str = ";",
+        encoding: str = "utf-8-sig",
+    ) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.delimiter = delimiter
+        self.encoding = encoding
+
+    def _iter_items(self) -> Iterator[dict[str, Any]]:
+        if not self.path.exists():
+            raise RuntimeError(f"CSV-файл для синхронизации не найден: {self.path}")
+
+        with self.path.open("r", encoding=self.encoding, newline="") as fh:
+            reader = csv.reader(fh, delimiter=self.delimiter)
+            header = next(reader, None)
+            if header is None:
+                return
+
+            columns = [_map_header(name) for name in header]
+            if "email" not in columns:
+                raise ValueError(
+                    f"В CSV-файле {self.path} нет колонки с e-mail "
+                    f"(заголовки: {', '.join(header)}).",
+                )
+
+            for row in reader:
+                if not any(cell.strip() for cell in row):
+                    continue
+                item: dict[str, Any] = {}
+                for field, cell in zip(columns, row):
+                    if field is not None and cell.strip():
+                        item[field] = cell
+                yield item
+
+    async def raw_batches(
+        self,
+        batch_size: int,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Читает CSV пачками в рабочем потоке."""
+        async for batch in iter_in_thread(chunked(self._iter_items(), batch_size)):
+            yield batch
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+from typing import Any, TextIO
+
+from app.services.sync.sources.base import SyncSource, chunked, iter_in_thread
+
+# Расширения файлов, которые читаются как NDJSON (один объект на строку)
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+class _JsonArrayReader:
+    """Потоковое чтение JSON-массива без загрузки файла целиком.
+
+    Поддерживает оба формата тестового файла: list[dict] и
+    {"items": [...]}. Элементы массива разбираются по одному, в памяти
+    держится только текущий кусок файла.
+    """
+
+    def __init__(self, fh: TextIO, chunk_size: int = 1 << 16) -> None:
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Дочитывает следующий кусок файла; False — файл закончился."""
+        if self._eof:
+            return False
+        chunk = self._fh.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Возвращает следующий значащий символ ('' — конец файла)."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(
+                f"Некорректный файл синхронизации: ожидается '{char}', "
+                f"получено '{found or 'EOF'}'.",
+            )
+        self._pos += 1
+
+    def _value(self) -> Any:
+        """Разбирает очередное JSON-значение, дочитывая файл при нужде."""
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # значение могло оборваться на границе куска (например, число)
+            if end == len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def _seek_items(self) -> None:
+        """Пропускает ключи объекта-обёртки до ключа 'items'."""
+        self._expect("{")
+        while self._peek() != "}":
+            key = self._value()
+            self._expect(":")
+            if key == "items":
+                return
+            self._value()
+            if self._peek() == ",":
+                self._pos += 1
+
+        raise ValueError(
+            "Некорректный файл синхронизации: dict-payload должен содержать "
+            "ключ 'items' со списком сотрудников.",
+        )
+
+    def items(self) -> Iterator[Any]:
+        """Отдаёт элементы массива сотрудников по одному."""
+        head = self._peek()
+        if head == "{":
+            self._seek_items()
+        elif head != "[":
+            raise ValueError(
+                "Некорректный файл синхронизации: ожидается JSON-массив "
+                "сотрудников (list[dict]) или объект с ключом 'items'.",
+            )
+
+        self._expect("[")
+        if self._peek() == "]":
+            return
+
+        while True:
+            yield self._value()
+            separator = self._peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(
+                    "Некорректный файл синхронизации: ожидается ',' или ']' "
+                    "между элементами массива.",
+                )
+
+
+def _iter_ndjson(fh: TextIO) -> Iterator[Any]:
+    """Отдаёт объекты NDJSON-файла, пропуская пустые строки."""
+    for line in fh:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+class JsonFileSource(SyncSource):
+    """Выгрузка сотрудников из JSON- или NDJSON-файла.
+
+    Формат определяется по расширению: .ndjson/.jsonl — один объект на
+    строку, иначе JSON-массив (или объект с ключом 'items').
+    """
+
+    name = "file"
+
+    def __init__(self, path: str | Path) -> None:
+        super().__init__()
+        self.path = Path(path)
+
+    def _iter_items(self) -> Iterator[dict[str, Any]]:
+        if not self.path.exists():
+            raise RuntimeError(
+                f"Файл для тестовой синхронизации не найден: {self.path}",
+            )
+
+        with self.path.open("r", encoding="utf-8") as fh:
+            if self.path.suffix.lower() in NDJSON_SUFFIXES:
+                items = _iter_ndjson(fh)
+            else:
+                items = _JsonArrayReader(fh).items()
+
+            try:
+                for item in items:
+                    if isinstance(item, dict):
+                        yield item
+            except json.JSONDecodeError as exc:
+                raise RuntimeError(
+                    f"Не удалось разобрать JSON из файла синхронизации: {exc}",
+                ) from exc
+
+    async def raw_batches(
+        self,
+        batch_size: int,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Читает файл пачками в рабочем потоке."""
+        async for batch in iter_in_thread(chunked(self._iter_items(), batch_size)):
+            yield batch
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from typing import Any
+
+from ldap3 import Connection
+from ldap3.core.exceptions import LDAPCommunicationError
+
+from app.core.config import settings
+from app.services.ldap_pool import get_ad_pool
+from app.services.sync.preprocessor import ldap_attrs_to_raw
+from app.services.sync.sources.base import SyncSource
+from app.utils.logger import logger
+
+_AD_SEARCH_FILTER = "(&(objectClass=user)(!(objectClass=computer)))"
+
+_AD_ATTRIBUTES = [
+    "objectGUID",
+    "sAMAccountName",
+    "userPrincipalName",
+    "mail",
+    "givenName",
+    "sn",
+    "displayName",
+    "title",
+    "company",
+    "department",
+    "manager",
+    "userAccountControl",
+]
+
+# OID контрола Simple Paged Results (RFC 2696)
+_PAGED_RESULTS_OID = "1.2.840.113556.1.4.319"
+
+_END_OF_STREAM = object()
+
+
+def _ad_search_bases() -> list[str]:
+    """Возвращает список баз поиска AD без пустых значений и дублей."""
+    bases = [b.strip() for b in settings.AD_SEARCH_BASES if b and b.strip()]
+    if not bases:
+        return [settings.AD_BASE_DN]
+    return list(dict.fromkeys(bases))
+
+
+def _search_ad_page(
+    conn: Connection,
+    search_base: str,
+    cookie: bytes | None,
+    page_size: int,
+) -> tuple[list[tuple[str, Any]], bytes | None]:
+    """Синхронно читает одну страницу постраничного поиска AD.
+
+    Возвращает пары (dn, attributes) и cookie следующей страницы
+    (пустой cookie — страниц больше нет).
+    """
+    conn.search(
+        search_base=search_base,
+        search_filter=_AD_SEARCH_FILTER,
+        attributes=_AD_ATTRIBUTES,
+        paged_size=page_size,
+        paged_cookie=cookie,
+    )
+    records = [
+        (str(item["dn"]), item["attributes"])
+        for item in conn.response or []
+        if item.get("type") == "searchResEntry"
+    ]
+    next_cookie = (
+        conn.result.get("controls", {})
+        .get(_PAGED_RESULTS_OID, {})
+        .get("value", {})
+        .get("cookie")
+    )
+    return records, next_cookie or None
+
+
+class LdapSource(SyncSource):
+    """Постраничная выгрузка пользователей из AD.
+
+    Базы поиска (AD_SEARCH_BASES) читаются параллельно, не более
+    AD_SEARCH_CONCURRENCY одновременно, каждая на своём подключении из
+    пула. Отдаются страницы при этом строго по порядку баз: сначала все
+    страницы первой базы, затем второй и т. д. — порядок записей между
+    запусками один и тот же, и checkpoint прерванного запуска с ним
+    совпадает. Каждая база читает вперёд не больше SYNC_QUEUE_SIZE
+    страниц, поэтому выгрузка не убегает вперёд потребителя. Записи
+    несут свой DN (dn): дубли из вложенных баз и ссылки manager между
+    разными OU разрешает уже запуск синхронизации (см.
+    app.services.sync.runner), источник их в памяти не копит.
+    """
+
+    name = "ldap"
+
+    def __init__(self, search_bases: list[str] | None = None) -> None:
+        super().__init__()
+        self.search_bases = search_bases or _ad_search_bases()
+
+    async def raw_batches(
+        self,
+        batch_size: int,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Отдаёт страницы AD как пачки сырых записей."""
+        self.timings.clear()
+        bases = self.search_bases
+        concurrency = max(1, settings.AD_SEARCH_CONCURRENCY)
+        queues: list[asyncio.Queue[Any]] = [
+            asyncio.Queue(maxsize=max(1, settings.SYNC_QUEUE_SIZE))
+            for _ in bases
+        ]
+        # база index начинает чтение, когда закончилась база index-concurrency:
+        # в работе всегда самые первые из недочитанных баз
+        finished = [asyncio.Event() for _ in bases]
+        failure: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        pool = get_ad_pool()
+
+        async def _fetch_base(index: int, search_base: str) -> None:
+            if index >= concurrency:
+                await finished[index - concurrency].wait()
+            started = time.perf_counter()
+            entries = 0
+            conn = await asyncio.to_thread(pool.acquire)
+            broken = False
+            try:
+                cookie: bytes | None = None
+                while True:
+                    records, cookie = await asyncio.to_thread(
+                        _search_ad_page,
+                        conn,
+                        search_base,
+                        cookie,
+                        batch_size,
+                    )
+                    entries += len(records)
+
+                    page = [
+                        raw
+                        for raw in (
+                            ldap_attrs_to_raw(dn, attrs) for dn, attrs in records
+                        )
+                        if raw is not None
+                    ]
+
+                    if page:
+                        await queues[index].put(page)
+                    if not cookie:
+                        break
+                await queues[index].put(_END_OF_STREAM)
+            except (LDAPCommunicationError, asyncio.CancelledError):
+                # при отмене поток ещё может читать страницу — такое
+                # подключение в пул не возвращаем
+                broken = True
+                raise
+            finally:
+                pool.release(conn, discard=broken)
+                finished[index].set()
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                "[AD SYNC] %s: %d entries in %.2fs",
+                search_base,
+                entries,
+                elapsed,
+            )
+            self.timings.append(
+                {
+                    "search_base": search_base,
+                    "entries": entries,
+                    "seconds": round(elapsed, 3),
+                },
+            )
+
+        async def _guarded(index: int, search_base: str) -> None:
+            # ошибка любой базы сразу будит потребителя, ждущего другую
+            try:
+                await _fetch_base(index, search_base)
+            except asyncio.CancelledError:
+                raise
+            except BaseException as exc:
+                if not failure.done():
+                    failure.set_exception(exc)
+                raise
+
+        tasks = [
+            asyncio.create_task(_guarded(index, base))
+            for index, base in enumerate(bases)
+        ]
+        try:
+            for queue in queues:
+                while True:
+                    getter = asyncio.ensure_future(queue.get())
+                    await asyncio.wait(
+                        {getter, failure},
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    if not getter.done():
+                        getter.cancel()
+                        failure.result()
+                    page = getter.result()
+                    if page is _END_OF_STREAM:
+                        break
+                    yield page
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if failure.done():
+                # исключение уже проброшено или не нужно после aclose()
+                failure.exception()
+
+
+if __name__ == "__main__":
+
+    async def _debug() -> None:
+        """Отладочный запуск: показать, что отдаёт AD."""
+        source = LdapSource()
+        total = 0
+        async for batch in source.batches(settings.SYNC_BATCH_SIZE):
+            if not total:
+                for item in batch[:10]:
+                    print(item.model_dump())
+                    print("-----")
+            total += len(batch)
+        print(f"\nTotal items: {total}")
+
+    asyncio.run(_debug())
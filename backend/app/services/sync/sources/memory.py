@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Iterable
+from typing import Any
+
+from app.services.sync.sources.base import SyncSource, chunked
+
+
+class InMemorySource(SyncSource):
+    """Источник поверх генератора записей (бенчмарки, отладка).
+
+    factory вызывается на каждый проход, поэтому источник можно прогонять
+    повторно (например, при полном проходе после сбоя checkpoint), а
+    записи создаются лениво и не копятся в памяти.
+    """
+
+    name = "memory"
+
+    def __init__(self, factory: Callable[[], Iterable[dict[str, Any]]]) -> None:
+        super().__init__()
+        self._factory = factory
+
+    async def raw_batches(
+        self,
+        batch_size: int,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Режет поток записей на пачки, уступая event loop между ними."""
+        for batch in chunked(self._factory(), batch_size):
+            yield batch
+            await asyncio.sleep(0)
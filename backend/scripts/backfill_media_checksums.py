@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+"""CLI-скрипт для заполнения метаданных и SHA-256 у старых медиа.
+
+Записи media, созданные до дедупликации, не содержат размера, MIME-типа
+и SHA-256. Скрипт читает их из хранилища (HEAD и потоковое хеширование)
+и сохраняет. Если файл совпадает с уже посчитанным, ссылки (фото
+сотрудников, заявки на модерацию) переносятся на ту запись, а дубликат
+удаляется вместе с объектом (через очередь media_deletion).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from sqlalchemy import select  # noqa: E402
+
+from app.db.session import async_session_maker  # noqa: E402
+from app.models.media import Media  # noqa: E402
+from app.services.media_service import merge_duplicate_media  # noqa: E402
+from app.services.storage_service import head_object, object_sha256  # noqa: E402
+
+
+async def main(batch_size: int) -> None:
+    hashed = merged = missing = 0
+    last_id = 0
+    async with async_session_maker() as session:
+        while True:
+            batch = (
+                await session.execute(
+                    select(Media)
+                    .where(Media.id > last_id, Media.sha256.is_(None))
+                    .order_by(Media.id)
+                    .limit(batch_size),
+                )
+            ).scalars().all()
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            for media in batch:
+                meta = await head_object(media.storage_key)
+                if meta is None:
+                    missing += 1
+                    print(f"Object is missing: media {media.id} ({media.storage_key})")
+                    continue
+                sha256 = meta.sha256 or await object_sha256(media.storage_key)
+
+                original = (
+                    await session.execute(
+                        select(Media.id).where(Media.sha256 == sha256),
+                    )
+                ).scalar_one_or_none()
+                if original is not None:
+                    await merge_duplicate_media(session, original, [media.id])
+                    merged += 1
+                    continue
+
+                media.byte_size = meta.byte_size
+                media.content_type = meta.content_type
+                media.sha256 = sha256
+                # flush сразу: следующий дубликат в пачке должен найти эту запись
+                await session.flush()
+                hashed += 1
+
+            await session.commit()
+            print(f"Hashed: {hashed}, merged duplicates: {merged}, missing: {missing}")
+
+    print(f"Done. Hashed: {hashed}, merged duplicates: {merged}, missing: {missing}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Заполнение SHA-256 и метаданных у старых медиа.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="Сколько медиа обрабатывать за одну транзакцию.",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
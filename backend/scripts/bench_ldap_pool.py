@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+"""Бенчмарк пула LDAP-подключений на mock-сервере ldap3.
+
+Сравнивает два режима на одинаковой серии поисков:
+- cold: как раньше, на каждый запрос новый Server (со схемой) + bind + unbind;
+- pooled: подключения из LdapConnectionPool без загрузки схемы.
+
+Сеть не нужна: используется стратегия MOCK_SYNC и офлайн-схема AD.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from ldap3 import MOCK_SYNC, NONE, OFFLINE_AD_2012_R2, Connection, Server
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from app.services.ldap_pool import (  # noqa: E402
+    AD_ATTRIBUTE_FORMATTERS,
+    LdapConnectionPool,
+)
+
+BIND_DN = "cn=svc-sync,ou=service,dc=udv,dc=local"
+BIND_PASSWORD = "secret"
+BASE_DN = "ou=people,dc=udv,dc=local"
+
+
+def _build_directory(users: int):
+    """Строит mock-DIT с сервисной учёткой и тестовыми пользователями.
+
+    DIT хранится на объекте Server, поэтому его можно подставить в любой
+    новый Server и не тратить время замера на наполнение каталога.
+    """
+    conn = Connection(Server("fake_ad", get_info=NONE), client_strategy=MOCK_SYNC)
+    conn.strategy.add_entry(
+        BIND_DN,
+        {"objectClass": ["user"], "userPassword": BIND_PASSWORD, "sn": "svc"},
+    )
+    for idx in range(users):
+        conn.strategy.add_entry(
+            f"cn=user{idx},{BASE_DN}",
+            {
+                "objectClass": ["user"],
+                "sn": f"Фамилия{idx}",
+                "givenName": f"Имя{idx}",
+                "mail": f"user{idx}@udv.local",
+                "company": "UDV",
+                "department": "Разработка",
+            },
+        )
+    return conn.server.dit
+
+
+def _search_one(conn: Connection, idx: int) -> None:
+    conn.search(
+        search_base=BASE_DN,
+        search_filter=f"(mail=user{idx}@udv.local)",
+        attributes=["mail", "sn", "givenName"],
+    )
+
+
+def _bench_cold(lookups: int, users: int) -> float:
+    """Каждый запрос — новый Server со схемой и новый bind."""
+    dit = _build_directory(users)
+
+    started = time.perf_counter()
+    for idx in range(lookups):
+        server = Server("fake_ad", get_info=OFFLINE_AD_2012_R2)
+        server.dit = dit
+        conn = Connection(
+            server,
+            user=BIND_DN,
+            password=BIND_PASSWORD,
+            client_strategy=MOCK_SYNC,
+        )
+        conn.bind()
+        _search_one(conn, idx % users)
+        conn.unbind()
+    return time.perf_counter() - started
+
+
+def _bench_pooled(lookups: int, users: int) -> float:
+    """Запросы идут через пул: схема не грузится, bind выполняется один раз."""
+    server = Server("fake_ad", get_info=NONE, formatter=AD_ATTRIBUTE_FORMATTERS)
+    server.dit = _build_directory(users)
+
+    pool = LdapConnectionPool(
+        lambda: server,
+        user=BIND_DN,
+        password=BIND_PASSWORD,
+        max_size=1,
+        client_strategy=MOCK_SYNC,
+    )
+
+    started = time.perf_counter()
+    for idx in range(lookups):
+        pool.run(lambda conn, i=idx: _search_one(conn, i % users))
+    elapsed = time.perf_counter() - started
+
+    pool.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    cold = _bench_cold(args.lookups, args.users)
+    pooled = _bench_pooled(args.lookups, args.users)
+
+    print(f"lookups: {args.lookups}, users in DIT: {args.users}")
+    print(f"cold   : {cold:.3f}s ({cold / args.lookups * 1000:.2f} ms/lookup)")
+    print(f"pooled : {pooled:.3f}s ({pooled / args.lookups * 1000:.2f} ms/lookup)")
+    if pooled > 0:
+        print(f"speedup: x{cold / pooled:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+"""Бенчмарк применения синхронизации: одна сессия против N партиций.
+
+Генерирует синтетический справочник (по умолчанию 50 000 сотрудников) по
+существующим в БД департаментам с ad_name и прогоняет run_employee_sync
+дважды: с apply_partitions=1 и с apply_partitions=N. Записи генерируются
+лениво через InMemorySource. Каждый прогон использует свой префикс
+e-mail/external_ref, поэтому оба создают записи с нуля. Созданные сотрудники удаляются в конце (если не задан --keep).
+
+Запускать только на dev/test-базе.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import aliased
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from app.db.session import async_session_maker  # noqa: E402
+from app.models.employee import Employee  # noqa: E402
+from app.models.org_unit import OrgUnit  # noqa: E402
+from app.services.sync.runner import run_employee_sync  # noqa: E402
+from app.services.sync.sources import InMemorySource  # noqa: E402
+
+EMAIL_DOMAIN = "bench-sync.local"
+
+
+async def _load_departments() -> list[tuple[str, str]]:
+    """Возвращает пары (company, department) из ad_name оргструктуры."""
+    Parent = aliased(OrgUnit)
+    Child = aliased(OrgUnit)
+
+    async with async_session_maker() as session:
+        res = await session.execute(
+            select(Parent.ad_name, Child.ad_name)
+            .join(Parent, Child.parent_id == Parent.id)
+            .where(
+                Parent.unit_type == "legal_entity",
+                Parent.ad_name.is_not(None),
+                Parent.is_archived.is_(False),
+                Child.unit_type == "department",
+                Child.ad_name.is_not(None),
+                Child.is_archived.is_(False),
+            ),
+        )
+        return [(company, dept) for company, dept in res.all()]
+
+
+def _iter_directory(
+    prefix: str,
+    employees: int,
+    departments: list[tuple[str, str]],
+) -> Iterator[dict[str, Any]]:
+    """Генерирует синтетический справочник с иерархией руководителей."""
+    for idx in range(employees):
+        company, department = departments[idx % len(departments)]
+        # каждый 20-й — руководитель следующих 19
+        manager_idx = idx - idx % 20
+        yield {
+            "external_ref": f"{prefix}-{idx:06d}",
+            "email": f"{prefix}.{idx:06d}@{EMAIL_DOMAIN}",
+            "first_name": f"Имя{idx}",
+            "last_name": f"Фамилия{idx}",
+            "title": "Инженер",
+            "company": company,
+            "department": department,
+            "manager_external_ref": (
+                f"{prefix}-{manager_idx:06d}" if manager_idx != idx else None
+            ),
+        }
+
+
+async def _run_once(
+    prefix: str,
+    employees: int,
+    departments: list[tuple[str, str]],
+    partitions: int,
+) -> tuple[float, dict[str, Any]]:
+    source = InMemorySource(
+        lambda: _iter_directory(prefix, employees, departments),
+    )
+
+    started = time.perf_counter()
+    async with async_session_maker() as session:
+        summary = await run_employee_sync(
+            session=session,
+            trigger="manual",
+            apply_partitions=partitions,
+            source=source,
+        )
+    return time.perf_counter() - started, summary
+
+
+async def _cleanup() -> None:
+    async with async_session_maker() as session:
+        res = await session.execute(
+            delete(Employee).where(Employee.email.like(f"%@{EMAIL_DOMAIN}")),
+        )
+        await session.commit()
+    print(f"Удалено тестовых сотрудников: {res.rowcount}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--employees", type=int, default=50_000)
+    parser.add_argument("--partitions", type=int, default=4)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+
+    departments = await _load_departments()
+    if not departments:
+        print("Нет департаментов с ad_name — сначала seed_org_structure.py")
+        return
+
+    try:
+        for partitions in (1, args.partitions):
+            elapsed, summary = await _run_once(
+                f"bench{partitions}",
+                args.employees,
+                departments,
+                partitions,
+            )
+            summary.pop("source_timings", None)
+            print(
+                f"partitions={partitions}: {elapsed:.1f}s "
+                f"({args.employees / elapsed:.0f} rows/s), summary: {summary}",
+            )
+    finally:
+        if not args.keep:
+            await _cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
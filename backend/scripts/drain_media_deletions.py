@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+"""CLI-скрипт для разового опустошения очереди удаления медиа.
+
+Удаляет из бакета объекты, поставленные в очередь media_deletion, — то
+же, что делает фоновый воркер API. Полезен, если воркер выключен
+(MEDIA_DELETION_WORKER_ENABLED=false) или для проверки на локальном
+S3 (MinIO: S3_ADDRESSING_STYLE=path).
+"""
+
+import asyncio
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from app.core.config import settings  # noqa: E402
+from app.services.media_cleanup import drain_media_deletions  # noqa: E402
+
+
+async def main() -> None:
+    deleted, postponed = await drain_media_deletions(
+        batch_size=settings.media_deletion_batch_size,
+    )
+    print(f"Deleted objects: {deleted}, postponed: {postponed}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,124 @@
+"""CLI-скрипт проверки планов поиска сотрудников.
+
+Для каждой строки поиска строится EXPLAIN первой фазы поиска (отбор
+кандидатов) и проверяется, что все ветки условия идут через индексы:
+в плане есть Bitmap Index Scan по каждому триграммному индексу и по
+idx_employee_search_tsv, а Seq Scan по employee нет. Последовательное
+чтение запрещается (enable_seqscan=off): на маленькой базе планировщик
+честно выберет его, а проверяется именно применимость индексов. Строка
+поиска должна быть избирательной: если под неё подходит заметная доля
+сотрудников (например, «разработчик» совпадает по триграммам со всеми
+такими должностями), планировщик законно выбирает другой индекс.
+
+Код возврата 1, если хотя бы один план не прошёл проверку.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from sqlalchemy.ext.asyncio import AsyncSession  # noqa: E402
+
+from app.db.session import async_session_maker  # noqa: E402
+from app.services.employee_service import (  # noqa: E402
+    search_candidates_query,
+    set_trgm_thresholds,
+)
+
+EXPECTED_INDEXES = (
+    "idx_employee_last_name_norm_trgm",
+    "idx_employee_first_name_norm_trgm",
+    "idx_employee_title_norm_trgm",
+    "idx_employee_search_text_norm_trgm",
+    "idx_employee_search_tsv",
+)
+
+DEFAULT_QUERIES = ("Иванов", "иванов разработчик", "Алёна", "backend")
+
+
+def check_plan(plan: str) -> list[str]:
+    """Возвращает список проблем плана (пустой — план в порядке)."""
+    # по имени индекса, а не столбца: search_tsv встречается и в Filter
+    problems = [
+        f"index {name} is not used"
+        for name in EXPECTED_INDEXES
+        if f"Bitmap Index Scan on {name}" not in plan
+    ]
+    if "Seq Scan on employee" in plan:
+        problems.append("sequential scan on employee")
+    return problems
+
+
+async def prepare_session(session: AsyncSession) -> None:
+    """Настраивает транзакцию сессии для проверки планов.
+
+    Пороги триграмм — как у поиска, последовательное чтение запрещено.
+    """
+    await set_trgm_thresholds(session)
+    conn = await session.connection()
+    await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+
+async def explain_search(
+    session: AsyncSession,
+    q: str,
+    *,
+    analyze: bool = False,
+) -> str:
+    """Возвращает текст EXPLAIN первой фазы поиска для строки q."""
+    conn = await session.connection()
+    compiled = search_candidates_query(q).compile(dialect=conn.dialect)
+    values = compiled.construct_params()
+    params = tuple(values[name] for name in compiled.positiontup or ())
+    options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+    res = await conn.exec_driver_sql(
+        f"EXPLAIN ({options}) {compiled.string}",
+        params,
+    )
+    return "\n".join(row[0] for row in res.all())
+
+
+async def main(queries: list[str], analyze: bool) -> int:
+    failed = 0
+    async with async_session_maker() as session:
+        await prepare_session(session)
+
+        for q in queries:
+            plan = await explain_search(session, q, analyze=analyze)
+            problems = check_plan(plan)
+            print(f"=== {q!r}: {'OK' if not problems else 'FAILED'}")
+            print(plan)
+            for problem in problems:
+                print(f"  - {problem}")
+            failed += bool(problems)
+
+        await session.rollback()
+
+    print(f"Done. Queries: {len(queries)}, failed: {failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Проверка, что поиск сотрудников использует индексы.",
+    )
+    parser.add_argument(
+        "queries",
+        nargs="*",
+        default=list(DEFAULT_QUERIES),
+        help="Строки поиска (по умолчанию — набор типовых запросов).",
+    )
+    parser.add_argument(
+        "--analyze",
+        action="store_true",
+        help="EXPLAIN ANALYZE: выполнить запросы и показать фактическое время.",
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.queries, args.analyze)))
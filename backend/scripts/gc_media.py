@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+"""CLI-скрипт сборки мусора медиа.
+
+Находит записи media, на которые не ссылается ни сотрудник (photo_id),
+ни pending-заявка на модерацию, и объекты бакета под media/ без записи в
+БД. Всё старше grace-периода (MEDIA_GC_GRACE_HOURS) удаляется: записи —
+сразу, объекты — через очередь media_deletion, которую скрипт после
+прохода опустошает. Рассчитан на запуск по расписанию (cron).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from app.core.config import settings  # noqa: E402
+from app.services.media_cleanup import drain_media_deletions  # noqa: E402
+from app.services.media_gc import collect_media_garbage  # noqa: E402
+
+
+async def main(grace_hours: float, dry_run: bool) -> None:
+    result = await collect_media_garbage(
+        grace=timedelta(hours=grace_hours),
+        dry_run=dry_run,
+    )
+    print(
+        f"Orphan media rows: {result.orphan_media}, "
+        f"orphan objects: {result.orphan_objects} "
+        f"(scanned {result.scanned_objects})",
+    )
+    if dry_run:
+        return
+
+    deleted, postponed = await drain_media_deletions(
+        batch_size=settings.media_deletion_batch_size,
+    )
+    print(f"Deleted objects: {deleted}, postponed: {postponed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сборка мусора медиа.")
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=settings.media_gc_grace_hours,
+        help="Не трогать записи и объекты моложе указанного числа часов.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Только посчитать сирот, ничего не удалять.",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.grace_hours, args.dry_run))
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+"""CLI-скрипт для построения превью уже загруженных медиа.
+
+Новые фото получают превью при завершении загрузки; скрипт догоняет
+медиа, загруженные раньше или те, для которых ресайз упал. Размеры и
+формат берутся из MEDIA_VARIANT_SIZES / MEDIA_VARIANT_FORMAT, уже
+существующие превью не пересоздаются.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from sqlalchemy import func, select  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.session import async_session_maker  # noqa: E402
+from app.models.media import Media  # noqa: E402
+from app.models.media_variant import MediaVariant  # noqa: E402
+from app.services.media_variants import try_generate_media_variants  # noqa: E402
+
+
+async def main(batch_size: int) -> None:
+    sizes = len(set(settings.media_variant_sizes))
+    complete = (
+        select(MediaVariant.media_id)
+        .where(MediaVariant.format == settings.media_variant_format)
+        .group_by(MediaVariant.media_id)
+        .having(func.count() >= sizes)
+    )
+
+    processed = 0
+    last_id = 0
+    async with async_session_maker() as session:
+        while True:
+            batch = (
+                await session.execute(
+                    select(Media)
+                    .where(Media.id > last_id, Media.id.not_in(complete))
+                    .order_by(Media.id)
+                    .limit(batch_size),
+                )
+            ).scalars().all()
+            if not batch:
+                break
+
+            for media in batch:
+                await try_generate_media_variants(session, media)
+            await session.commit()
+
+            processed += len(batch)
+            last_id = batch[-1].id
+            print(f"Processed media: {processed} (last id {last_id})")
+
+    print(f"Done, processed media: {processed}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Построение превью для уже загруженных медиа.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="Сколько медиа обрабатывать за одну транзакцию.",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
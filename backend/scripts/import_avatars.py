@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+"""CLI-скрипт для массового импорта аватаров сотрудников.
+
+Принимает ZIP-архив или каталог с фотографиями; имя файла без
+расширения — email или внешний идентификатор сотрудника
+(например, ivan.petrov@udv.ru.jpg или 000123.png). По умолчанию для
+каждого фото создаётся заявка на модерацию; с --bypass-moderation фото
+сразу ставится аватаром.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from app.db.session import async_session_maker  # noqa: E402
+from app.services.avatar_import import (  # noqa: E402
+    AvatarSource,
+    DirectoryAvatarSource,
+    ZipAvatarSource,
+    import_avatars,
+)
+
+
+async def main(path: str, bypass_moderation: bool, concurrency: int | None) -> None:
+    source: AvatarSource
+    if os.path.isdir(path):
+        source = DirectoryAvatarSource(path)
+    else:
+        source = ZipAvatarSource(path)
+
+    try:
+        async with async_session_maker() as session:
+            result = await import_avatars(
+                session,
+                source,
+                bypass_moderation=bypass_moderation,
+                concurrency=concurrency,
+            )
+            await session.commit()
+    finally:
+        if isinstance(source, ZipAvatarSource):
+            source.close()
+
+    for name in result.unmatched:
+        print(f"Employee not found: {name}")
+    for name, reason in result.failed.items():
+        print(f"Failed: {name}: {reason}")
+    print(
+        f"Done. Imported: {result.imported}, "
+        f"sent to moderation: {result.pending_moderation}, "
+        f"unchanged: {result.unchanged}, "
+        f"unmatched: {len(result.unmatched)}, failed: {len(result.failed)}",
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Массовый импорт аватаров из ZIP-архива или каталога.",
+    )
+    parser.add_argument("path", help="ZIP-архив или каталог с фотографиями.")
+    parser.add_argument(
+        "--bypass-moderation",
+        action="store_true",
+        help="Сразу ставить фото аватаром, без заявок на модерацию.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Сколько фото обрабатывать одновременно "
+        "(по умолчанию MEDIA_IMPORT_CONCURRENCY).",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.bypass_moderation, args.concurrency))
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+"""CLI-скрипт для удаления журнала старых запусков синхронизации.
+
+Партиции sync_record, все запуски которых старше срока хранения,
+удаляются целиком. Срок по умолчанию — SYNC_RECORD_RETENTION_DAYS.
+
+Пример:
+    python scripts/prune_sync_records.py --days 90
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+
+from app.core.config import settings  # noqa: E402
+from app.db.session import async_session_maker  # noqa: E402
+from app.services.sync.journal import (  # noqa: E402
+    drop_expired_sync_record_partitions,
+    list_sync_record_partitions,
+)
+
+
+async def main(days: int, list_only: bool) -> None:
+    async with async_session_maker() as session:
+        if list_only:
+            for name, lo, hi in await list_sync_record_partitions(session):
+                print(f"{name}: job_id {lo}..{hi - 1}")
+            return
+
+        dropped = await drop_expired_sync_record_partitions(
+            session,
+            retention_days=days,
+        )
+        await session.commit()
+
+    print(f"Dropped partitions: {', '.join(dropped) or 'none'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=settings.SYNC_RECORD_RETENTION_DAYS,
+        help="Срок хранения журнала в днях (0 — ничего не удалять)",
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="Только показать партиции журнала",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.days, args.list))
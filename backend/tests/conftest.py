@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import os
+from collections.abc import AsyncIterator
+
+import pytest
+import pytest_asyncio
+
+# Тесты с БД запускаются, только если DATABASE_URL задан явно (схема
+# накатана миграциями); остальным хватает заглушек обязательных настроек
+HAS_DATABASE = bool(os.environ.get("DATABASE_URL"))
+for name, value in {
+    "DATABASE_URL": "postgresql+asyncpg://localhost/test",
+    "SECRET_KEY": "test",
+    "AD_LDAP_HOST": "localhost",
+    "AD_BASE_DN": "dc=test",
+    "AD_BIND_USER": "test",
+    "AD_BIND_PASSWORD": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from app.core.config import settings  # noqa: E402
+
+
+@pytest_asyncio.fixture
+async def db_session_maker() -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    """Фабрика сессий к тестовой БД; без DATABASE_URL тест пропускается.
+
+    Движок создаётся на каждый тест: у pytest-asyncio свой event loop на
+    тест, а соединения asyncpg к чужому loop не переносятся.
+    """
+    if not HAS_DATABASE:
+        pytest.skip("DATABASE_URL is not set")
+
+    engine = create_async_engine(settings.DATABASE_URL)
+    try:
+        yield async_sessionmaker(engine, expire_on_commit=False)
+    finally:
+        await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def db_session(
+    db_session_maker: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[AsyncSession]:
+    """Сессия к тестовой БД; всё, что тест не зафиксировал, откатывается."""
+    async with db_session_maker() as session:
+        yield session
+        await session.rollback()
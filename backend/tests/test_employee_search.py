@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.employees_router import _parse_skill_level
+from scripts.explain_employee_search import (
+    EXPECTED_INDEXES,
+    check_plan,
+    explain_search,
+    prepare_session,
+)
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        ("4", (4, 4)),
+        (" 4 ", (4, 4)),
+        (">=4", (4, 5)),
+        ("<=2", (1, 2)),
+        ("3-5", (3, 5)),
+        ("6", None),
+        ("0", None),
+        ("5-3", None),
+        (">=6", None),
+        ("<=0", None),
+        ("abc", None),
+        ("", None),
+        ("3-", None),
+    ],
+)
+def test_parse_skill_level(raw: str, expected: tuple[int, int] | None) -> None:
+    assert _parse_skill_level(raw) == expected
+
+
+def _plan(*lines: str) -> str:
+    return "\n".join(("BitmapOr", *lines))
+
+
+def test_check_plan_ok() -> None:
+    plan = _plan(
+        *(f"  ->  Bitmap Index Scan on {name}" for name in EXPECTED_INDEXES),
+    )
+    assert check_plan(plan) == []
+
+
+def test_check_plan_reports_missing_index() -> None:
+    missing = EXPECTED_INDEXES[0]
+    plan = _plan(
+        *(
+            f"  ->  Bitmap Index Scan on {name}"
+            for name in EXPECTED_INDEXES
+            if name != missing
+        ),
+    )
+    assert check_plan(plan) == [f"index {missing} is not used"]
+
+
+def test_check_plan_ignores_index_name_outside_scan() -> None:
+    # имя индекса в условии фильтра не означает, что индекс использован
+    plan = _plan(f"  Filter: (x @@ y) -- {EXPECTED_INDEXES[-1]}")
+    assert f"index {EXPECTED_INDEXES[-1]} is not used" in check_plan(plan)
+
+
+def test_check_plan_reports_seq_scan() -> None:
+    plan = _plan(
+        *(f"  ->  Bitmap Index Scan on {name}" for name in EXPECTED_INDEXES),
+        "  ->  Seq Scan on employee",
+    )
+    assert check_plan(plan) == ["sequential scan on employee"]
+
+
+@pytest.mark.asyncio
+async def test_search_candidates_use_indexes(db_session: AsyncSession) -> None:
+    await prepare_session(db_session)
+
+    plan = await explain_search(db_session, "Иванов")
+
+    assert check_plan(plan) == [], plan
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.media_deletion import MediaDeletion
+from app.services import storage
+from app.services.media_cleanup import drain_media_deletion_batch
+from app.services.storage import LocalStorageBackend
+
+
+@pytest.fixture
+def local_storage(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Подменяет хранилище процесса локальным во временном каталоге."""
+    monkeypatch.setattr(storage, "_backend", LocalStorageBackend(tmp_path))
+    return tmp_path
+
+
+async def _queued(
+    session_maker: async_sessionmaker[AsyncSession],
+    keys: list[str],
+) -> dict[str, MediaDeletion]:
+    async with session_maker() as session:
+        rows = await session.execute(
+            select(MediaDeletion).where(MediaDeletion.storage_key.in_(keys)),
+        )
+        return {row.storage_key: row for row in rows.scalars()}
+
+
+@pytest.mark.asyncio
+async def test_drain_deletes_objects_and_postpones_failures(
+    db_session_maker: async_sessionmaker[AsyncSession],
+    local_storage: Path,
+) -> None:
+    prefix = f"media/test-{uuid.uuid4().hex}"
+    deleted_keys = [f"{prefix}/a.jpg", f"{prefix}/b.jpg"]
+    # ключ вне корня локальное хранилище удалить отказывается
+    failing_key = f"../{prefix}/c.jpg"
+    keys = [*deleted_keys, failing_key]
+
+    for key in deleted_keys:
+        path = local_storage / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x")
+
+    async with db_session_maker() as session:
+        session.add_all(MediaDeletion(storage_key=key) for key in keys)
+        await session.commit()
+
+    try:
+        started = datetime.now(timezone.utc)
+        async with db_session_maker() as session:
+            done, failed = await drain_media_deletion_batch(session)
+
+        assert done >= len(deleted_keys)
+        assert failed >= 1
+        assert not any((local_storage / key).exists() for key in deleted_keys)
+
+        queued = await _queued(db_session_maker, keys)
+        assert set(queued) == {failing_key}
+        row = queued[failing_key]
+        assert row.attempts == 1
+        assert row.last_error
+        assert row.not_before > started
+
+        # отложенная строка до not_before не берётся повторно
+        async with db_session_maker() as session:
+            await drain_media_deletion_batch(session)
+        assert (await _queued(db_session_maker, keys))[failing_key].attempts == 1
+    finally:
+        async with db_session_maker() as session:
+            await session.execute(
+                delete(MediaDeletion).where(MediaDeletion.storage_key.in_(keys)),
+            )
+            await session.commit()
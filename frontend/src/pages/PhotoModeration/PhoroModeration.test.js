@@ -164,14 +164,16 @@ describe('PhotoModeration page', () => {
     });
   });
 
-  test('пагинация: next/prev вызывает повторную загрузку с другим offset', async () => {
+  test('пагинация: next/prev загружает страницы по курсору', async () => {
     photoModerationApi.getPendingPhotos.mockResolvedValueOnce({
       items: [{ photo_moderation_id: 501 }],
       total: 120,
+      next_cursor: 'c2',
     });
     photoModerationApi.getPendingPhotos.mockResolvedValueOnce({
       items: [{ photo_moderation_id: 502 }],
       total: 120,
+      next_cursor: 'c3',
     });
 
     render(<PhotoModeration />);
@@ -179,6 +181,7 @@ describe('PhotoModeration page', () => {
     await waitFor(() => {
       expect(screen.getByTestId('photo-item-501')).toBeInTheDocument();
     });
+    expect(photoModerationApi.getPendingPhotos).toHaveBeenLastCalledWith({ limit: 50 });
 
     const nextBtn = screen.getByRole('button', { name: /Вперед/i });
     expect(nextBtn).toBeInTheDocument();
@@ -188,10 +191,12 @@ describe('PhotoModeration page', () => {
       expect(photoModerationApi.getPendingPhotos).toHaveBeenCalledTimes(2);
       expect(screen.getByTestId('photo-item-502')).toBeInTheDocument();
     });
+    expect(photoModerationApi.getPendingPhotos).toHaveBeenLastCalledWith({ limit: 50, cursor: 'c2' });
 
     photoModerationApi.getPendingPhotos.mockResolvedValueOnce({
       items: [{ photo_moderation_id: 501 }],
       total: 120,
+      next_cursor: 'c2',
     });
 
     const prevBtn = screen.getByRole('button', { name: /Назад/i });
@@ -201,5 +206,6 @@ describe('PhotoModeration page', () => {
       expect(photoModerationApi.getPendingPhotos).toHaveBeenCalledTimes(3);
       expect(screen.getByTestId('photo-item-501')).toBeInTheDocument();
     });
+    expect(photoModerationApi.getPendingPhotos).toHaveBeenLastCalledWith({ limit: 50 });
   });
 });
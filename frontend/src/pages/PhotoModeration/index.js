@@ -17,27 +17,36 @@ const PhotoModeration = () => {
     pagination: {
       total: 0,
       limit: PAGINATION_CONFIG.LIMIT,
-      offset: 0,
+      // курсор текущей страницы (null — первая страница)
+      cursor: null,
+      // курсоры предыдущих страниц, для кнопки «Назад»
+      prevCursors: [],
+      nextCursor: null,
     },
   });
 
   useEffect(() => {
     loadPendingPhotos();
-  }, [state.pagination.offset]);
+  }, [state.pagination.cursor]);
 
   const loadPendingPhotos = async () => {
     try {
       setState(prev => ({ ...prev, loading: true, error: null }));
       
-      const response = await photoModerationApi.getPendingPhotos({
-        limit: state.pagination.limit,
-        offset: state.pagination.offset,
-      });
+      const params = { limit: state.pagination.limit };
+      if (state.pagination.cursor) {
+        params.cursor = state.pagination.cursor;
+      }
+      const response = await photoModerationApi.getPendingPhotos(params);
       
       setState(prev => ({
         ...prev,
         pendingPhotos: response.items || [],
-        pagination: { ...prev.pagination, total: response.total || 0 },
+        pagination: {
+          ...prev.pagination,
+          total: response.total || 0,
+          nextCursor: response.next_cursor || null,
+        },
       }));
     } catch (err) {
       console.error('Error loading pending photos:', err);
@@ -94,15 +103,29 @@ const PhotoModeration = () => {
   };
 
   const handlePagination = direction => {
-    setState(prev => ({
-      ...prev,
-      pagination: {
-        ...prev.pagination,
-        offset: direction === 'next' 
-          ? prev.pagination.offset + prev.pagination.limit
-          : prev.pagination.offset - prev.pagination.limit,
-      },
-    }));
+    setState(prev => {
+      const { cursor, prevCursors, nextCursor } = prev.pagination;
+
+      if (direction === 'next') {
+        return {
+          ...prev,
+          pagination: {
+            ...prev.pagination,
+            cursor: nextCursor,
+            prevCursors: [...prevCursors, cursor],
+          },
+        };
+      }
+
+      return {
+        ...prev,
+        pagination: {
+          ...prev.pagination,
+          cursor: prevCursors[prevCursors.length - 1] ?? null,
+          prevCursors: prevCursors.slice(0, -1),
+        },
+      };
+    });
   };
 
   if (state.loading) {
@@ -230,14 +253,14 @@ const Pagination = ({ pagination, onPagination }) => {
     return null;
   }
 
-  const currentPage = Math.floor(pagination.offset / pagination.limit) + 1;
+  const currentPage = pagination.prevCursors.length + 1;
   const totalPages = Math.ceil(pagination.total / pagination.limit);
 
   return (
     <div className="photo-moderation-pagination">
       <button 
         className="btn btn-secondary"
-        disabled={pagination.offset === 0}
+        disabled={pagination.prevCursors.length === 0}
         onClick={() => onPagination('prev')}
       >
         Назад
@@ -247,7 +270,7 @@ const Pagination = ({ pagination, onPagination }) => {
       </span>
       <button 
         className="btn btn-secondary"
-        disabled={pagination.offset + pagination.limit >= pagination.total}
+        disabled={!pagination.nextCursor}
         onClick={() => onPagination('next')}
       >
         Вперед